@@ -0,0 +1,92 @@
+"""
+Microbenchmark: declared attribute access on Entity objects.
+
+Builds an in-memory model and times
+* a walk over the object graph like the one in Model.dput, and
+* repeated reads of simple, object and collection attributes.
+
+Usage: python benchmarks/bench_entity_access.py [n_nodes]
+"""
+
+import sys
+import timeit
+import warnings
+
+sys.path.insert(0, "src")
+
+from bento_meta.model import Model
+from bento_meta.objects import Edge, Property, Term
+
+warnings.simplefilter("ignore")
+
+
+def build(n_nodes: int) -> Model:
+    """Make a model with n_nodes nodes, 10 props each, and a value set on every fifth."""
+    model = Model("bench", version="1")
+    prev = None
+    for i in range(n_nodes):
+        node = model.add_node({"handle": f"node{i}", "nanoid": f"n{i}"})
+        for j in range(10):
+            vd = "value_set" if j % 5 == 0 else "string"
+            p = model.add_prop(node, Property({"handle": f"p{i}_{j}", "value_domain": vd}))
+            if vd == "value_set":
+                model.add_terms(p, *[Term({"value": f"t{j}_{k}"}) for k in range(10)])
+        if prev:
+            model.add_edge(Edge({"handle": f"e{i}", "src": node, "dst": prev}))
+        prev = node
+    for ent in [*model.nodes.values(), *model.props.values(), *model.edges.values()]:
+        ent.dirty = 0
+    return model
+
+
+def walk(model: Model) -> int:
+    """Visit every entity reachable from the model, as Model.dput does."""
+    seen = {}
+
+    def do_(obj) -> None:  # noqa: ANN001
+        if id(obj) in seen:
+            return
+        seen[id(obj)] = 1
+        for att, kind in type(obj).attspec.items():
+            if kind == "object":
+                ent = getattr(obj, att)
+                if ent:
+                    do_(ent)
+            elif kind == "collection":
+                ents = getattr(obj, att)
+                if ents:
+                    for ent in ents:
+                        do_(ents[ent])
+
+    for ents in (model.nodes, model.edges, model.props):
+        for e in ents.values():
+            do_(e)
+    return len(seen)
+
+
+def reads(model: Model) -> int:
+    """Read simple, object and collection attributes of every property."""
+    n = 0
+    for p in model.props.values():
+        if p.handle and p.value_domain and p.is_required is None:
+            n += 1
+        vs = p.value_set
+        if vs is not None and vs.terms:
+            n += len(vs.terms)
+        if p.dirty == 0 and p.nanoid is None:
+            n += 1
+    return n
+
+
+def main() -> None:
+    """Run the benchmark."""
+    n_nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    model = build(n_nodes)
+    print(f"model: {len(model.nodes)} nodes, {len(model.props)} props, {len(model.terms)} terms")
+    for fn in (walk, reads):
+        t = min(timeit.repeat(lambda fn=fn: fn(model), number=5, repeat=5)) / 5
+        print(f"{fn.__name__:>6}: {t * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Benchmark: building a model edge by edge.
+
+Model.add_edge checks that both ends are in the model with Model.contains,
+so this measures the cost of membership tests as the model grows.
+
+Usage: python benchmarks/bench_model_build.py [n_edges]
+"""
+
+import sys
+import time
+import warnings
+
+sys.path.insert(0, "src")
+
+from bento_meta.model import Model
+from bento_meta.objects import Edge, Node
+
+warnings.simplefilter("ignore")
+
+
+def build(n_edges: int) -> Model:
+    """Make a chain of n_edges edges over n_edges + 1 nodes."""
+    model = Model("bench", version="1")
+    prev = model.add_node(Node({"handle": "n0"}))
+    for i in range(1, n_edges + 1):
+        node = model.add_node(Node({"handle": f"n{i}"}))
+        model.add_edge(Edge({"handle": "next", "src": prev, "dst": node}))
+        prev = node
+    return model
+
+
+def main() -> None:
+    """Run the benchmark."""
+    n_edges = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    t0 = time.perf_counter()
+    model = build(n_edges)
+    t = time.perf_counter() - t0
+    print(f"{len(model.edges)} edges, {len(model.nodes)} nodes: {t:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
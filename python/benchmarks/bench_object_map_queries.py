@@ -0,0 +1,109 @@
+"""
+Benchmark: round-trip latency of ObjectMap queries against a Neo4j server.
+
+Times the parameterized queries that ObjectMap now issues against the
+string-interpolated form it used to issue (ids and values written into the
+Cypher text), which Neo4j must parse and plan anew for every distinct id.
+Each query is run once per benchmark node.
+
+Needs a scratch Neo4j instance, e.g. a local container:
+
+  docker run -d -p 7687:7687 -e NEO4J_AUTH=neo4j/benchmark neo4j:4.4
+  NEO4J_MDB_URI=bolt://localhost:7687 NEO4J_MDB_USER=neo4j \\
+    NEO4J_MDB_PASS=benchmark python benchmarks/bench_object_map_queries.py [n]
+
+Benchmark nodes are created with model "__bench__", and deleted afterwards.
+"""
+
+import os
+import statistics
+import sys
+import time
+from collections.abc import Callable
+
+sys.path.insert(0, "src")
+
+from bento_meta.object_map import ObjectMap
+from bento_meta.objects import Node, Property
+from neo4j import GraphDatabase, Session
+
+BENCH_MODEL = "__bench__"
+
+
+def interpolated_get(n: Node) -> tuple[str, dict]:
+    """The form of ObjectMap.get_q before parameterization."""
+    return (f"MATCH (n:node) WHERE id(n)={n.neoid} RETURN n,id(n)", {})
+
+
+def interpolated_get_attr(n: Node) -> tuple[str, dict]:
+    """The form of ObjectMap.get_attr_q(n, "props") before parameterization."""
+    return (
+        f"MATCH (n:node)-[:has_property]->(a:property) WHERE id(n)={n.neoid} RETURN a",
+        {},
+    )
+
+
+def interpolated_put_attr(n: Node) -> tuple[str, dict]:
+    """The form of ObjectMap.put_attr_q(n, "desc", ...) before parameterization."""
+    return (
+        f'MATCH (n:node) WHERE id(n)={n.neoid} SET n.desc="{n.handle}" RETURN id(n)',
+        {},
+    )
+
+
+def timed(session: Session, nodes: list[Node], make: Callable) -> list[float]:
+    """Run the statement made for each node; return latencies in ms."""
+    lat = []
+    for n in nodes:
+        (qry, parms) = make(n)
+        t0 = time.perf_counter()
+        session.run(qry, parms).consume()
+        lat.append((time.perf_counter() - t0) * 1000)
+    return lat
+
+
+def main() -> None:
+    """Run the benchmark."""
+    n_nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    drv = GraphDatabase.driver(
+        os.environ.get("NEO4J_MDB_URI", "bolt://localhost:7687"),
+        auth=(os.environ.get("NEO4J_MDB_USER"), os.environ.get("NEO4J_MDB_PASS")),
+    )
+    omap = ObjectMap(cls=Node, drv=drv)
+    nodes = [
+        Node({"handle": f"bench{i}", "model": BENCH_MODEL}) for i in range(n_nodes)
+    ]
+    for n in nodes:
+        n.props["p"] = Property({"handle": "p", "model": BENCH_MODEL})
+    omap.put_many(nodes)
+
+    cases = [
+        ("get_q", interpolated_get, omap.get_q),
+        ("get_attr_q(props)", interpolated_get_attr, lambda n: omap.get_attr_q(n, "props")),
+        (
+            "put_attr_q(desc)",
+            interpolated_put_attr,
+            lambda n: omap.put_attr_q(n, "desc", [n.handle])[0],
+        ),
+    ]
+    try:
+        with drv.session() as session:
+            print(f"{n_nodes} nodes; median / mean round trip in ms")
+            for name, before, after in cases:
+                for label, make in (("interpolated", before), ("parameterized", after)):
+                    lat = timed(session, nodes, make)
+                    print(
+                        f"{name:>18} {label:>13}: "
+                        f"{statistics.median(lat):6.3f} / {statistics.mean(lat):6.3f}"
+                    )
+    finally:
+        with drv.session() as session:
+            session.run(
+                "MATCH (n) WHERE n.model = $model DETACH DELETE n",
+                {"model": BENCH_MODEL},
+            ).consume()
+        drv.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,8 @@ import pandas as pd
 import spacy
 from bento_meta.mdb import SearchableMDB
 from bento_meta.mdb.mdb_tools import ToolsMDB
+from bento_meta.mdb.mdb_tools.ann import knn
+from bento_meta.mdb.mdb_tools.term_index import embed
 from bento_meta.objects import Property
 
 
@@ -180,10 +182,19 @@ def main(
     if base_model in comp_models:
         comp_models.remove(base_model)
 
+    # fetch nodes and properties of all models concurrently
+    fetched = smdb.fetch_many(
+        smdb.get_nodes_and_props_by_model, [base_model, *comp_models]
+    )
+    for result in fetched:
+        if isinstance(result, Exception):
+            raise result
+    (base_result, *comp_results) = [result or [] for result in fetched]
+
     base_nodes_props = []
 
     # gather all node and property handles for given base model
-    for node in smdb.get_nodes_and_props_by_model(base_model):
+    for node in base_result:
         for prop in node["props"]:
             base_nodes_props.append(
                 {
@@ -200,8 +211,8 @@ def main(
     comp_nodes_props = []
 
     # gather all node and property handles for given base model
-    for model in comp_models:
-        for node in smdb.get_nodes_and_props_by_model(model):
+    for model, result in zip(comp_models, comp_results):
+        for node in result:
             for prop in node["props"]:
                 comp_nodes_props.append(
                     {
@@ -221,10 +232,19 @@ def main(
             continue
         comp_nano_node_dict[d["nanoid"]] = [d["node_handle"]]
 
-    for base_prop in base_nodes_props:
-        # replace characters in property handle for fuzzy and nlp matching
+    # embed each property handle once, and find the num_nlp nearest comp
+    # properties of all base properties in one batch search
+    base_vecs = embed(
+        nlp, [p["handle"].replace("_", " ").lower() for p in base_nodes_props]
+    )
+    comp_vecs = embed(
+        nlp, [p["handle"].replace("_", " ").lower() for p in comp_nodes_props]
+    )
+    (nlp_sims, nlp_rows) = knn(comp_vecs, base_vecs, num_nlp)
+
+    for base_prop, sims, rows in zip(base_nodes_props, nlp_sims, nlp_rows):
+        # replace characters in property handle for fuzzy matching
         base_hdl_wc = base_prop["handle"].replace("_", "*")
-        base_hdl_nlp = nlp(base_prop["handle"].replace("_", " ").lower())
 
         # get any existing synonyms of property
         base_synonyms = tmdb.get_property_synonyms_all(
@@ -270,17 +290,16 @@ def main(
 
         # nlp
         nlp_match_list = []
-        for comp_prop in comp_nodes_props:
-            comp_hdl_nlp = nlp(comp_prop["handle"].replace("_", " ").lower())
-            similarity = base_hdl_nlp.similarity(comp_hdl_nlp)
-            if similarity >= sim_threshold:
+        for similarity, row in zip(sims, rows):
+            if row >= 0 and similarity >= sim_threshold:
+                comp_prop = comp_nodes_props[row]
                 nlp_match_list.append(
                     {
                         "nanoid": comp_prop["nanoid"],
                         "model": comp_prop["model"],
                         "handle": comp_prop["handle"],
                         "node_handle": comp_prop["node_handle"],
-                        "similarity": similarity,
+                        "similarity": float(similarity),
                     }
                 )
         # add top n nlp matches by similarity to nlp matches of base property
@@ -2,4 +2,4 @@
 bento-meta
 """
 
-from . import entity, model, object_map, objects
+from . import cache, entity, model, object_map, objects, snapshot, store
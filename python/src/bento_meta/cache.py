@@ -0,0 +1,469 @@
+"""
+bento_meta.cache
+================
+
+This module contains :class:`EntityCache`, the identity cache used by
+:class:`bento_meta.object_map.ObjectMap` to map database nodes to the
+:class:`bento_meta.entity.Entity` instances that represent them.
+
+The cache can be bounded, in which case the least recently used entries
+are evicted, and can hold weak references, so that it does not keep
+otherwise unused entity graphs alive. Entries are partitioned by model
+and version, so that the entities of one model can be evicted at once.
+
+Entries are keyed on the internal database id (``neoid``), but each entry
+is also indexed by keys that survive a database restore or a switch to a
+replica: the MDB nanoid (qualified by version), and the node's element_id.
+:meth:`EntityCache.lookup` finds the entity for a retrieved db node by
+these keys first, and rekeys the entry when the internal id has changed.
+To use a differently configured cache, assign a new instance::
+
+  ObjectMap.cache = EntityCache(max_entries=100000, weak=True)
+
+It also contains :class:`ResultCache`, an optional cache of the results of
+:class:`bento_meta.mdb.MDB` read methods::
+
+  mdb = MDB(uri, user, password, result_cache=ResultCache(max_entries=1000, ttl=600))
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Hashable, Iterator, MutableMapping
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    import neo4j.graph
+
+    from bento_meta.entity import Entity
+
+Partition = tuple[str | None, str | None]
+StableKey = tuple[str | None, ...]
+ResultKey = tuple[Hashable, ...]
+
+
+def stable_keys(item: Entity | neo4j.graph.Node) -> list[StableKey]:
+    """
+    Return the keys of an entity or db node that do not depend on its internal id.
+
+    The nanoid is shared by all versions of an MDB entity, so it is qualified
+    with the version and _from properties.
+
+    Args:
+        item: An Entity, or a neo4j.graph.Node as returned by the driver.
+
+    Returns:
+        A list of keys, nanoid key first; possibly empty.
+    """
+    keys = []
+    if hasattr(type(item), "attspec"):  # Entity
+        nanoid, elt = item.nanoid, item.element_id
+        version = item.version if "version" in type(item).attspec else None
+        frm = item._from
+    else:  # neo4j.graph.Node
+        nanoid, elt = item.get("nanoid"), item.element_id
+        version, frm = item.get("version"), item.get("_from")
+    if nanoid is not None:
+        keys.append(("nanoid", nanoid, version, frm))
+    if elt is not None:
+        keys.append(("element_id", elt))
+    return keys
+
+
+class EntityCache(MutableMapping):
+    """
+    LRU identity cache of Entity instances.
+
+    Attributes:
+        max_entries: Maximum number of entries held; None means unbounded.
+        weak: If True, hold weak references to cached entities.
+        hits: Number of lookups that found a live entry.
+        misses: Number of lookups that did not.
+        evictions: Number of entries dropped to respect max_entries,
+            or by :meth:`evict_partition`.
+    """
+
+    def __init__(self, max_entries: int | None = None, *, weak: bool = False) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries; None for no limit.
+            weak: If True, hold weak references to cached entities.
+        """
+        if max_entries is not None and max_entries < 1:
+            msg = "max_entries must be a positive integer or None"
+            raise ValueError(msg)
+        self.max_entries = max_entries
+        self.weak = weak
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._part_of: dict[Hashable, Partition] = {}
+        self._parts: dict[Partition, set[Hashable]] = {}
+        self._alias: dict[StableKey, Hashable] = {}
+        self._aliases_of: dict[Hashable, list[StableKey]] = {}
+        self._current: Partition = (None, None)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _deref(self, key: Hashable) -> Entity | None:
+        val = self._data[key]
+        if self.weak:
+            val = val()
+            if val is None:  # referent is gone
+                self._drop(key)
+        return val
+
+    def _drop(self, key: Hashable) -> None:
+        del self._data[key]
+        for skey in self._aliases_of.pop(key):
+            if self._alias.get(skey) == key:
+                del self._alias[skey]
+        part = self._part_of.pop(key)
+        self._parts[part].discard(key)
+        if not self._parts[part]:
+            del self._parts[part]
+
+    def __getitem__(self, key: Hashable) -> Entity:
+        """Get the entity for key, marking it most recently used."""
+        val = self._deref(key) if key in self._data else None
+        if val is None:
+            self.misses += 1
+            raise KeyError(key)
+        self.hits += 1
+        self._data.move_to_end(key)
+        return val
+
+    def get(self, key: Hashable, default: Any = None) -> Any:  # noqa: ANN401
+        """Get the entity for key, or default if not cached."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key: Hashable, value: Entity) -> None:
+        """Cache an entity under key, evicting the least recently used if full."""
+        self._put(key, value, self._partition_for(value))
+
+    def _put(self, key: Hashable, value: Entity, part: Partition) -> None:
+        if key in self._data:
+            self._drop(key)
+        self._data[key] = weakref.ref(value) if self.weak else value
+        self._part_of[key] = part
+        self._parts.setdefault(part, set()).add(key)
+        self._aliases_of[key] = stable_keys(value)
+        for skey in self._aliases_of[key]:
+            self._alias[skey] = key
+        if self.max_entries is not None:
+            while len(self._data) > self.max_entries:
+                self._drop(next(iter(self._data)))
+                self.evictions += 1
+
+    def __delitem__(self, key: Hashable) -> None:
+        """Remove the entry for key."""
+        self._drop(key)
+
+    def __contains__(self, key: object) -> bool:
+        """Whether a live entry exists for key. Does not count as a lookup."""
+        return key in self._data and (not self.weak or self._data[key]() is not None)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        """Iterate over keys, least recently used first."""
+        return iter(list(self._data))
+
+    def __len__(self) -> int:
+        """Return the number of entries (including dead weak references)."""
+        return len(self._data)
+
+    def values(self) -> list[Entity]:
+        """Return the live cached entities, without affecting recency."""
+        if not self.weak:
+            return list(self._data.values())
+        return [v for v in (r() for r in self._data.values()) if v is not None]
+
+    def clear(self) -> None:
+        """Remove all entries. Counters are kept; see :meth:`reset_stats`."""
+        self._data.clear()
+        self._part_of.clear()
+        self._parts.clear()
+        self._alias.clear()
+        self._aliases_of.clear()
+
+    def lookup(self, node: neo4j.graph.Node) -> Entity | None:
+        """
+        Get the entity for a db node, preferring keys that are stable across restores.
+
+        The entity is found by the node's nanoid or element_id if possible,
+        then by internal id. Since element_ids and internal ids may be reused
+        after a restore, an entry whose nanoid does not match the node's is
+        stale, and is dropped. If the entity was cached under a different
+        internal id (e.g., it was retrieved from another replica), its neoid
+        and element_id are updated, and the entry is rekeyed.
+
+        Args:
+            node: A neo4j.graph.Node.
+
+        Returns:
+            The cached entity, or None.
+        """
+        nkeys = stable_keys(node)
+        val = None
+        for key in [*(self._alias.get(k) for k in nkeys), node.id]:
+            if key is None or key not in self:
+                continue
+            val = self._deref(key)
+            if node.get("nanoid") is None or val.nanoid is None:
+                break
+            if stable_keys(val)[0] == nkeys[0]:
+                break
+            self._drop(key)  # stale
+            val = None
+        if val is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        part = self._part_of[key]
+        self._drop(key)
+        val.neoid = node.id
+        val.element_id = node.element_id
+        self._put(node.id, val, part)
+        return val
+
+    def _partition_for(self, value: Entity) -> Partition:
+        """Partition of an entity: its model and version, if it declares them."""
+        attspec = type(value).attspec
+        if "model" in attspec and value.model is not None:
+            return (value.model, value.version if "version" in attspec else None)
+        return self._current
+
+    @contextmanager
+    def partition(
+        self,
+        model: str | None,
+        version: str | None = None,
+    ) -> Generator[EntityCache, None, None]:
+        """
+        Context in which entities without a model attribute are assigned to a partition.
+
+        Entities such as Terms, ValueSets and Concepts have no model or version
+        of their own. Entries for these made within the context are assigned to
+        the (model, version) partition given.
+        """
+        stash = self._current
+        self._current = (model, version)
+        try:
+            yield self
+        finally:
+            self._current = stash
+
+    def partitions(self) -> list[Partition]:
+        """Return the (model, version) partitions with entries."""
+        return list(self._parts)
+
+    def evict_partition(self, model: str | None, version: str | None = None) -> int:
+        """
+        Remove all entries belonging to a model.
+
+        Args:
+            model: Model handle.
+            version: Model version. If None, entries of all versions are removed.
+
+        Returns:
+            Number of entries removed.
+        """
+        n = 0
+        for part in [
+            p for p in self._parts if p[0] == model and version in (None, p[1])
+        ]:
+            for key in list(self._parts.get(part, ())):
+                self._drop(key)
+                n += 1
+        self.evictions += n
+        return n
+
+    def stats(self) -> dict[str, int | None]:
+        """Return hit, miss and eviction counters, with current and maximum size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+        }
+
+    def reset_stats(self) -> None:
+        """Zero the hit, miss and eviction counters."""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+def _freeze(val: Any) -> Hashable:  # noqa: ANN401
+    """Return a hashable equivalent of a query parameter value."""
+    if isinstance(val, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in val.items()))
+    if isinstance(val, (list, tuple, set)):
+        return tuple(_freeze(v) for v in val)
+    return val
+
+
+class ResultCache:
+    """
+    LRU cache of MDB read results, with optional expiry and per-model invalidation.
+
+    Each entry is assigned to the model and version given by the "model"
+    and "version" parameters of its query, if any. :meth:`invalidate`
+    drops the entries of a model (and version), along with those that are
+    not specific to a model.
+
+    The cache can be shared by threads.
+
+    Attributes:
+        max_entries: Maximum number of entries held; None means unbounded.
+        ttl: Seconds an entry is valid for; None means until invalidated.
+        hits: Number of lookups that found a valid entry.
+        misses: Number of lookups that did not.
+        evictions: Number of entries dropped to respect max_entries, or
+            because they had expired.
+        invalidations: Number of entries dropped by :meth:`invalidate`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        ttl: float | None = None,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries; None for no limit.
+            ttl: Seconds after which an entry expires; None for no expiry.
+        """
+        if max_entries is not None and max_entries < 1:
+            msg = "max_entries must be a positive integer or None"
+            raise ValueError(msg)
+        if ttl is not None and ttl <= 0:
+            msg = "ttl must be a positive number or None"
+            raise ValueError(msg)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (value, partition, expiry time)
+        self._data: OrderedDict[ResultKey, tuple[Any, Partition, float | None]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(name: str, qry: str, parms: dict[str, Any] | None) -> ResultKey:
+        """Return the cache key for a query, run by the MDB method name."""
+        return (name, qry, _freeze(parms or {}))
+
+    def get(self, key: ResultKey, default: Any = None) -> Any:  # noqa: ANN401
+        """Get the cached result for key, or default if there is none."""
+        with self._lock:
+            ent = self._data.get(key)
+            if ent is not None and ent[2] is not None and ent[2] <= time.monotonic():
+                del self._data[key]
+                self.evictions += 1
+                ent = None
+            if ent is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            return ent[0]
+
+    def put(
+        self,
+        key: ResultKey,
+        value: Any,  # noqa: ANN401
+        parms: dict[str, Any] | None = None,
+    ) -> None:
+        """
+        Cache a result under key.
+
+        Args:
+            key: The key, as returned by :meth:`key`.
+            value: The result.
+            parms: The query parameters, whose "model" and "version"
+                entries determine the partition of the entry.
+        """
+        parms = parms or {}
+        part = (parms.get("model"), parms.get("version"))
+        expiry = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (value, part, expiry)
+            if self.max_entries is not None:
+                while len(self._data) > self.max_entries:
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+
+    def invalidate(self, model: str | None = None, version: str | None = None) -> int:
+        """
+        Drop the entries that a write to a model may have made stale.
+
+        These are the entries of the model and version, those of the model
+        with no version, and those not specific to any model.
+
+        Args:
+            model: Model handle. If None, all entries are dropped.
+            version: Model version. If None, entries of all versions of
+                the model are dropped.
+
+        Returns:
+            Number of entries dropped.
+        """
+        with self._lock:
+            if model is None:
+                stale = list(self._data)
+            else:
+                stale = [
+                    k
+                    for k, (_, (m, v), _) in self._data.items()
+                    if m is None or (m == model and version in (None, v))
+                    or (m == model and v is None)
+                ]
+            for k in stale:
+                del self._data[k]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        """Remove all entries. Counters are kept; see :meth:`reset_stats`."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        """Return the number of entries (including expired ones)."""
+        return len(self._data)
+
+    def stats(self) -> dict[str, int | float | None]:
+        """Return hit, miss, eviction and invalidation counters, with sizes."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+        }
+
+    def reset_stats(self) -> None:
+        """Zero the hit, miss, eviction and invalidation counters."""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
@@ -6,10 +6,28 @@ This module contains
 * `Entity`, the base class for metamodel objects,
 * the `CollValue` class to manage collection-valued attributes, and
 * the `ArgError` exception.
+
+Entities that are marked dirty (changed since they were last put to or
+retrieved from the database) are recorded in a registry of weak references;
+see :func:`dirty_entities`. :meth:`bento_meta.model.Model.dput` uses it to
+visit only changed entities.
+
+Compact mode: if the environment variable ``BENTO_META_COMPACT`` is set
+(to anything but "" or "0") when this module is first imported, Entity and
+its subclasses are created with ``__slots__`` generated from their attspecs,
+and instances have no ``__dict__``. This does not save memory: on CPython
+3.11+, the instance dicts of the default mode are stored compactly, and
+with private state allocated lazily a sparse entity is smaller as a dict
+than with a full set of slots. The mode exists to catch code that sets
+undeclared attributes or reaches into ``entity.__dict__``, which fail
+outright when instances have no dict. Attribute semantics are the same in
+both modes; code should not rely on ``entity.__dict__``.
 """
 
 from __future__ import annotations
 
+import os
+import weakref
 from collections import UserDict
 from typing import TYPE_CHECKING, Any, ClassVar
 
@@ -19,11 +37,125 @@ if TYPE_CHECKING:
     from bento_meta.object_map import ObjectMap
 
 
+COMPACT = os.environ.get("BENTO_META_COMPACT", "") not in ("", "0")
+
+# private attributes stored on the instance itself, rather than in pvt
+_PVT_STORED = frozenset(("pvt", "neoid", "element_id", "_dirty"))
+
+# id(entity) -> entity, for entities with dirty == 1
+_DIRTY: weakref.WeakValueDictionary[int, Entity] = weakref.WeakValueDictionary()
+
+
+def dirty_entities() -> list[Entity]:
+    """
+    Get the live entities that are marked dirty (dirty == 1).
+
+    Returns:
+        List of Entity instances, in the order they were first marked dirty.
+    """
+    return list(_DIRTY.values())
+
+
 class ArgError(Exception):
     """Exception for method argument errors."""
 
 
-class Entity:
+class ObjectAttr:
+    """
+    Data descriptor for an object-valued declared attribute.
+
+    Returns the referent, first retrieving it from the database if it is
+    a lazy (dirty < 0) placeholder. Setting stores the value as is; the
+    magic on assignment is in `Entity.__setattr__`.
+    """
+
+    __slots__ = ("member", "name")
+
+    def __init__(self, name: str, member: Any = None) -> None:  # noqa: ANN401
+        """
+        Create the descriptor.
+
+        Args:
+            name: Attribute name.
+            member: Slot descriptor holding the value in compact mode; if None,
+                the value is held in the instance __dict__.
+        """
+        self.name = name
+        self.member = member
+
+    def raw(self, obj: Entity) -> Entity | None:
+        """Return the stored value, without retrieval."""
+        if self.member is None:
+            return obj.__dict__.get(self.name)
+        try:
+            return self.member.__get__(obj, None)
+        except AttributeError:
+            return None
+
+    def __get__(self, obj: Entity | None, cls: type | None = None) -> Any:  # noqa: ANN401
+        """Get the referent."""
+        if obj is None:
+            return self
+        val = self.raw(obj)
+        if val is not None and val._dirty < 0:  # noqa: SLF001
+            # magic - lazy getting
+            val.dget()
+        return val
+
+    def __set__(self, obj: Entity, value: Entity | None) -> None:
+        """Store the referent."""
+        if self.member is None:
+            obj.__dict__[self.name] = value
+        else:
+            self.member.__set__(obj, value)
+
+    def __delete__(self, obj: Entity) -> None:
+        """Remove the stored referent."""
+        if self.member is None:
+            del obj.__dict__[self.name]
+        else:
+            self.member.__delete__(obj)
+
+
+class EntityType(type):
+    """
+    Metaclass for Entity.
+
+    Generates the attribute accessors for each class from its attspec, so
+    that reading a declared attribute costs about as much as reading a plain
+    attribute. Simple and collection attributes are stored as ordinary
+    instance attributes; when unset, `Entity.__getattr__` supplies None or an
+    empty collection. Object attributes get an :class:`ObjectAttr` descriptor,
+    for lazy retrieval.
+
+    In compact mode, also adds ``__slots__`` for the declared attributes of
+    each class that does not define its own.
+    """
+
+    def __new__(mcs, name: str, bases: tuple[type, ...], ns: dict[str, Any]) -> type:  # noqa: N804
+        """Create an Entity class, with slots in compact mode."""
+        spec = {**ns.get("attspec_", {}), **ns.get("attspec", {})}
+        if COMPACT and "__slots__" not in ns:
+            have = set()
+            for base in bases:
+                for b in base.__mro__:
+                    have.update(getattr(b, "__slots__", ()))
+            atts = [
+                f"_ref_{a}" if spec[a] == "object" else a for a in spec if a not in ns
+            ]
+            if not any(isinstance(b, EntityType) for b in bases):
+                atts = [*_PVT_STORED, "__weakref__", *atts]
+            ns["__slots__"] = tuple(dict.fromkeys(a for a in atts if a not in have))
+        cls = super().__new__(mcs, name, bases, ns)
+        for att, kind in cls.__dict__.get("attspec", spec).items():
+            if kind != "object" or att in ns:
+                continue
+            member = getattr(cls, f"_ref_{att}", None) if COMPACT else None
+            setattr(cls, att, ObjectAttr(att, member))
+        return cls
+
+
+class Entity(metaclass=EntityType):
     """
     Base class for all metamodel objects.
 
@@ -42,6 +174,7 @@ class Entity:
     pvt_attr: ClassVar[list[str]] = [
         "pvt",
         "neoid",
+        "element_id",
         "dirty",
         "removed_entities",
         "attspec",
@@ -98,12 +231,10 @@ class Entity:
             msg = "unknown attribute type in attspec"
             raise ArgError(msg)
 
-        # private
-        self.pvt = {}
-        self.neoid = None
+        # private; pvt, removed_entities, belongs and empty collections
+        # are allocated when first needed
+        object.__setattr__(self, "_dirty", 0)
         self.dirty = 1
-        self.removed_entities = []
-        self.belongs = {}
         # merge to universal map - no, do in the subclasses
         # type(self).mergespec()
 
@@ -116,12 +247,6 @@ class Entity:
                 type(init).__name__ == "Node"
             ):  # neo4j.graph.Node - but don't want to import that
                 self.set_with_node(init)
-        for att in type(self).attspec:
-            if att not in self.__dict__:
-                if self.attspec[att] == "collection":
-                    setattr(self, att, CollValue({}, owner=self, owner_key=att))
-                else:
-                    setattr(self, att, None)
 
     @classmethod
     def mapspec(cls) -> dict[str, str | dict[str, str]]:
@@ -175,17 +300,30 @@ class Entity:
         Set to -1, ensure that the next time an attribute is accessed, the instance
         will retrieve itself from the database.
         """
-        return self.pvt["dirty"]
+        return object.__getattribute__(self, "_dirty")
 
     @dirty.setter
     def dirty(self, value: int) -> None:
-        """Set dirty flag."""
-        self.pvt["dirty"] = value
+        """Set dirty flag, recording the instance in the dirty registry if 1."""
+        old = object.__getattribute__(self, "_dirty")
+        object.__setattr__(self, "_dirty", value)
+        if value == 1:
+            if old != 1:
+                _DIRTY[id(self)] = self
+        elif old == 1:
+            _DIRTY.pop(id(self), None)
 
     @property
     def removed_entities(self) -> list[Any]:
-        """Return list of removed entities."""
-        return self.pvt["removed_entities"]
+        """
+        Return list of removed entities.
+
+        Reading does not allocate storage; the list returned when none has
+        been recorded is a fresh empty one. Record a removal with
+        :meth:`add_removed_entity` or by setting the attribute.
+        """
+        pvt = self._stored("pvt")
+        return (pvt and pvt.get("removed_entities")) or []
 
     @removed_entities.setter
     def removed_entities(self, value: list[Any]) -> None:
@@ -205,7 +343,7 @@ class Entity:
     @property
     def belongs(self) -> dict[tuple[int, str, str] | tuple[int, str], Entity]:
         """Return dict that stores information on the owners (referents) of this instance in the model."""
-        return self.pvt["belongs"]
+        return self.pvt.setdefault("belongs", {})
 
     @belongs.setter
     def belongs(
@@ -215,9 +353,28 @@ class Entity:
         """Set belongs dict."""
         self.pvt["belongs"] = value
 
+    def add_removed_entity(self, ent: Entity) -> None:
+        """Record an entity removed from this one."""
+        self.pvt.setdefault("removed_entities", []).append(ent)
+
     def clear_removed_entities(self) -> None:
         """Clear the list of removed entities."""
-        self.pvt["removed_entities"] = []
+        if self._stored("pvt"):
+            self.pvt.pop("removed_entities", None)
+
+    def _stored(self, name: str) -> Any:  # noqa: ANN401
+        """Return the value stored for an attribute, without magic; None if unset."""
+        desc = getattr(type(self), name, None)
+        if isinstance(desc, ObjectAttr):
+            return desc.raw(self)
+        try:
+            return object.__getattribute__(self, name)
+        except AttributeError:
+            return None
+
+    def _store(self, name: str, value: Any) -> None:  # noqa: ANN401
+        """Store the value for an attribute, without magic."""
+        object.__setattr__(self, name, value)
 
     def set_with_dict(self, init: dict) -> None:
         """Set the entity with a dict."""
@@ -238,6 +395,7 @@ class Entity:
             else:
                 setattr(self, att, None)
         self.neoid = init.id
+        self.element_id = init.element_id
 
     def set_with_entity(self, ent: Entity) -> Entity:
         """Set the entity with another entity."""
@@ -259,27 +417,26 @@ class Entity:
         for okey in ent.belongs:
             self.belongs[okey] = ent.belongs[okey]
         self.neoid = ent.neoid
+        self.element_id = ent.element_id
         self.dirty = 1
         return self
 
-    def __getattribute__(self, name: str) -> Any:  # noqa: ANN401
-        """Get the attribute of the entity."""
-        if name in type(self).attspec:
-            # declared attr, send to __getattr__ for magic
-            return self.__getattr__(name)
-        return object.__getattribute__(self, name)
-
     def __getattr__(self, name: str) -> Any:  # noqa: ANN401
-        """Get the attribute of the entity."""
+        """Get a private or declared attribute that has not been set."""
         if name in type(self).pvt_attr:
-            return self.__dict__["pvt"].get(name)
-        if name in type(self).attspec:
-            if name not in self.__dict__ or self.__dict__[name] is None:
+            if name == "pvt":
+                self._store("pvt", {})
+                return self._stored("pvt")
+            if name in _PVT_STORED:
                 return None
-            if type(self).attspec[name] == "object" and self.__dict__[name].dirty < 0:
-                # magic - lazy getting
-                self.__dict__[name].dget()
-            return self.__dict__[name]
+            pvt = self._stored("pvt")
+            return pvt.get(name) if pvt else None
+        if name in type(self).attspec:
+            if type(self).attspec[name] == "collection":
+                val = CollValue({}, owner=self, owner_key=name)
+                self._store(name, val)
+                return val
+            return None
         msg = (
             f"get: attribute '{name}' neither private nor declared "
             f"for subclass {type(self).__name__}"
@@ -288,10 +445,10 @@ class Entity:
 
     def __setattr__(self, name: str, value: Any) -> None:  # noqa: ANN401
         """Set the attribute of the entity."""
-        if name == "pvt":
-            self.__dict__["pvt"] = value
+        if name in _PVT_STORED or name in {"dirty", "removed_entities", "belongs"}:
+            object.__setattr__(self, name, value)
         elif name in type(self).pvt_attr:
-            self.__dict__["pvt"][name] = value
+            self.pvt[name] = value
         elif name in type(self).attspec:
             self._check_value(name, value)
             self._set_declared_attr(name, value)
@@ -308,7 +465,7 @@ class Entity:
         if atts == "simple":
             pass
         elif atts == "object":
-            oldval = self.__dict__.get(name)
+            oldval = self._stored(name)
             if oldval and oldval == value:
                 return  # a wash
             if isinstance(value, Entity):
@@ -325,11 +482,11 @@ class Entity:
             msg = f"unknown attspec value '{atts}'"
             raise RuntimeError(msg)
         self.dirty = 1
-        self.__dict__[name] = value
+        self._store(name, value)
 
     def __delattr__(self, name: str) -> None:
         """Delete the attribute of the entity."""
-        del self.__dict__[name]
+        object.__delattr__(self, name)
 
     def _check_init(self, init: dict) -> None:
         """Check the initial value of the entity."""
@@ -3,10 +3,31 @@ bento_meta.mdb
 ==============
 
 This module contains :class:`MDB`, with machinery for efficiently
-querying a Neo4j instance of a Metamodel Database.
+querying a Neo4j instance of a Metamodel Database, and :class:`AsyncMDB`,
+which provides the same queries as coroutines.
 """
 
-from .loaders import load_mdf, load_model, load_model_statements
-from .mdb import MDB, make_nanoid, read_txn, read_txn_data, read_txn_value
+from .asyncmdb import (
+    AsyncMDB,
+    AsyncSearchableMDB,
+    AsyncWriteableMDB,
+    async_read_txn,
+    async_read_txn_data,
+    async_read_txn_value,
+)
+from .loaders import (
+    load_mdf,
+    load_model,
+    load_model_bulk_statements,
+    load_model_statements,
+)
+from .mdb import (
+    MDB,
+    make_nanoid,
+    read_txn,
+    read_txn_data,
+    read_txn_iter,
+    read_txn_value,
+)
 from .searchable import SearchableMDB
 from .writeable import WriteableMDB
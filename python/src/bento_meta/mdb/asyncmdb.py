@@ -0,0 +1,429 @@
+"""
+bento_meta.mdb.asyncmdb
+=======================
+
+This module contains :class:`AsyncMDB`, with its subclasses
+:class:`AsyncSearchableMDB` and :class:`AsyncWriteableMDB`. These provide the
+query methods of :class:`bento_meta.mdb.MDB` and its subclasses as coroutines,
+run over the asyncio driver (``neo4j.AsyncGraphDatabase``). Independent lookups
+can then be awaited concurrently on one event loop::
+
+  async with AsyncMDB(uri, user, password) as mdb:
+      nodes, vsets = await asyncio.gather(
+          mdb.get_model_nodes("ICDC"),
+          mdb.get_valuesets_by_model("ICDC"),
+      )
+
+The Cypher statements are those built by the synchronous classes. Since a
+constructor cannot await, the models and versions in the database are
+queried by :meth:`AsyncMDB.connect`, which is called on entering the
+``async with`` block.
+"""
+
+from __future__ import annotations
+
+import os
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Concatenate, ParamSpec, cast
+from warnings import warn
+
+from neo4j import AsyncDriver, AsyncGraphDatabase
+from typing_extensions import LiteralString
+
+from bento_meta.mdb.mdb import MDB
+from bento_meta.mdb.searchable import TERM_INDEXES, SearchableMDB
+from bento_meta.mdb.writeable import WriteableMDB
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine
+    from types import TracebackType
+
+    from neo4j import AsyncManagedTransaction, Record
+
+P = ParamSpec("P")
+
+
+def async_read_txn(
+    func: Callable[Concatenate[Any, P], tuple[str, dict[str, Any] | None]],
+) -> Callable[Concatenate[AsyncMDB, P], Coroutine[Any, Any, list[Record]]]:
+    """
+    Decorate a query function to run a read transaction on the async driver.
+
+    Query function should return a tuple (qry_string, param_dict).
+
+    Args:
+        func: The query function to decorate.
+
+    Returns:
+        Decorated coroutine function that returns list of driver Records.
+    """
+
+    @wraps(func)
+    async def rd(self: AsyncMDB, *args: P.args, **kwargs: P.kwargs) -> list[Record]:
+        (qry, parms) = func(self, *args, **kwargs)
+
+        async def txn_q(tx: AsyncManagedTransaction) -> list[Record]:
+            result = await tx.run(cast("LiteralString", qry), parameters=parms)
+            return [rec async for rec in result]
+
+        async with self.driver.session() as session:
+            return await session.execute_read(txn_q)
+
+    return rd
+
+
+def async_read_txn_value(
+    func: Callable[Concatenate[Any, P], tuple[str, dict[str, Any] | None, str]],
+) -> Callable[Concatenate[AsyncMDB, P], Coroutine[Any, Any, list[Any]]]:
+    """
+    Decorate a query function to run a read transaction on the async driver.
+
+    Query function should return a tuple (qry_string, param_dict, values_key).
+
+    Args:
+        func: The query function to decorate.
+
+    Returns:
+        Decorated coroutine function that returns list of values for key
+        specified by query function.
+    """
+
+    @wraps(func)
+    async def rd(self: AsyncMDB, *args: P.args, **kwargs: P.kwargs) -> list[Any]:
+        (qry, parms, values_key) = func(self, *args, **kwargs)
+
+        async def txn_q(tx: AsyncManagedTransaction) -> list[Any]:
+            result = await tx.run(cast("LiteralString", qry), parameters=parms)
+            return await result.value(values_key)
+
+        async with self.driver.session() as session:
+            return await session.execute_read(txn_q)
+
+    return rd
+
+
+def async_read_txn_data(
+    func: Callable[Concatenate[Any, P], tuple[str, dict[str, Any] | None]],
+) -> Callable[Concatenate[AsyncMDB, P], Coroutine[Any, Any, list[dict] | None]]:
+    """
+    Decorate a query function to run a read transaction on the async driver.
+
+    Query function should return a tuple (qry_string, param_dict).
+
+    Args:
+        func: The query function to decorate.
+
+    Returns:
+        Decorated coroutine function that returns records as a list of simple
+        dicts, or None if there are no records.
+    """
+
+    @wraps(func)
+    async def rd(
+        self: AsyncMDB,
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> list[dict[str, Any]] | None:
+        (qry, parms) = func(self, *args, **kwargs)
+
+        async def txn_q(tx: AsyncManagedTransaction) -> list[dict[str, Any]]:
+            result = await tx.run(cast("LiteralString", qry), parameters=parms)
+            return await result.data()
+
+        async with self.driver.session() as session:
+            result = await session.execute_read(txn_q)
+            if len(result):
+                return result
+            return None
+
+    return rd
+
+
+def async_write_txn(
+    func: Callable[Concatenate[Any, P], tuple[str, dict[str, Any] | None]],
+) -> Callable[Concatenate[AsyncWriteableMDB, P], Coroutine[Any, Any, list[Record]]]:
+    """
+    Decorate a query function to run a write transaction on the async driver.
+
+    Query function should return a tuple (qry_string, param_dict).
+
+    Args:
+        func: The query function to decorate.
+
+    Returns:
+        Decorated coroutine function that executes a write transaction.
+    """
+
+    @wraps(func)
+    async def wr(
+        self: AsyncWriteableMDB,
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> list[Record]:
+        (qry, parms) = func(self, *args, **kwargs)
+
+        async def txn_q(tx: AsyncManagedTransaction) -> list[Record]:
+            result = await tx.run(cast("LiteralString", qry), parameters=parms)
+            return [rec async for rec in result]
+
+        async with self.driver.session() as session:
+            return await session.execute_write(txn_q)
+
+    return wr
+
+
+def _query_fn(method: Callable) -> Callable:
+    """Return the query function under a synchronous transaction decorator."""
+    return method.__wrapped__
+
+
+class AsyncMDB:
+    """
+    A Metamodel Database client whose query methods are coroutines.
+
+    The query methods are those of :class:`bento_meta.mdb.MDB`, with the same
+    arguments and return values.
+    """
+
+    def __init__(
+        self,
+        uri: str | None = None,
+        user: str | None = None,
+        password: str | None = None,
+        *,
+        max_connection_pool_size: int | None = None,
+        max_connection_lifetime: float | None = None,
+        connection_acquisition_timeout: float | None = None,
+        fetch_size: int | None = None,
+    ) -> None:
+        """
+        Create an AsyncMDB object, with an async driver for a Neo4j instance of an MDB.
+
+        The database is not queried until :meth:`connect` is awaited. The
+        keyword arguments configure the driver's connection pool, as for
+        :class:`bento_meta.mdb.MDB`.
+
+        Args:
+            uri: The Bolt protocol endpoint to the Neo4j instance.
+                Defaults to NEO4J_MDB_URI env variable.
+            user: Username for Neo4j access.
+                Defaults to NEO4J_MDB_USER env variable.
+            password: Password for user.
+                Defaults to NEO4J_MDB_PASS env variable.
+            max_connection_pool_size: Maximum number of connections held.
+            max_connection_lifetime: Seconds after which a pooled connection
+                is closed and replaced.
+            connection_acquisition_timeout: Seconds to wait for a connection
+                from a full pool before failing.
+            fetch_size: Number of records fetched from the server per batch.
+        """
+        self.uri = uri or os.environ.get("NEO4J_MDB_URI")
+        self.user = user or os.environ.get("NEO4J_MDB_USER")
+        self.password = password or os.environ.get("NEO4J_MDB_PASS")
+        self.driver: AsyncDriver | None = None
+        self.models: dict[str, list[str]] = {}
+        self.latest_version: dict[str, str | None] = {}
+        pool = {
+            "max_connection_pool_size": max_connection_pool_size,
+            "max_connection_lifetime": max_connection_lifetime,
+            "connection_acquisition_timeout": connection_acquisition_timeout,
+            "fetch_size": fetch_size,
+        }
+        self.pool_config = {k: v for k, v in pool.items() if v is not None}
+        try:
+            self.driver = AsyncGraphDatabase.driver(
+                self.uri,
+                auth=(self.user, self.password),
+                **self.pool_config,
+            )
+        except Exception as e:
+            warn(f"MDB not connected: {e}", stacklevel=2)
+
+    async def connect(self) -> AsyncMDB:
+        """
+        Query the database for its models and versions.
+
+        Returns:
+            This object.
+        """
+        try:
+            self.models = {}
+            self.latest_version = {}
+            self._set_model_info(await self.get_model_info())
+        except Exception as e:
+            warn(f"Database doesn't look like an MDB: {e}", stacklevel=2)
+        return self
+
+    async def close(self) -> None:
+        """Close the driver connection."""
+        if self.driver:
+            await self.driver.close()
+
+    async def __aenter__(self) -> AsyncMDB:
+        """Connect on entering an ``async with`` block."""
+        return await self.connect()
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Close the driver on leaving an ``async with`` block."""
+        await self.close()
+
+    _set_model_info = MDB._set_model_info  # noqa: SLF001
+    get_model_handles = MDB.get_model_handles
+    get_model_versions = MDB.get_model_versions
+    get_latest_version = MDB.get_latest_version
+
+    get_model_info = async_read_txn_value(_query_fn(MDB.get_model_info))
+    get_model_nodes = async_read_txn_data(_query_fn(MDB.get_model_nodes))
+    get_nodes_by_model = async_read_txn_value(_query_fn(MDB.get_nodes_by_model))
+    get_model_nodes_edges = async_read_txn_data(_query_fn(MDB.get_model_nodes_edges))
+    get_node_edges_by_node_id = async_read_txn_data(
+        _query_fn(MDB.get_node_edges_by_node_id),
+    )
+    get_node_and_props_by_node_id = async_read_txn_data(
+        _query_fn(MDB.get_node_and_props_by_node_id),
+    )
+    get_nodes_and_props_by_model = async_read_txn_data(
+        _query_fn(MDB.get_nodes_and_props_by_model),
+    )
+    get_prop_node_and_domain_by_prop_id = async_read_txn_data(
+        _query_fn(MDB.get_prop_node_and_domain_by_prop_id),
+    )
+    get_valueset_by_id = async_read_txn_data(_query_fn(MDB.get_valueset_by_id))
+    get_valuesets_by_model = async_read_txn_data(
+        _query_fn(MDB.get_valuesets_by_model),
+    )
+    get_term_by_id = async_read_txn_data(_query_fn(MDB.get_term_by_id))
+    get_props_and_terms_by_model = async_read_txn_data(
+        _query_fn(MDB.get_props_and_terms_by_model),
+    )
+    get_origins = async_read_txn_data(_query_fn(MDB.get_origins))
+    get_origin_by_id = async_read_txn_value(_query_fn(MDB.get_origin_by_id))
+    get_tags_for_entity_by_id = async_read_txn_data(
+        _query_fn(MDB.get_tags_for_entity_by_id),
+    )
+    get_tags_and_values = async_read_txn_data(_query_fn(MDB.get_tags_and_values))
+    get_entities_by_tag = async_read_txn_data(_query_fn(MDB.get_entities_by_tag))
+    get_with_statement = async_read_txn_data(_query_fn(MDB.get_with_statement))
+
+
+class AsyncSearchableMDB(AsyncMDB):
+    """:class:`AsyncMDB` subclass for searching fulltext indices on an MDB."""
+
+    def __init__(
+        self,
+        uri: str | None = None,
+        user: str | None = None,
+        password: str | None = None,
+        **pool_config: Any,  # noqa: ANN401
+    ) -> None:
+        """Initialize an :class:`AsyncSearchableMDB` object."""
+        super().__init__(uri=uri, user=user, password=password, **pool_config)
+        self.ftindexes = {}
+
+    async def connect(self) -> AsyncSearchableMDB:
+        """
+        Query the database for its models and versions, and its fulltext indexes.
+
+        Returns:
+            This object.
+        """
+        await super().connect()
+        self.ftindexes = {}
+        async with self.driver.session() as s:
+            result = await s.run("call db.indexes")
+            self._set_ftindexes([rec async for rec in result])
+        return self
+
+    _set_ftindexes = SearchableMDB._set_ftindexes  # noqa: SLF001
+    available_indexes = SearchableMDB.available_indexes
+
+    query_index = async_read_txn_data(_query_fn(SearchableMDB.query_index))
+
+    async def search_entity_handles(
+        self,
+        qstring: str,
+    ) -> dict[str, list[dict[str, Any]]] | None:
+        """
+        Fulltext search of qstring over node, relationship, and property handles.
+
+        Args:
+            qstring: Lucene query string.
+
+        Returns:
+            Dict with nodes, relationships, properties, each containing list of dicts
+            with ent (entity dict) and score (lucene score).
+        """
+        return SearchableMDB._by_entity_type(  # noqa: SLF001
+            await self.query_index("entityHandle", qstring),
+        )
+
+    async def search_terms(
+        self,
+        qstring: str,
+        *,
+        search_values: bool = True,
+        search_definitions: bool = True,
+    ) -> list[dict[str, Any]] | None:
+        """
+        Fulltext search for qstring over terms, by value, definition, or both (default).
+
+        Args:
+            qstring: Lucene query string.
+            search_values: If True, search term values.
+            search_definitions: If True, search term definitions.
+
+        Returns:
+            List of dicts with ent (term dict) and score (lucene score).
+        """
+        return await self.query_index(
+            TERM_INDEXES[search_definitions][search_values],
+            qstring,
+        )
+
+
+class AsyncWriteableMDB(AsyncMDB):
+    """:class:`AsyncMDB` subclass for writing to an MDB."""
+
+    put_with_statement = async_write_txn(_query_fn(WriteableMDB.put_with_statement))
+    put_term_with_origin = async_write_txn(
+        _query_fn(WriteableMDB.put_term_with_origin),
+    )
+
+    async def put_with_statements(
+        self,
+        stmts: list[tuple[str, dict[str, Any] | None]],
+    ) -> list[Record]:
+        """
+        Run a list of arbitrary write statements in a single transaction.
+
+        If any statement fails, the transaction is rolled back and none of
+        the statements take effect.
+
+        Args:
+            stmts: List of (qry_string, param_dict) tuples, run in order.
+
+        Returns:
+            List of Records returned by the last statement.
+        """
+        for qry, parms in stmts:
+            if not isinstance(qry, str):
+                msg = "qry= must be a string"
+                raise TypeError(msg)
+            if parms is not None and not isinstance(parms, dict):
+                msg = "parms= must be a dict"
+                raise TypeError(msg)
+
+        async def txn_q(tx: AsyncManagedTransaction) -> list[Record]:
+            result = []
+            for qry, parms in stmts:
+                res = await tx.run(cast("LiteralString", qry), parameters=parms or {})
+                result = [rec async for rec in res]
+            return result
+
+        async with self.driver.session() as session:
+            return await session.execute_write(txn_q)
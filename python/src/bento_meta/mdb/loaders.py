@@ -4,7 +4,7 @@ mdb.loaders: load models into an MDB instance consistently
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Protocol
+from typing import TYPE_CHECKING, Any, Protocol
 
 from minicypher.clauses import (
     Create,
@@ -14,6 +14,7 @@ from minicypher.clauses import (
 )
 from minicypher.entities import N, R, _plain_var
 from minicypher.statement import Statement
+from neo4j.exceptions import Neo4jError
 from tqdm import tqdm
 
 from bento_meta.mdb.writeable import WriteableMDB
@@ -36,21 +37,112 @@ class MDFProtocol(Protocol):
     model: Model
 
 
-def load_mdf(mdf: MDFProtocol, mdb: WriteableMDB, _commit: str | None = None) -> None:
-    """Load an MDF object into an MDB instance."""
-    load_model(mdf.model, mdb, _commit)
+# default number of rows sent with each UNWIND statement in bulk mode
+BULK_BATCH_SIZE = 1000
 
 
-def load_model(model: Model, mdb: WriteableMDB, _commit: str | None = None) -> None:
-    """Load a model object into an MDB instance."""
+def load_mdf(
+    mdf: MDFProtocol,
+    mdb: WriteableMDB,
+    _commit: str | None = None,
+    *,
+    bulk: bool = False,
+    batch_size: int = BULK_BATCH_SIZE,
+    transactional: bool = False,
+    txn_size: int | None = None,
+) -> None:
+    """Load an MDF object into an MDB instance. See :func:`load_model`."""
+    load_model(
+        mdf.model,
+        mdb,
+        _commit,
+        bulk=bulk,
+        batch_size=batch_size,
+        transactional=transactional,
+        txn_size=txn_size,
+    )
+
+
+def load_model(
+    model: Model,
+    mdb: WriteableMDB,
+    _commit: str | None = None,
+    *,
+    bulk: bool = False,
+    batch_size: int = BULK_BATCH_SIZE,
+    transactional: bool = False,
+    txn_size: int | None = None,
+) -> None:
+    """
+    Load a model object into an MDB instance.
+
+    By default, one statement per entity and relationship is run, each in its
+    own transaction. With bulk=True, entities with the same label and
+    relationships of the same type are written together by a small number of
+    UNWIND statements (see :func:`load_model_bulk_statements`). The resulting
+    graph is the same.
+
+    With transactional=True (implied by bulk=True or by giving txn_size),
+    the statements run in explicit transactions of txn_size statements each.
+    If the database rejects a statement, its transaction is rolled back and
+    a RuntimeError is raised; transactions already committed are not
+    undone. Use txn_size=None to load the model all-or-nothing in a single
+    transaction.
+
+    Args:
+        model: Model instance for loading.
+        mdb: WriteableMDB instance to load into.
+        _commit: 'Commit string' for marking entities in DB.
+        bulk: If True, load with batched UNWIND statements.
+        batch_size: (bulk only) Maximum number of rows per UNWIND statement.
+        transactional: If True, run statements in explicit transactions.
+        txn_size: Number of statements committed per transaction; implies
+            transactional=True. If None, all statements run in a single
+            transaction.
+    """
     if not isinstance(mdb, WriteableMDB):
         msg = "mdb object must be a WriteableMDB"
         raise TypeError(msg)
+    if txn_size is not None and txn_size < 1:
+        msg = "txn_size must be a positive integer or None"
+        raise ValueError(msg)
+    if bulk:
+        stmts = load_model_bulk_statements(model, _commit, batch_size=batch_size)
+        _run_in_txns(mdb, stmts, txn_size)
+        return
     cstmts = load_model_statements(model, _commit)
+    if transactional or txn_size is not None:
+        _run_in_txns(mdb, [(str(x), x.params) for x in cstmts], txn_size)
+        return
     for stmt in tqdm(cstmts):
         mdb.put_with_statement(str(stmt), stmt.params)
 
 
+def _run_in_txns(
+    mdb: WriteableMDB,
+    stmts: list[tuple[str, dict[str, Any]]],
+    txn_size: int | None,
+) -> None:
+    """Run statements in order, txn_size per transaction, with progress per chunk."""
+    if not stmts:
+        return
+    if not txn_size:
+        txn_size = len(stmts)
+    with tqdm(total=len(stmts)) as pbar:
+        for i in range(0, len(stmts), txn_size):
+            chunk = stmts[i : i + txn_size]
+            try:
+                mdb.put_with_statements(chunk)
+            except Neo4jError as e:
+                msg = (
+                    f"load failed in transaction {i // txn_size + 1}: statements "
+                    f"{i + 1}-{i + len(chunk)} rolled back; "
+                    f"{i} of {len(stmts)} statements were committed"
+                )
+                raise RuntimeError(msg) from e
+            pbar.update(len(chunk))
+
+
 def load_model_statements(model: Model, _commit: str | None = None) -> list[Statement]:
     """
     Create Cypher statements from a model to load it de novo into an MDB instance.
@@ -329,3 +421,226 @@ def _annotate_statements(
             ],
         )
     return stmts
+
+
+class _BulkRows:
+    """
+    Accumulate parameter rows for bulk (UNWIND) loading, grouped by pattern.
+
+    Rows are grouped by entity label and the set of property keys present,
+    since a MERGE or MATCH pattern must name a fixed set of properties.
+    Identical rows within a group are dropped.
+    """
+
+    def __init__(self) -> None:
+        self.groups: dict[tuple, dict[tuple, dict[str, Any]]] = {}
+
+    def add(self, kind: str, *spec: Any, row: dict[str, Any]) -> None:  # noqa: ANN401
+        """Add a row to the group identified by kind and spec."""
+        key = (kind, *spec)
+        if key not in self.groups:
+            self.groups[key] = {}
+        self.groups[key][_row_key(row)] = row
+
+    def statements(
+        self,
+        kinds: list[str],
+        batch_size: int,
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """Render accumulated groups of the given kinds, in order, as statements."""
+        stmts = []
+        for kind in kinds:
+            for key, rows in self.groups.items():
+                if key[0] != kind:
+                    continue
+                qry = _BULK_TEMPLATES[kind](*key[1:])
+                rowl = list(rows.values())
+                stmts.extend(
+                    (qry, {"rows": rowl[i : i + batch_size]})
+                    for i in range(0, len(rowl), batch_size)
+                )
+        return stmts
+
+
+def _row_key(row: dict[str, Any]) -> tuple:
+    return tuple(
+        (k, _row_key(v) if isinstance(v, dict) else v) for k, v in sorted(row.items())
+    )
+
+
+def _props(c_ent: N) -> dict[str, Any]:
+    return {h: p.value for h, p in c_ent.props.items() if p.value is not None}
+
+
+def _pat(var: str, label: str, keys: tuple[str, ...], row: str = "row") -> str:
+    pmap = ", ".join(f"`{k}`: {row}.`{k}`" for k in keys)
+    return f"({var}:{label} {{{pmap}}})" if pmap else f"({var}:{label})"
+
+
+_BULK_TEMPLATES = {
+    "merge": lambda lbl, keys: (
+        f"UNWIND $rows AS row MERGE {_pat('n', lbl, keys)}"
+    ),
+    "create": lambda lbl, keys: (
+        f"UNWIND $rows AS row CREATE {_pat('n', lbl, keys)}"
+    ),
+    "link": lambda slbl, skeys, rtype, dlbl, dkeys: (
+        "UNWIND $rows AS row "
+        f"MATCH {_pat('s', slbl, skeys, 'row.s')}, {_pat('d', dlbl, dkeys, 'row.d')} "
+        f"MERGE (s)-[:{rtype}]->(d)"
+    ),
+    "merge_link": lambda slbl, skeys, rtype, dlbl, dkeys: (
+        "UNWIND $rows AS row "
+        f"MATCH {_pat('s', slbl, skeys, 'row.s')} "
+        f"MERGE (s)-[:{rtype}]->{_pat('d', dlbl, dkeys, 'row.d')}"
+    ),
+    "represents": lambda elbl, ekeys, ckeys, tkeys: (
+        "UNWIND $rows AS row "
+        f"MATCH {_pat('e', elbl, ekeys, 'row.e')}-[:has_concept]->"
+        f"{_pat('c', 'concept', ckeys, 'row.c')}, "
+        f"{_pat('t', 'term', tkeys, 'row.t')} "
+        "MERGE (t)-[:represents]->(c)"
+    ),
+    "unmark": lambda lbl, keys: (
+        f"UNWIND $rows AS row MATCH {_pat('n', lbl, keys)} REMOVE n.__u"
+    ),
+}
+
+
+def _bulk_link(
+    rows: _BulkRows,
+    kind: str,
+    c_src: N,
+    rtype: str,
+    c_dst: N,
+) -> None:
+    s, d = _props(c_src), _props(c_dst)
+    rows.add(
+        kind,
+        c_src.label,
+        tuple(sorted(s)),
+        rtype,
+        c_dst.label,
+        tuple(sorted(d)),
+        row={"s": s, "d": d},
+    )
+
+
+def _bulk_merge(rows: _BulkRows, c_ent: N, kind: str = "merge") -> None:
+    p = _props(c_ent)
+    rows.add(kind, c_ent.label, tuple(sorted(p)), row=p)
+
+
+def _bulk_entity_rows(
+    rows: _BulkRows,
+    ent: Entity,
+    c_ent: N,
+    model: Model,
+    _commit: str | None,
+) -> None:
+    """Add rows for the tags, properties and concept annotation of a node or edge."""
+    for t in ent.tags.values():
+        _bulk_link(rows, "merge_link", c_ent, "has_tag", _c_entity(t, None, _commit))
+    for p in ent.props.values():
+        c_prop = _c_entity(p, model, _commit)
+        c_prop._add_props({"value_domain": p.value_domain})
+        _bulk_merge(rows, c_prop)
+        _bulk_link(rows, "link", c_ent, "has_property", c_prop)
+        for t in p.tags.values():
+            _bulk_link(
+                rows, "merge_link", c_prop, "has_tag", _c_entity(t, None, _commit)
+            )
+    _bulk_annotate_rows(rows, ent, c_ent, _commit)
+
+
+def _bulk_annotate_rows(
+    rows: _BulkRows,
+    ent: Entity,
+    c_ent: N,
+    _commit: str | None,
+) -> None:
+    if not ent.concept:
+        return
+    c_concept = _c_entity(ent.concept, None, _commit)
+    e, c = _props(c_ent), _props(c_concept)
+    for tm in ent.concept.terms.values():
+        c_term = _c_entity(tm, None, _commit)
+        t = _props(c_term)
+        _bulk_merge(rows, c_term)
+        _bulk_link(rows, "merge_link", c_ent, "has_concept", c_concept)
+        rows.add(
+            "represents",
+            c_ent.label,
+            tuple(sorted(e)),
+            tuple(sorted(c)),
+            tuple(sorted(t)),
+            row={"e": e, "c": c, "t": t},
+        )
+
+
+def load_model_bulk_statements(
+    model: Model,
+    _commit: str | None = None,
+    *,
+    batch_size: int = BULK_BATCH_SIZE,
+) -> list[tuple[str, dict[str, Any]]]:
+    """
+    Create batched UNWIND statements to load a model de novo into an MDB instance.
+
+    Produces the same graph as the statements from :func:`load_model_statements`,
+    but entities with the same label (and relationships of the same type) are
+    collected into parameter lists and written with one statement per group.
+
+    :param :class:`mdb.Model` model: Model instance for loading
+    :param str _commit: 'Commit string' for marking entities in DB. If set,
+        this will override _commit attributes already existing on Model entities.
+    :param int batch_size: maximum number of rows per statement
+    :return: list of (query string, parameter dict) tuples, in execution order
+    """
+    if batch_size < 1:
+        msg = "batch_size must be a positive integer"
+        raise ValueError(msg)
+    # order of kinds in each phase respects the dependencies between statements
+    node_kinds = ["merge", "link", "merge_link", "represents"]
+    edge_kinds = ["create", "merge", "link", "merge_link", "represents", "unmark"]
+
+    stmts = []
+    rows = _BulkRows()
+    for node in model.nodes.values():
+        _bulk_merge(rows, _c_entity(node, model, _commit))
+    stmts.extend(rows.statements(["merge"], batch_size))
+
+    rows = _BulkRows()
+    for node in model.nodes.values():
+        _bulk_entity_rows(rows, node, _c_entity(node, model, _commit), model, _commit)
+    stmts.extend(rows.statements(node_kinds, batch_size))
+
+    rows = _BulkRows()
+    for rl, edge in model.edges.items():
+        c_edge = _c_entity(edge, model, _commit)
+        if edge.multiplicity:
+            c_edge._add_props({"multiplicity": edge.multiplicity})
+        if edge.is_required:
+            c_edge._add_props({"is_required": edge.is_required})
+        # ensure uniqueness for match
+        c_edge._add_props({"__u": str(rl)})
+        _bulk_merge(rows, c_edge, kind="create")
+        for end, rtype in ((edge.src, "has_src"), (edge.dst, "has_dst")):
+            _bulk_link(rows, "link", c_edge, rtype, _c_entity(end, model, _commit))
+        _bulk_entity_rows(rows, edge, c_edge, model, _commit)
+        _bulk_merge(rows, c_edge, kind="unmark")
+    stmts.extend(rows.statements(edge_kinds, batch_size))
+
+    rows = _BulkRows()
+    for pr in [x for x in model.props.values() if x.value_domain == "value_set"]:
+        c_value_set = _c_entity(pr.value_set, model, _commit)
+        c_prop = _c_entity(pr, model, _commit)
+        _bulk_merge(rows, c_value_set)
+        _bulk_link(rows, "link", c_prop, "has_value_set", c_value_set)
+        _bulk_annotate_rows(rows, pr, c_prop, _commit)
+        for tm in pr.terms.values():
+            c_term = _c_entity(tm, model, _commit)
+            _bulk_merge(rows, c_term)
+            _bulk_link(rows, "link", c_value_set, "has_term", c_term)
+    stmts.extend(rows.statements(node_kinds, batch_size))
+    return stmts
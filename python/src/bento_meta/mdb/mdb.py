@@ -10,12 +10,43 @@ The attribute models : Dict contains model handles (names) as keys,
 and a list of version strings as values.
 The attribute latest_version : Dict contains model handles as keys
 and the version string tagged "is_latest" as values.
+
+Each query method runs in its own driver session, unless it is called
+within :meth:`MDB.session_scope`; then the calls share one session, and
+each sees the writes of those before it (the session chains their
+bookmarks). The size of the driver's connection pool and related
+settings can be given to the constructor.
+
+The results of the read methods decorated with :func:`read_txn_value` and
+:func:`read_txn_data` can be cached, by giving the constructor a
+:class:`bento_meta.cache.ResultCache`. Entries are keyed on method name and
+query parameters. :class:`bento_meta.mdb.WriteableMDB` writes invalidate
+the entries of the model written to, or of all models if a write has no
+"model" parameter.
+
+Methods named ``iter_*`` (made with :func:`read_txn_iter`) are streaming
+counterparts of read methods: they return generators that yield records
+as they are fetched from the server, rather than lists of all of them.
+
+Methods that list many entities (:meth:`MDB.get_model_nodes`,
+:meth:`MDB.get_valuesets_by_model`, :meth:`MDB.get_props_and_terms_by_model`,
+:meth:`MDB.get_entities_by_tag`, :meth:`MDB.get_origins`) take ``limit`` and
+``after`` arguments, for keyset pagination: a page holds at most ``limit``
+entities, ordered by nanoid (Model nodes, which have no nanoid, by handle
+and version), that sort after ``after``. Entity versions share a nanoid, so
+the database id breaks ties. Each record of a page has a ``cursor`` value,
+a list of the sort keys of its entity; ``after`` is the cursor of the last
+record of the previous page. :meth:`MDB.paginate` iterates over the pages
+of any of these methods.
 """
 
 from __future__ import annotations
 
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from functools import wraps
 from typing import (
     TYPE_CHECKING,
@@ -28,17 +59,122 @@ from typing import (
 from warnings import warn
 
 from nanoid import generate as nanoid_generate
-from neo4j import Driver, GraphDatabase, ManagedTransaction, Record
+from neo4j import READ_ACCESS, Driver, GraphDatabase, ManagedTransaction, Record
 from typing_extensions import LiteralString
 
+from bento_meta.cache import ResultCache
+
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Generator, Iterator
+
+    from neo4j import Session
 
 # Type variables for proper decorator typing
 P = ParamSpec("P")
 T = TypeVar("T")
 
 
+_MISSING = object()
+
+# paged methods: the cursor to pass as after= for the page following a page
+PAGE_CURSORS: dict[str, Callable[[list[dict[str, Any]]], list]] = {
+    "get_model_nodes": lambda page: page[-1]["cursor"],
+    "get_valuesets_by_model": lambda page: page[-1]["cursor"],
+    "get_props_and_terms_by_model": lambda page: page[-1]["cursor"],
+    "get_entities_by_tag": lambda page: max(rec["cursor"] for rec in page),
+    "get_origins": lambda page: page[-1]["cursor"],
+}
+
+# sort keys of paged entities, as templates on the entity variable; the
+# database id is appended to make the order total
+NANOID_KEYS = ("{}.nanoid",)
+MODEL_KEYS = ("{}.handle", "coalesce({}.version, '')")
+
+
+def _keyset(
+    cond: str,
+    var: str,
+    after: list | tuple | None,
+    limit: int | None,
+    parms: dict[str, Any],
+    keys: tuple[str, ...] = NANOID_KEYS,
+    tiebreak: tuple[str, ...] = (),
+    *,
+    grouped: bool = False,
+) -> tuple[str, str, str, str]:
+    """
+    Add keyset pagination to a query.
+
+    Args:
+        cond: The query's WHERE clause, or "".
+        var: The variable of the paged entities.
+        after: Cursor (sort keys) after which the page starts.
+        limit: Maximum number of rows in the page.
+        parms: The query's parameters, to which after and limit are added.
+        keys: Sort keys of the entities, as templates on var.
+        tiebreak: Further sort keys, after the id of var, for queries in
+            which an entity can be on more than one row.
+        grouped: Whether the paged entities are aggregated in the return
+            clause; if so, the cursor returned is that of the last entity.
+
+    Returns:
+        The WHERE clause with a condition on the sort keys added, the
+        ORDER BY clause, the LIMIT clause, and a cursor column for the
+        return clause. All but the first are "" if the query is not paged.
+    """
+    if after is None and limit is None:
+        return (cond, "", "", "")
+    exprs = [k.format(var) for k in keys] + [f"id({var})", *tiebreak]
+    if after is not None:
+        if not isinstance(after, (list, tuple)) or len(after) != len(exprs):
+            msg = f"after must be a cursor of {len(exprs)} sort keys"
+            raise ValueError(msg)
+        parms["after"] = list(after)
+        # lexicographic (k0, k1, ...) > ($after[0], $after[1], ...)
+        after_cond = " or ".join(
+            "("
+            + " and ".join(
+                [f"{exprs[j]} = $after[{j}]" for j in range(i)]
+                + [f"{exprs[i]} > $after[{i}]"]
+            )
+            + ")"
+            for i in range(len(exprs))
+        )
+        cond = cond.strip()
+        cond = f"{cond} and ({after_cond})" if cond else f"where ({after_cond})"
+    order = "order by " + ", ".join(exprs)
+    lim = ""
+    if limit is not None:
+        if not isinstance(limit, int) or limit < 1:
+            msg = "limit must be a positive integer"
+            raise ValueError(msg)
+        parms["limit"] = limit
+        lim = " limit $limit"
+    cursor = f"[{', '.join(exprs)}]"
+    cursor = f", last(collect({cursor})) as cursor" if grouped else f", {cursor} as cursor"
+    return (cond, order, lim, cursor)
+
+
+def _cached_read(
+    mdb: MDB,
+    name: str,
+    qry: str,
+    parms: dict[str, Any] | None,
+    run: Callable[[], Any],
+) -> Any:  # noqa: ANN401
+    """Return the cached result of a read, or run it and cache the result."""
+    cache = mdb.result_cache
+    if cache is None:
+        return run()
+    key = ResultCache.key(name, qry, parms)
+    result = cache.get(key, _MISSING)
+    if result is _MISSING:
+        result = run()
+        cache.put(key, result, parms)
+    # callers may modify the list they get, but not the cached one
+    return list(result) if result is not None else None
+
+
 # Decorator functions to produce executed transactions based on an
 # underlying query/param function:
 def read_txn(
@@ -63,7 +199,7 @@ def read_txn(
             result = tx.run(cast("LiteralString", qry), parameters=parms)
             return list(result)
 
-        with self.driver.session() as session:
+        with self.session() as session:
             return session.execute_read(txn_q)
 
     return rd
@@ -86,13 +222,17 @@ def read_txn_value(
 
     @wraps(func)
     def rd(self: MDB, *args: P.args, **kwargs: P.kwargs) -> list[Any]:
+        (qry, parms, values_key) = func(self, *args, **kwargs)
+
         def txn_q(tx: ManagedTransaction) -> list[Any]:
-            (qry, parms, values_key) = func(self, *args, **kwargs)
             result = tx.run(cast("LiteralString", qry), parameters=parms)
             return result.value(values_key)
 
-        with self.driver.session() as session:
-            return session.execute_read(txn_q)
+        def run() -> list[Any]:
+            with self.session() as session:
+                return session.execute_read(txn_q)
+
+        return _cached_read(self, func.__name__, qry, parms, run)
 
     return rd
 
@@ -120,11 +260,69 @@ def read_txn_data(
             result = tx.run(cast("LiteralString", qry), parameters=parms)
             return result.data()
 
-        with self.driver.session() as session:
-            result = session.execute_read(txn_q)
-            if len(result):
-                return result
-            return None
+        def run() -> list[dict[str, Any]] | None:
+            with self.session() as session:
+                result = session.execute_read(txn_q)
+                if len(result):
+                    return result
+                return None
+
+        return _cached_read(self, func.__name__, qry, parms, run)
+
+    return rd
+
+
+def read_txn_iter(
+    func: Callable[Concatenate[MDB, P], tuple],
+) -> Callable[..., Iterator[Any]]:
+    """
+    Decorate a query function to stream the results of a read transaction.
+
+    Query function should return a tuple (qry_string, param_dict), or
+    (qry_string, param_dict, values_key), as for :func:`read_txn_data` or
+    :func:`read_txn_value`.
+
+    The decorated function takes an additional keyword argument fetch_size,
+    the number of records to fetch from the server at a time (default: the
+    MDB's fetch_size setting, or the driver's default). It returns a
+    generator, which holds a session and transaction open until it is
+    exhausted or closed. The session is its own, not that of an enclosing
+    :meth:`MDB.session_scope`, so that other MDB calls can be made while
+    records are consumed.
+
+    Args:
+        func: The query function to decorate.
+
+    Returns:
+        Decorated function that returns an iterator over simple dicts (or
+        over the values for the key specified by the query function).
+    """
+
+    @wraps(func)
+    def rd(
+        self: MDB,
+        *args: P.args,
+        fetch_size: int | None = None,
+        **kwargs: P.kwargs,
+    ) -> Iterator[Any]:
+        (qry, parms, *values_key) = func(self, *args, **kwargs)
+        config = {"default_access_mode": READ_ACCESS}
+        if fetch_size is not None:
+            config["fetch_size"] = fetch_size
+
+        def gen() -> Iterator[Any]:
+            with self.driver.session(**config) as session:
+                with session.begin_transaction() as tx:
+                    result = tx.run(cast("LiteralString", qry), parameters=parms)
+                    if values_key:
+                        for rec in result:
+                            yield rec[values_key[0]]
+                    else:
+                        for rec in result:
+                            yield rec.data()
+
+        # query function errors are raised here, rather than on first next()
+        return gen()
 
     return rd
 
@@ -137,10 +335,19 @@ class MDB:
         uri: str | None = None,
         user: str | None = None,
         password: str | None = None,
+        *,
+        max_connection_pool_size: int | None = None,
+        max_connection_lifetime: float | None = None,
+        connection_acquisition_timeout: float | None = None,
+        fetch_size: int | None = None,
+        result_cache: ResultCache | None = None,
     ) -> None:
         """
         Create an MDB object, with a connection to a Neo4j instance of a metamodel database.
 
+        The keyword arguments other than result_cache configure the driver's
+        connection pool; when None, the driver's default is used.
+
         Args:
             uri: The Bolt protocol endpoint to the Neo4j instance.
                 Defaults to NEO4J_MDB_URI env variable.
@@ -148,6 +355,14 @@ class MDB:
                 Defaults to NEO4J_MDB_USER env variable.
             password: Password for user.
                 Defaults to NEO4J_MDB_PASS env variable.
+            max_connection_pool_size: Maximum number of connections held.
+            max_connection_lifetime: Seconds after which a pooled connection
+                is closed and replaced.
+            connection_acquisition_timeout: Seconds to wait for a connection
+                from a full pool before failing.
+            fetch_size: Number of records fetched from the server per batch.
+            result_cache: Cache for the results of read methods; if None,
+                results are not cached.
         """
         self.uri = uri or os.environ.get("NEO4J_MDB_URI")
         self.user = user or os.environ.get("NEO4J_MDB_USER")
@@ -155,42 +370,97 @@ class MDB:
         self.driver: Driver | None = None
         self.models: dict[str, list[str]] = {}
         self.latest_version: dict[str, str | None] = {}
+        pool = {
+            "max_connection_pool_size": max_connection_pool_size,
+            "max_connection_lifetime": max_connection_lifetime,
+            "connection_acquisition_timeout": connection_acquisition_timeout,
+            "fetch_size": fetch_size,
+        }
+        self.pool_config = {k: v for k, v in pool.items() if v is not None}
+        self._scope = threading.local()
+        self.result_cache = result_cache
         try:
             self.driver = GraphDatabase.driver(
                 self.uri,
                 auth=(self.user, self.password),
+                **self.pool_config,
             )
         except Exception as e:
             warn(f"MDB not connected: {e}", stacklevel=2)
         try:
             # query DB and cache the models and their versions in the MDB object
-            info = self.get_model_info()
-            if not info or len(info) == 0:
-                msg = "No Model nodes found"
-                raise RuntimeError(msg)
-            for m in info:
-                if self.models.get(m["handle"]):
-                    self.models[m["handle"]].append(m["version"])
-                else:
-                    self.models[m["handle"]] = [m["version"]]
-                if m["is_latest_version"] and not self.latest_version.get(m["handle"]):
-                    self.latest_version[m["handle"]] = m["version"]
-            for hdl in self.models:
-                if not self.latest_version.get(hdl):
-                    if len(self.models[hdl]) == 1:  # only one version
-                        self.latest_version[hdl] = self.models[hdl][0] or "unversioned"
-                    else:
-                        self.latest_version[hdl] = None
+            self._set_model_info(self.get_model_info())
         except Exception as e:
             # raise RuntimeError
             warn(f"Database doesn't look like an MDB: {e}", stacklevel=2)
         self._txfns = {}
 
+    def _set_model_info(self, info: list[Any] | None) -> None:
+        """Cache the models and their versions, given the Model nodes from the db."""
+        if not info or len(info) == 0:
+            msg = "No Model nodes found"
+            raise RuntimeError(msg)
+        for m in info:
+            if self.models.get(m["handle"]):
+                self.models[m["handle"]].append(m["version"])
+            else:
+                self.models[m["handle"]] = [m["version"]]
+            if m["is_latest_version"] and not self.latest_version.get(m["handle"]):
+                self.latest_version[m["handle"]] = m["version"]
+        for hdl in self.models:
+            if not self.latest_version.get(hdl):
+                if len(self.models[hdl]) == 1:  # only one version
+                    self.latest_version[hdl] = self.models[hdl][0] or "unversioned"
+                else:
+                    self.latest_version[hdl] = None
+
     def close(self) -> None:
         """Close the driver connection."""
         if self.driver:
             self.driver.close()
 
+    @contextmanager
+    def session(self) -> Generator[Session, None, None]:
+        """
+        Context providing a driver session for a query.
+
+        This is the session of an enclosing :meth:`session_scope` in the
+        current thread if there is one; otherwise, a new session that is
+        closed on exit.
+        """
+        scoped = getattr(self._scope, "session", None)
+        if scoped is not None:
+            yield scoped
+            return
+        with self.driver.session() as session:
+            yield session
+
+    @contextmanager
+    def session_scope(self) -> Generator[Session, None, None]:
+        """
+        Context in which MDB calls in the current thread share one driver session.
+
+        Sharing a session saves the cost of opening one per call, and makes
+        each call see the writes of those before it. Nested scopes use the
+        outermost session. Other threads are not affected::
+
+          with mdb.session_scope():
+              for nanoid in term_ids:
+                  mdb.get_term_by_id(nanoid)
+
+        Yields:
+            The shared session.
+        """
+        with self.session() as session:
+            if getattr(self._scope, "session", None) is session:  # nested
+                yield session
+                return
+            self._scope.session = session
+            try:
+                yield session
+            finally:
+                self._scope.session = None
+
     def register_txfn(self, name: str, fn: Callable) -> None:
         """
         Register a transaction function with the class for later use.
@@ -253,6 +523,8 @@ class MDB:
     def get_model_nodes(
         self,
         model: str | None = None,
+        limit: int | None = None,
+        after: list | tuple | None = None,
     ) -> list[dict[str, Any]] | None:
         """
         Return a list of dicts representing Model nodes.
@@ -261,14 +533,25 @@ class MDB:
 
         Args:
             model: Optional model handle to filter by.
+            limit: Maximum number of Model nodes to return.
+            after: Return Model nodes after this cursor: the cursor value of
+                the last record of the previous page. See :meth:`paginate`.
+                Model nodes are paged by handle and version.
 
         Returns:
             List of dicts representing Model nodes, or None if not found.
         """
-        qry = ("match (m:model) {} return m").format(
+        parms = {"model": model} if model else {}
+        (cond, order, lim, cursor) = _keyset(
             "where m.handle = $model" if model else "",
+            "m",
+            after,
+            limit,
+            parms,
+            keys=MODEL_KEYS,
         )
-        return (qry, {"model": model} if model else None)  # type: ignore[reportReturnType]
+        qry = f"match (m:model) {cond} return m{cursor} {order}{lim}".rstrip()
+        return (qry, parms or None)  # type: ignore[reportReturnType]
 
     @read_txn_value  # type: ignore[reportArgumentType]
     def get_nodes_by_model(
@@ -477,6 +760,8 @@ class MDB:
         self,
         model: str | None = None,
         version: str | None = None,
+        limit: int | None = None,
+        after: list | tuple | None = None,
     ) -> list[dict[str, Any]] | None:
         """
         Get all valuesets that are used by properties in the given model and version.
@@ -487,6 +772,9 @@ class MDB:
             model: Model handle to get valuesets for. If None, get all valuesets.
             version: Version to filter by. If None, get value sets associated with
                 latest model version. If '*', get those associated with all versions.
+            limit: Maximum number of valuesets to return.
+            after: Return valuesets after this cursor: the cursor value of the
+                last record of the previous page. See :meth:`paginate`.
 
         Returns:
             List of dicts with value_set, props[].
@@ -505,6 +793,18 @@ class MDB:
         else:
             cond = ""
 
+        (pcond, order, lim, cursor) = _keyset(cond, "vs", after, limit, parms)
+        if order:
+            # page the value sets, then get the properties of each
+            qry = (
+                "match (vs:value_set)<-[:has_value_set]-(p:property) "
+                f"{pcond} "
+                f"with distinct vs {order}{lim} "
+                "return vs as value_set, "
+                f"[(vs)<-[:has_value_set]-(p:property) {cond} | p] as props{cursor} "
+                f"{order}"
+            )
+            return (qry, parms)  # type: ignore[reportReturnType]
         qry = (
             "match (vs:value_set)<-[:has_value_set]-(p:property) "
             f"{cond} "
@@ -536,6 +836,8 @@ class MDB:
         self,
         model: str | None = None,
         version: str | None = None,
+        limit: int | None = None,
+        after: list | tuple | None = None,
     ) -> list[dict[str, Any]] | None:
         """
         Get terms from valuesets associated with properties in a model and version.
@@ -546,6 +848,9 @@ class MDB:
             model: Model handle to get props and terms for. If None, get all terms.
             version: Version to filter by. If None, get props and terms from the
                 latest model version. If '*', get those from all versions.
+            limit: Maximum number of properties to return.
+            after: Return properties after this cursor: the cursor value of the
+                last record of the previous page. See :meth:`paginate`.
 
         Returns:
             List of dicts with prop, terms[].
@@ -563,6 +868,19 @@ class MDB:
                 parms = {"model": model, "version": version}
         else:
             cond = ""
+        (pcond, order, lim, cursor) = _keyset(cond, "p", after, limit, parms)
+        if order:
+            # page the properties, then get the terms of each
+            qry = (
+                "match (p:property)-[:has_value_set]->(v:value_set)"
+                "-[:has_term]->(t:term) "
+                f"{pcond} "
+                f"with distinct p {order}{lim} "
+                "return p as prop, "
+                "[(p)-[:has_value_set]->(:value_set)-[:has_term]->(t:term) | t] "
+                f"as terms{cursor} {order}"
+            )
+            return (qry, parms)  # type: ignore[reportReturnType]
         qry = (
             "match (p:property)-[:has_value_set]->(v:value_set)"
             "-[:has_term]->(t:term) "
@@ -572,15 +890,26 @@ class MDB:
         return (qry, parms)  # type: ignore[reportReturnType]
 
     @read_txn_data  # type: ignore[reportArgumentType]
-    def get_origins(self) -> list[dict[str, Any]] | None:
+    def get_origins(
+        self,
+        limit: int | None = None,
+        after: list | tuple | None = None,
+    ) -> list[dict[str, Any]] | None:
         """
         Get all origins.
 
+        Args:
+            limit: Maximum number of origins to return.
+            after: Return origins after this cursor: the cursor value of the
+                last record of the previous page. See :meth:`paginate`.
+
         Returns:
             List of origin dicts.
         """
-        qry = "match (o:origin) return o"
-        return (qry, None)  # type: ignore[reportReturnType]
+        parms = {}
+        (cond, order, lim, cursor) = _keyset("", "o", after, limit, parms)
+        qry = f"match (o:origin) {cond} return o{cursor} {order}{lim}".rstrip()
+        return (qry, parms or None)  # type: ignore[reportReturnType]
 
     @read_txn_value  # type: ignore[reportArgumentType]
     def get_origin_by_id(self, oid: str) -> list[dict[str, Any]] | None:
@@ -638,13 +967,22 @@ class MDB:
         self,
         key: str,
         value: str | None = None,
+        limit: int | None = None,
+        after: list | tuple | None = None,
     ) -> list[dict[str, Any]] | None:
         """
         Get all entities, tagged with a given key or key:value pair.
 
+        When paged, a page holds at most limit (tag, entity) pairs, grouped
+        by tag; entities without a nanoid are not returned.
+
         Args:
             key: Tag key to filter by.
             value: Optional tag value to filter by.
+            limit: Maximum number of (tag, entity) pairs to return.
+            after: Return (tag, entity) pairs after this cursor: the cursor
+                value of the previous page's record with the greatest cursor.
+                See :meth:`paginate`.
 
         Returns:
             List of dicts with tag_key(str), tag_value(str), entity(str - label), entities[].
@@ -654,12 +992,29 @@ class MDB:
         if value is not None:
             cond = "where t.key = $key and t.value = $value "
             parms = {"key": key, "value": value}
+        page = ""
+        cursor = ""
+        if limit is not None or after is not None:
+            # page on entities, then group the page by tag
+            # an entity can have several matching tags: id(t) breaks ties
+            (econd, order, lim, cursor) = _keyset(
+                "where e.nanoid is not null",
+                "e",
+                after,
+                limit,
+                parms,
+                tiebreak=("id(t)",),
+                grouped=True,
+            )
+            page = f"{econd} with t, e {order}{lim} "
         qry = (
             "match (t:tag) "
             f"{cond} "
             "with t "
             "match (e)-[:has_tag]->(t) "
-            "return t.key as tag_key, t.value as tag_value, collect(e) as entities"
+            f"{page}"
+            "return t.key as tag_key, t.value as tag_value, "
+            f"collect(e) as entities{cursor}"
         )
         return (qry, parms)  # type: ignore[reportReturnType]
 
@@ -683,6 +1038,149 @@ class MDB:
             raise TypeError(msg)
         return (qry, parms)  # type: ignore[reportReturnType]
 
+    def paginate(
+        self,
+        method: Callable[..., list[dict[str, Any]] | None],
+        *args: Any,  # noqa: ANN401
+        page_size: int = 1000,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> Iterator[list[dict[str, Any]]]:
+        """
+        Iterate over the pages of the results of a paged read method.
+
+        Each page is queried when it is needed, starting after the cursor
+        of the page before. For example::
+
+          for page in mdb.paginate(mdb.get_valuesets_by_model, "ICDC", page_size=50):
+              ...
+
+        Args:
+            method: A read method of this MDB that takes limit and after arguments.
+            *args: Positional arguments for method.
+            page_size: Maximum number of entities per page.
+            **kwargs: Other keyword arguments for method.
+
+        Returns:
+            Generator of pages, each a non-empty list of dicts as returned by method.
+        """
+        name = getattr(method, "__name__", None)
+        if name not in PAGE_CURSORS:
+            msg = f"{name} is not a paged MDB method"
+            raise ValueError(msg)
+        cursor = PAGE_CURSORS[name]
+
+        def gen() -> Iterator[list[dict[str, Any]]]:
+            after = None
+            while page := method(*args, limit=page_size, after=after, **kwargs):
+                yield page
+                after = cursor(page)
+
+        return gen()
+
+    def fetch_many(
+        self,
+        method: Callable[..., Any],
+        arg_list: list[Any],
+        max_workers: int | None = None,
+    ) -> list[Any]:
+        """
+        Call a read method for each of a list of arguments, concurrently.
+
+        Calls run in a pool of threads, each with its own session from the
+        driver's connection pool. For example::
+
+          (icdc, ctdc) = mdb.fetch_many(
+              mdb.get_nodes_and_props_by_model, ["ICDC", ("CTDC", "1.19.0")]
+          )
+
+        Args:
+            method: A read method of this MDB.
+            arg_list: Arguments for each call: a tuple of positional arguments,
+                a dict of keyword arguments, or a single positional argument.
+            max_workers: Maximum number of concurrent calls. Defaults to the
+                number of calls, up to the connection pool size (or 32).
+
+        Returns:
+            The result of each call, in the order of arg_list. If a call
+            raised an exception, the exception is in its place.
+        """
+        if not arg_list:
+            return []
+        if max_workers is None:
+            max_workers = min(
+                len(arg_list),
+                self.pool_config.get("max_connection_pool_size", 32),
+            )
+
+        def call(args: Any) -> Any:  # noqa: ANN401
+            try:
+                if isinstance(args, tuple):
+                    return method(*args)
+                if isinstance(args, dict):
+                    return method(**args)
+                return method(args)
+            except Exception as e:  # noqa: BLE001
+                return e
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(call, arg_list))
+
+    # streaming counterparts; the query functions are those of the get_ methods
+
+    @read_txn_iter
+    def iter_nodes_by_model(
+        self,
+        model: str | None = None,
+        version: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Stream the nodes of a model. See :meth:`get_nodes_by_model`."""
+        return MDB.get_nodes_by_model.__wrapped__(self, model, version)
+
+    @read_txn_iter
+    def iter_model_nodes_edges(
+        self,
+        model: str,
+        version: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Stream the paths of a model. See :meth:`get_model_nodes_edges`."""
+        return MDB.get_model_nodes_edges.__wrapped__(self, model, version)
+
+    @read_txn_iter
+    def iter_nodes_and_props_by_model(
+        self,
+        model: str | None = None,
+        version: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Stream nodes with their properties. See :meth:`get_nodes_and_props_by_model`."""
+        return MDB.get_nodes_and_props_by_model.__wrapped__(self, model, version)
+
+    @read_txn_iter
+    def iter_valuesets_by_model(
+        self,
+        model: str | None = None,
+        version: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Stream the value sets of a model. See :meth:`get_valuesets_by_model`."""
+        return MDB.get_valuesets_by_model.__wrapped__(self, model, version)
+
+    @read_txn_iter
+    def iter_props_and_terms_by_model(
+        self,
+        model: str | None = None,
+        version: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Stream properties with their terms. See :meth:`get_props_and_terms_by_model`."""
+        return MDB.get_props_and_terms_by_model.__wrapped__(self, model, version)
+
+    @read_txn_iter
+    def iter_with_statement(
+        self,
+        qry: str,
+        parms: dict[str, Any] | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Stream the data of an arbitrary read statement. See :meth:`get_with_statement`."""
+        return MDB.get_with_statement.__wrapped__(self, qry, parms)
+
 
 def make_nanoid(
     alphabet: str = "abcdefghijkmnopqrstuvwxyzABCDEFGHJKMNPQRSTUVWXYZ0123456789",
@@ -0,0 +1,260 @@
+"""
+bento_meta.mdb.mdb_tools.ann
+============================
+
+This module contains batch k-nearest-neighbor search over normalized
+vectors, by cosine similarity: :func:`exact_search`, which scores every
+vector in blocked matrix products, and :class:`IVFIndex`, an approximate
+inverted-file index in NumPy.
+
+An IVFIndex clusters the vectors with spherical k-means, and files each
+vector under its nearest centroid. A query is scored only against the
+vectors filed under the nprobe centroids nearest to it, so with the
+default sqrt(n) clusters a query scores a small fraction of the vectors.
+Queries are batched: each inverted list is scored against all the
+queries that probe it in one matrix product.
+
+:func:`knn` chooses exact search for small sets of vectors and an
+IVFIndex for large ones.
+
+This module requires NumPy (installed with spaCy).
+"""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# vector count from which knn() uses an IVFIndex rather than exact search
+ANN_MIN_ROWS = 50000
+
+# maximum number of similarity scores computed in one matrix product
+_BLOCK = 1 << 24
+
+
+def _blocks(n_rows: int, n_cols: int) -> Iterator[slice]:
+    """Slices of rows such that a block of rows times n_cols fits in _BLOCK."""
+    step = max(1, _BLOCK // max(n_cols, 1))
+    for i in range(0, n_rows, step):
+        yield slice(i, i + step)
+
+
+def _top_k(sims: np.ndarray, k: int) -> np.ndarray:
+    """Return the column indices of the k largest entries of each row, largest first."""
+    if sims.shape[1] > k:
+        cols = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    else:
+        cols = np.broadcast_to(np.arange(sims.shape[1]), sims.shape)
+    order = np.argsort(-np.take_along_axis(sims, cols, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(cols, order, axis=1)
+
+
+def normalize(mat: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length; zero rows stay zero."""
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return (mat / norms).astype(np.float32)
+
+
+def _empty_result(nq: int, k: int) -> tuple[np.ndarray, np.ndarray]:
+    return (
+        np.full((nq, k), -np.inf, dtype=np.float32),
+        np.full((nq, k), -1, dtype=np.int64),
+    )
+
+
+def exact_search(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Find the k vectors most similar to each query, by scoring all of them.
+
+    Args:
+        vectors: Matrix of normalized vectors, one per row.
+        queries: Matrix of normalized query vectors, one per row.
+        k: Number of neighbors per query.
+
+    Returns:
+        Arrays (similarities, rows), each of shape (len(queries), k), most
+        similar first. Where there are fewer than k vectors, rows are
+        padded with -1 (and similarities with -inf).
+    """
+    (sims, rows) = _empty_result(len(queries), k)
+    kk = min(k, len(vectors))
+    if kk == 0:
+        return (sims, rows)
+    for b in _blocks(len(queries), len(vectors)):
+        scores = queries[b] @ vectors.T
+        top = _top_k(scores, kk)
+        rows[b, :kk] = top
+        sims[b, :kk] = np.take_along_axis(scores, top, axis=1)
+    return (sims, rows)
+
+
+class IVFIndex:
+    """
+    Approximate nearest-neighbor index of normalized vectors (inverted file).
+
+    Attributes:
+        centroids: Matrix of normalized cluster centroids.
+        nprobe: Default number of clusters searched per query.
+    """
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        nlist: int | None = None,
+        nprobe: int = 8,
+        n_iter: int = 10,
+        seed: int = 0,
+    ) -> None:
+        """
+        Cluster vectors and build the inverted lists.
+
+        Args:
+            vectors: Matrix of normalized vectors, one per row.
+            nlist: Number of clusters; by default, sqrt(len(vectors)).
+            nprobe: Default number of clusters searched per query. Higher
+                values find more of the true nearest neighbors, more slowly.
+            n_iter: Number of k-means iterations.
+            seed: Seed for sampling vectors for training.
+        """
+        n = len(vectors)
+        if n == 0:
+            msg = "cannot index an empty set of vectors"
+            raise ValueError(msg)
+        nlist = min(n, nlist or max(1, round(math.sqrt(n))))
+        self.nprobe = nprobe
+        self.centroids = self._train(vectors, nlist, n_iter, seed)
+        assign = self._assign(vectors, self.centroids)
+        order = np.argsort(assign, kind="stable")
+        # vectors are stored grouped by list; _rows maps back to input rows
+        self._rows = order
+        self._vectors = np.ascontiguousarray(vectors[order])
+        self._offsets = np.concatenate(
+            [[0], np.cumsum(np.bincount(assign, minlength=nlist))],
+        )
+
+    def __len__(self) -> int:
+        """Return the number of vectors indexed."""
+        return len(self._rows)
+
+    @staticmethod
+    def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        """Return the index of the nearest centroid of each vector."""
+        assign = np.empty(len(vectors), dtype=np.int64)
+        for b in _blocks(len(vectors), len(centroids)):
+            assign[b] = np.argmax(vectors[b] @ centroids.T, axis=1)
+        return assign
+
+    @classmethod
+    def _train(
+        cls,
+        vectors: np.ndarray,
+        nlist: int,
+        n_iter: int,
+        seed: int,
+    ) -> np.ndarray:
+        """Spherical k-means on a sample of the vectors."""
+        rng = np.random.default_rng(seed)
+        n_sample = min(len(vectors), 50 * nlist)
+        sample = vectors[rng.choice(len(vectors), n_sample, replace=False)]
+        centroids = sample[rng.choice(n_sample, nlist, replace=False)]
+        for _ in range(n_iter):
+            assign = cls._assign(sample, centroids)
+            order = np.argsort(assign, kind="stable")
+            counts = np.bincount(assign, minlength=nlist)
+            full = counts > 0
+            sums = np.empty_like(centroids)
+            sums[full] = np.add.reduceat(
+                sample[order],
+                (np.cumsum(counts) - counts)[full],
+                axis=0,
+            )
+            # restart empty clusters at random sample vectors
+            sums[~full] = sample[rng.choice(n_sample, int((~full).sum()))]
+            centroids = normalize(sums)
+        return centroids
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        nprobe: int | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find approximately the k vectors most similar to each query.
+
+        Args:
+            queries: Matrix of normalized query vectors, one per row.
+            k: Number of neighbors per query.
+            nprobe: Number of clusters searched per query; by default,
+                the index's nprobe.
+
+        Returns:
+            Arrays (similarities, rows), as for :func:`exact_search`. Rows
+            index the vectors the index was built from.
+        """
+        nlist = len(self.centroids)
+        nprobe = min(nprobe or self.nprobe, nlist)
+        nq = len(queries)
+        (sims, rows) = _empty_result(nq, k)
+        probe = np.empty((nq, nprobe), dtype=np.int64)
+        for b in _blocks(nq, nlist):
+            probe[b] = _top_k(queries[b] @ self.centroids.T, nprobe)
+        # the queries probing each list, grouped by list
+        lists = probe.ravel()
+        order = np.argsort(lists, kind="stable")
+        probing = np.repeat(np.arange(nq), nprobe)[order]
+        bounds = np.searchsorted(lists[order], np.arange(nlist + 1))
+        for lst in range(nlist):
+            (lo, hi) = (self._offsets[lst], self._offsets[lst + 1])
+            qs = probing[bounds[lst] : bounds[lst + 1]]
+            if lo == hi or not len(qs):
+                continue
+            for b in _blocks(len(qs), hi - lo):
+                q = qs[b]
+                scores = queries[q] @ self._vectors[lo:hi].T
+                cand_sims = np.hstack([sims[q], scores])
+                cand_rows = np.hstack(
+                    [rows[q], np.broadcast_to(self._rows[lo:hi], scores.shape)],
+                )
+                top = _top_k(cand_sims, k)
+                sims[q] = np.take_along_axis(cand_sims, top, axis=1)
+                rows[q] = np.take_along_axis(cand_rows, top, axis=1)
+        return (sims, rows)
+
+
+def knn(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    *,
+    approximate: bool | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Find the k vectors most similar to each query.
+
+    Args:
+        vectors: Matrix of normalized vectors, one per row.
+        queries: Matrix of normalized query vectors, one per row.
+        k: Number of neighbors per query.
+        approximate: If True, search an :class:`IVFIndex` built for the
+            call; if False, search exactly. By default, search approximately
+            if there are at least ANN_MIN_ROWS vectors.
+
+    Returns:
+        Arrays (similarities, rows), as for :func:`exact_search`.
+    """
+    if approximate is None:
+        approximate = len(vectors) >= ANN_MIN_ROWS
+    if approximate and len(vectors):
+        return IVFIndex(vectors).search(queries, k)
+    return exact_search(vectors, queries, k)
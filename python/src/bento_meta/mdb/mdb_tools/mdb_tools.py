@@ -2,6 +2,13 @@
 ToolsMDB: subclass of 'WriteableMDB' to support interactions with the MDB.
 
 EntityValidator: validates that entities have required attributes.
+
+Potential term synonyms are found with a spaCy pipeline (NLP_MODEL), using a
+:class:`bento_meta.mdb.mdb_tools.term_index.TermVectorIndex` of the MDB's
+terms. The index is built on first use, and kept with the ToolsMDB object.
+Synonyms for many terms, and candidate synonyms among all properties (by
+handle, from a :class:`bento_meta.mdb.mdb_tools.term_index.PropertyVectorIndex`),
+are found with batch k-nearest-neighbor searches, approximate on large MDBs.
 """
 
 from __future__ import annotations
@@ -9,12 +16,13 @@ from __future__ import annotations
 import csv
 import logging
 from collections.abc import Iterable
+from functools import cache
 from importlib.util import find_spec
 from logging.config import fileConfig
 from pathlib import Path
 from subprocess import check_call
 from sys import executable
-from typing import TYPE_CHECKING, ClassVar
+from typing import TYPE_CHECKING, Any, ClassVar
 
 from minicypher.clauses import (
     As,
@@ -31,7 +39,7 @@ from minicypher.functions import count
 from minicypher.statement import Statement
 
 from bento_meta.entity import Entity
-from bento_meta.mdb import make_nanoid, read_txn_data, read_txn_value
+from bento_meta.mdb import make_nanoid, read_txn_data, read_txn_iter, read_txn_value
 from bento_meta.mdb.writeable import WriteableMDB, write_txn
 from bento_meta.objects import (
     Concept,
@@ -62,7 +70,15 @@ from minicypher.clauses import (
 from minicypher.entities import N0, R0, G, N, P, R, T, _plain_var
 from minicypher.functions import count
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from neo4j import Record
+    from spacy.language import Language
+
+    from bento_meta.mdb.mdb_tools.term_index import (
+        PropertyVectorIndex,
+        TermVectorIndex,
+    )
 
 # logging stuff
 log_ini_path = Path(__file__).parents[2].joinpath("logs/log.ini")
@@ -70,13 +86,39 @@ log_file_path = Path(__file__).parents[2].joinpath(f"logs/{__name__}.log")
 fileConfig(log_ini_path, defaults={"logfilename": log_file_path.as_posix()})
 logger = logging.getLogger(__name__)
 
+# spaCy pipeline for term similarity, and where to get it if not installed
+NLP_MODEL = "en_ner_bionlp13cg_md"
+NLP_MODEL_URL = (
+    "https://s3-us-west-2.amazonaws.com/ai2-s2-scispacy/releases/v0.5.4/"
+    "en_ner_bionlp13cg_md-0.5.4.tar.gz"
+)
+
+
+@cache
+def _get_nlp_model() -> Language:
+    """Load the spaCy pipeline NLP_MODEL, installing it if necessary."""
+    if find_spec(NLP_MODEL) is None:
+        logger.info("Installing %s", NLP_MODEL)
+        check_call([executable, "-m", "pip", "install", NLP_MODEL_URL])
+    import spacy
+
+    return spacy.load(NLP_MODEL)
+
 
 class ToolsMDB(WriteableMDB):
     """:class:`bento_meta.mdb.writeable.WriteableMDB` subclass with mdb-tools."""
 
-    def __init__(self, uri: str | None, user: str | None, password: str | None) -> None:
-        """Initialize a :class:`ToolsMDB` object."""
-        super().__init__(uri=uri, user=user, password=password)
+    def __init__(
+        self,
+        uri: str | None,
+        user: str | None,
+        password: str | None,
+        **pool_config: Any,  # noqa: ANN401
+    ) -> None:
+        """Initialize a :class:`ToolsMDB` object; pool_config as for MDB."""
+        super().__init__(uri=uri, user=user, password=password, **pool_config)
+        self.term_index: TermVectorIndex | None = None
+        self.property_index: PropertyVectorIndex | None = None
 
     class EntityNotUniqueError(Exception):
         """Entity's attributes identify more than 1 property graph node in an MDB."""
@@ -739,46 +781,214 @@ class ToolsMDB(WriteableMDB):
 
         return (qry, parms)  # type: ignore[reportReturnType]
 
+    @read_txn_iter  # type: ignore[reportArgumentType]
+    def _iter_all_terms(self) -> Iterator[dict]:
+        """Stream all terms in an MDB."""
+        return ToolsMDB._get_all_terms.__wrapped__(self)
+
+    def build_term_index(self, batch_size: int = 1000) -> TermVectorIndex:
+        """
+        Embed all terms in the MDB, and keep the index for synonym queries.
+
+        Args:
+            batch_size: Number of term values embedded at a time.
+
+        Returns:
+            The new index, also set as the term_index attribute.
+        """
+        from bento_meta.mdb.mdb_tools.term_index import TermVectorIndex
+
+        index = TermVectorIndex(_get_nlp_model())
+        index.add_terms(
+            (next(iter(item.values())) for item in self._iter_all_terms()),
+            batch_size=batch_size,
+        )
+        self.term_index = index
+        return index
+
+    def update_term_index(self, batch_size: int = 1000) -> int:
+        """
+        Bring the term index up to date with the MDB.
+
+        Terms that are new, or whose values have changed, are embedded; terms
+        no longer in the MDB are removed. Builds the index if there is none.
+
+        Args:
+            batch_size: Number of term values embedded at a time.
+
+        Returns:
+            Number of terms embedded or removed.
+        """
+        if self.term_index is None:
+            return len(self.build_term_index(batch_size))
+        seen = set()
+
+        def terms() -> Iterator[dict]:
+            for item in self._iter_all_terms():
+                term_attr_dict = next(iter(item.values()))
+                seen.add(term_attr_dict.get("nanoid"))
+                yield term_attr_dict
+
+        n = self.term_index.add_terms(terms(), batch_size=batch_size)
+        return n + self.term_index.remove(
+            [nanoid for nanoid in self.term_index.nanoids if nanoid not in seen]
+        )
+
     def get_potential_term_synonyms(
         self,
         term: Term,
         threshhold: float = 0.8,
+        top_k: int | None = None,
     ) -> list[dict]:
         """
         Return list of dicts representing potential synonymous Term nodes.
 
+        Similarities are computed against the term index, which is built
+        if necessary; see :meth:`build_term_index` and :meth:`update_term_index`.
+
         Args:
             term: The term to find synonyms for.
             threshhold: Similarity threshold (0-1) for considering terms synonymous.
+            top_k: Maximum number of terms to return; None for no limit.
 
         Returns:
-            List of dicts with value, origin_name, nanoid, similarity, valid_synonym.
+            List of dicts with value, origin_name, nanoid, similarity, valid_synonym,
+            most similar first.
         """
         self.validate_entity_unique(term)
+        if self.term_index is None:
+            self.build_term_index()
 
-        nlp = _get_nlp_model()
+        # get likely synonyms
+        synonyms = self.term_index.query(term.value, threshold=threshhold, k=top_k)
+        for synonym in synonyms:
+            synonym["valid_synonym"] = 0  # mark 1 if synonym when uploading later
+        return synonyms
 
-        all_terms_result = self._get_all_terms()
-        all_terms = [list(item.values())[0] for item in all_terms_result]
+    def get_potential_term_synonyms_many(
+        self,
+        terms: list[Term],
+        threshhold: float = 0.8,
+        top_k: int = 10,
+        approximate: bool | None = None,
+    ) -> list[list[dict]]:
+        """
+        Return lists of dicts representing potential synonyms of many terms.
 
-        # get likely synonyms
-        synonyms = []
-        for term_attr_dict in all_terms:
-            # calculate similarity between each Term and input Term
-            term_1 = nlp(term.value)
-            term_2 = nlp(term_attr_dict["value"])
-            similarity_score = term_1.similarity(term_2)
-            # if similarity threshold met, add to list of potential synonyms
-            if similarity_score >= threshhold:
-                synonym = {
-                    "value": term_attr_dict["value"],
-                    "origin_name": term_attr_dict["origin_name"],
-                    "nanoid": term_attr_dict["nanoid"],
-                    "similarity": similarity_score,
-                    "valid_synonym": 0,  # mark 1 if synonym when uploading later
+        Like :meth:`get_potential_term_synonyms`, but all term values are
+        embedded and searched in batches, and terms are not validated
+        against the MDB.
+
+        Args:
+            terms: The terms to find synonyms for.
+            threshhold: Similarity threshold (0-1) for considering terms synonymous.
+            top_k: Maximum number of terms to return per term.
+            approximate: Whether to use the approximate index; by default,
+                on large indexes. See
+                :meth:`bento_meta.mdb.mdb_tools.term_index.TermVectorIndex.query_many`.
+
+        Returns:
+            For each term, a list of dicts with value, origin_name, nanoid,
+            similarity, valid_synonym, most similar first.
+        """
+        if self.term_index is None:
+            self.build_term_index()
+        synonyms = self.term_index.query_many(
+            [term.value for term in terms],
+            threshold=threshhold,
+            k=top_k,
+            approximate=approximate,
+        )
+        for term_synonyms in synonyms:
+            for synonym in term_synonyms:
+                synonym["valid_synonym"] = 0
+        return synonyms
+
+    @read_txn_data  # type: ignore[reportArgumentType]
+    def _get_all_properties(self) -> list[Record]:
+        """Return list of all properties in an MDB."""
+        prop = N(label="property")
+
+        stmt = Statement(Match(prop), Return(prop._var))
+
+        qry = str(stmt)
+        parms = {}
+
+        logger.debug(qry)
+
+        return (qry, parms)  # type: ignore[reportReturnType]
+
+    @read_txn_iter  # type: ignore[reportArgumentType]
+    def _iter_all_properties(self) -> Iterator[dict]:
+        """Stream all properties in an MDB."""
+        return ToolsMDB._get_all_properties.__wrapped__(self)
+
+    def build_property_index(self, batch_size: int = 1000) -> PropertyVectorIndex:
+        """
+        Embed all property handles in the MDB, and keep the index.
+
+        Args:
+            batch_size: Number of handles embedded at a time.
+
+        Returns:
+            The new index, also set as the property_index attribute.
+        """
+        from bento_meta.mdb.mdb_tools.term_index import PropertyVectorIndex
+
+        index = PropertyVectorIndex(_get_nlp_model())
+        index.add_properties(
+            (next(iter(item.values())) for item in self._iter_all_properties()),
+            batch_size=batch_size,
+        )
+        self.property_index = index
+        return index
+
+    def get_potential_property_synonyms_all(
+        self,
+        threshhold: float = 0.8,
+        top_k: int = 10,
+        approximate: bool | None = None,
+    ) -> list[dict]:
+        """
+        Return dicts representing pairs of potentially synonymous properties.
+
+        Each property handle in the MDB is compared to its top_k nearest
+        handles, across all models, in one batch search of the property
+        index, which is built if necessary; see :meth:`build_property_index`.
+
+        Args:
+            threshhold: Similarity threshold (0-1) for considering properties
+                synonymous.
+            top_k: Maximum number of neighbors considered per property.
+            approximate: As for :meth:`get_potential_term_synonyms_many`.
+
+        Returns:
+            List of dicts with handle, model, nanoid, synonym_handle,
+            synonym_model, synonym_nanoid, similarity and valid_synonym, one
+            per unordered pair, most similar first.
+        """
+        if self.property_index is None:
+            self.build_property_index()
+        index = self.property_index
+        pairs = {}
+        for row, neighbors in enumerate(
+            index.neighbors(threshold=threshhold, k=top_k, approximate=approximate),
+        ):
+            for synonym in neighbors:
+                key = frozenset((index.nanoids[row], synonym["nanoid"]))
+                if key in pairs:
+                    continue
+                pairs[key] = {
+                    "handle": index.values[row],
+                    "model": index.origins[row],
+                    "nanoid": index.nanoids[row],
+                    "synonym_handle": synonym["handle"],
+                    "synonym_model": synonym["model"],
+                    "synonym_nanoid": synonym["nanoid"],
+                    "similarity": synonym["similarity"],
+                    "valid_synonym": 0,
                 }
-                synonyms.append(synonym)
-        return sorted(synonyms, key=lambda d: d["similarity"], reverse=True)
+        return sorted(pairs.values(), key=lambda p: p["similarity"], reverse=True)
 
     def potential_synonyms_to_csv(
         self,
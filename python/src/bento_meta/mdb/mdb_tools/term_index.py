@@ -0,0 +1,414 @@
+"""
+bento_meta.mdb.mdb_tools.term_index
+===================================
+
+This module contains :class:`TermVectorIndex`, an index of term value
+embeddings for finding potential synonyms among the terms of an MDB.
+
+Term values are embedded once, in batches, with a spaCy pipeline's
+``nlp.pipe``, and held as rows of a NumPy matrix, keyed by term nanoid. Rows
+are normalized, so the cosine similarities of a query to all terms are one
+matrix-vector product. These equal the ``Doc.similarity`` scores spaCy gives
+for the same values. Terms can be added or removed as the MDB changes, and
+the index can be saved to and loaded from a file.
+
+:meth:`TermVectorIndex.query_many` finds the nearest terms to many strings
+at once, with one matrix product per block of strings; on large indexes it
+searches an approximate :class:`bento_meta.mdb.mdb_tools.ann.IVFIndex`
+instead. :class:`PropertyVectorIndex` indexes property handles the same way.
+
+This module requires NumPy (installed with spaCy).
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from bento_meta.mdb.mdb_tools.ann import (
+    ANN_MIN_ROWS,
+    IVFIndex,
+    exact_search,
+    normalize,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from spacy.language import Language
+
+
+def embed(
+    nlp: Language,
+    texts: list[str],
+    dim: int | None = None,
+    batch_size: int = 1000,
+) -> np.ndarray:
+    """
+    Embed strings with a spaCy pipeline.
+
+    Args:
+        nlp: A spaCy pipeline with word vectors.
+        texts: Strings to embed.
+        dim: Dimension of the vectors; by default, that of nlp's vectors.
+        batch_size: Number of strings the pipeline processes at a time.
+
+    Returns:
+        Matrix of normalized vectors, one row per string.
+    """
+    mat = np.zeros(
+        (len(texts), dim if dim is not None else nlp.vocab.vectors_length),
+        dtype=np.float32,
+    )
+    for i, doc in enumerate(nlp.pipe(texts, batch_size=batch_size)):
+        mat[i] = doc.vector
+    return normalize(mat)
+
+
+class TermVectorIndex:
+    """
+    Normalized embeddings of term values, keyed by nanoid.
+
+    Attributes:
+        nlp: The spaCy pipeline used to embed values.
+        nanoids: Term nanoids, in row order.
+        values: Term values, in row order.
+        origins: Term origin names, in row order.
+        ann: Approximate index of the vectors, or None until
+            :meth:`build_ann` (or a large :meth:`query_many`) builds one.
+            Adding or removing terms drops it.
+    """
+
+    # keys of the indexed string and of its qualifier in entry dicts
+    text_key = "value"
+    info_key = "origin_name"
+
+    def __init__(self, nlp: Language, dim: int | None = None) -> None:
+        """
+        Create an empty index.
+
+        Args:
+            nlp: A spaCy pipeline with word vectors.
+            dim: Dimension of the vectors; by default, that of nlp's vectors.
+        """
+        self.nlp = nlp
+        self.dim = dim if dim is not None else nlp.vocab.vectors_length
+        self.nanoids: list[str] = []
+        self.values: list[str] = []
+        self.origins: list[str | None] = []
+        self._row: dict[str, int] = {}
+        self._mat = np.zeros((0, self.dim), dtype=np.float32)
+        self.ann: IVFIndex | None = None
+
+    def __len__(self) -> int:
+        """Return the number of terms in the index."""
+        return len(self.nanoids)
+
+    def __contains__(self, nanoid: object) -> bool:
+        """Whether a term nanoid is in the index."""
+        return nanoid in self._row
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """The matrix of normalized term vectors, one row per term."""
+        return self._mat[: len(self.nanoids)]
+
+    @staticmethod
+    def _prepare(text: str) -> str:
+        """Return the string embedded for an indexed or query string."""
+        return text
+
+    def embed(self, values: list[str], batch_size: int = 1000) -> np.ndarray:
+        """
+        Embed strings with the pipeline.
+
+        Args:
+            values: Strings to embed.
+            batch_size: Number of strings the pipeline processes at a time.
+
+        Returns:
+            Matrix of normalized vectors, one row per string.
+        """
+        return embed(
+            self.nlp,
+            [self._prepare(v) for v in values],
+            self.dim,
+            batch_size,
+        )
+
+    def add_terms(
+        self,
+        terms: Iterable[dict[str, Any]],
+        batch_size: int = 1000,
+    ) -> int:
+        """
+        Add terms to the index, or update those whose values have changed.
+
+        Args:
+            terms: Dicts of term properties, with nanoid, value and origin_name.
+                Terms without a nanoid or value are skipped.
+            batch_size: Number of values embedded at a time.
+
+        Returns:
+            Number of terms embedded.
+        """
+        n = 0
+        batch: list[dict[str, Any]] = []
+        for term in terms:
+            nanoid, value = term.get("nanoid"), term.get(self.text_key)
+            if nanoid is None or value is None:
+                continue
+            row = self._row.get(nanoid)
+            if row is not None and self.values[row] == value:
+                continue
+            batch.append(term)
+            if len(batch) == batch_size:
+                n += self._add_batch(batch, batch_size)
+                batch = []
+        if batch:
+            n += self._add_batch(batch, batch_size)
+        return n
+
+    def _add_batch(self, terms: list[dict[str, Any]], batch_size: int) -> int:
+        vecs = self.embed([t[self.text_key] for t in terms], batch_size)
+        new = [t["nanoid"] not in self._row for t in terms]
+        self._reserve(len(self.nanoids) + sum(new))
+        for term, vec in zip(terms, vecs):
+            row = self._row.get(term["nanoid"])
+            if row is None:
+                row = len(self.nanoids)
+                self._row[term["nanoid"]] = row
+                self.nanoids.append(term["nanoid"])
+                self.values.append(term[self.text_key])
+                self.origins.append(term.get(self.info_key))
+            else:
+                self.values[row] = term[self.text_key]
+                self.origins[row] = term.get(self.info_key)
+            self._mat[row] = vec
+        self.ann = None
+        return len(terms)
+
+    def _reserve(self, n: int) -> None:
+        """Grow the matrix to hold at least n rows, doubling its capacity."""
+        if n <= self._mat.shape[0]:
+            return
+        mat = np.zeros((max(n, 2 * self._mat.shape[0]), self.dim), dtype=np.float32)
+        mat[: len(self.nanoids)] = self.vectors
+        self._mat = mat
+
+    def remove(self, nanoids: Iterable[str]) -> int:
+        """
+        Remove terms from the index.
+
+        Args:
+            nanoids: Nanoids of the terms to remove.
+
+        Returns:
+            Number of terms removed.
+        """
+        n = 0
+        for nanoid in nanoids:
+            row = self._row.pop(nanoid, None)
+            if row is None:
+                continue
+            last = len(self.nanoids) - 1
+            if row != last:  # move the last term into the vacated row
+                self._mat[row] = self._mat[last]
+                self.nanoids[row] = self.nanoids[last]
+                self.values[row] = self.values[last]
+                self.origins[row] = self.origins[last]
+                self._row[self.nanoids[row]] = row
+            self.nanoids.pop()
+            self.values.pop()
+            self.origins.pop()
+            n += 1
+        if n:
+            self.ann = None
+        return n
+
+    def query(
+        self,
+        value: str,
+        threshold: float = 0.8,
+        k: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Find the terms whose values are most similar to a string.
+
+        Args:
+            value: The string to compare terms to.
+            threshold: Minimum cosine similarity of terms returned.
+            k: Maximum number of terms returned; None for no limit.
+
+        Returns:
+            List of dicts with value, origin_name, nanoid and similarity,
+            most similar first.
+        """
+        sims = self.vectors @ self.embed([value])[0]
+        rows = np.flatnonzero(sims >= threshold)
+        if k is not None and len(rows) > k:
+            rows = rows[np.argpartition(-sims[rows], k - 1)[:k]]
+        rows = rows[np.argsort(-sims[rows], kind="stable")]
+        return [self._hit(i, sims[i]) for i in rows]
+
+    def _hit(self, row: int, similarity: float) -> dict[str, Any]:
+        return {
+            self.text_key: self.values[row],
+            self.info_key: self.origins[row],
+            "nanoid": self.nanoids[row],
+            "similarity": float(similarity),
+        }
+
+    def build_ann(
+        self,
+        nlist: int | None = None,
+        nprobe: int = 8,
+    ) -> IVFIndex:
+        """
+        Build an approximate index of the current vectors for :meth:`query_many`.
+
+        Args:
+            nlist: Number of clusters; by default, sqrt(len(self)).
+            nprobe: Number of clusters searched per query.
+
+        Returns:
+            The approximate index, also set as the ann attribute.
+        """
+        self.ann = IVFIndex(self.vectors, nlist=nlist, nprobe=nprobe)
+        return self.ann
+
+    def query_many(
+        self,
+        values: list[str],
+        threshold: float = 0.8,
+        k: int = 10,
+        approximate: bool | None = None,
+        batch_size: int = 1000,
+    ) -> list[list[dict[str, Any]]]:
+        """
+        Find the k terms most similar to each of many strings.
+
+        Args:
+            values: The strings to compare terms to.
+            threshold: Minimum cosine similarity of terms returned.
+            k: Maximum number of terms returned per string.
+            approximate: If True, search the approximate index (building
+                it if needed); if False, compare to every term. By default,
+                search approximately if the index has at least ANN_MIN_ROWS
+                terms.
+            batch_size: Number of strings embedded at a time.
+
+        Returns:
+            For each string, a list of dicts as returned by :meth:`query`,
+            most similar first.
+        """
+        if not len(self):
+            return [[] for _ in values]
+        (sims, rows) = self._search(self.embed(values, batch_size), k, approximate)
+        return [
+            [self._hit(i, s) for s, i in zip(q_sims, q_rows) if i >= 0 and s >= threshold]
+            for q_sims, q_rows in zip(sims, rows)
+        ]
+
+    def neighbors(
+        self,
+        threshold: float = 0.8,
+        k: int = 10,
+        approximate: bool | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """
+        Find the k terms most similar to each term in the index.
+
+        Uses the stored vectors, so nothing is embedded.
+
+        Args:
+            threshold: Minimum cosine similarity of terms returned.
+            k: Maximum number of terms returned per term.
+            approximate: As for :meth:`query_many`.
+
+        Returns:
+            For each term, in row order (see the nanoids attribute), a list
+            of dicts as returned by :meth:`query`, most similar first. A term
+            is not listed among its own neighbors.
+        """
+        if not len(self):
+            return []
+        (sims, rows) = self._search(self.vectors, k + 1, approximate)
+        return [
+            [
+                self._hit(i, s)
+                for s, i in zip(q_sims, q_rows)
+                if i >= 0 and i != row and s >= threshold
+            ][:k]
+            for row, (q_sims, q_rows) in enumerate(zip(sims, rows))
+        ]
+
+    def _search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        approximate: bool | None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if approximate is None:
+            approximate = len(self) >= ANN_MIN_ROWS
+        if approximate:
+            ann = self.ann if self.ann is not None else self.build_ann()
+            return ann.search(queries, k)
+        return exact_search(self.vectors, queries, k)
+
+    def save(self, path: str | Path) -> None:
+        """Write the index to a NumPy .npz file."""
+        with Path(path).open("wb") as f:
+            np.savez_compressed(
+                f,
+                vectors=self.vectors,
+                nanoids=np.array(self.nanoids, dtype=str),
+                values=np.array(self.values, dtype=str),
+                origins=np.array(["" if o is None else o for o in self.origins], dtype=str),
+            )
+
+    @classmethod
+    def load(cls, path: str | Path, nlp: Language) -> TermVectorIndex:
+        """
+        Read an index written by :meth:`save`.
+
+        Args:
+            path: The .npz file.
+            nlp: The spaCy pipeline the index was built with.
+
+        Returns:
+            The index.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            index = cls(nlp, dim=data["vectors"].shape[1])
+            index._mat = data["vectors"].astype(np.float32)  # noqa: SLF001
+            index.nanoids = data["nanoids"].tolist()
+            index.values = data["values"].tolist()
+            index.origins = [o or None for o in data["origins"].tolist()]
+        index._row = {nanoid: i for i, nanoid in enumerate(index.nanoids)}  # noqa: SLF001
+        return index
+
+
+class PropertyVectorIndex(TermVectorIndex):
+    """
+    Normalized embeddings of property handles, keyed by nanoid.
+
+    Handles are embedded with underscores as spaces, in lower case. Add
+    property dicts (with nanoid, handle and model) with :meth:`add_properties`;
+    query results are dicts with handle, model, nanoid and similarity.
+
+    Attributes:
+        values: Property handles, in row order.
+        origins: Property models, in row order.
+    """
+
+    text_key = "handle"
+    info_key = "model"
+
+    @staticmethod
+    def _prepare(text: str) -> str:
+        return text.replace("_", " ").lower()
+
+    add_properties = TermVectorIndex.add_terms
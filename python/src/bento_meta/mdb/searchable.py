@@ -11,9 +11,22 @@ the Neo4j instance:
 
 """
 
-from typing import Any
+from __future__ import annotations
 
-from bento_meta.mdb import MDB, read_txn_data
+from typing import TYPE_CHECKING, Any
+
+from bento_meta.mdb.mdb import MDB, read_txn_data
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from neo4j import Record
+
+# fulltext index over terms, by [search_definitions][search_values]
+TERM_INDEXES = {
+    True: {True: "termValueDefn", False: "termDefn"},
+    False: {True: "termValue", False: None},
+}
 
 
 class SearchableMDB(MDB):
@@ -24,19 +37,23 @@ class SearchableMDB(MDB):
         uri: str | None = None,
         user: str | None = None,
         password: str | None = None,
+        **pool_config: Any,  # noqa: ANN401
     ) -> None:
-        """Initialize a :class:`SearchableMDB` object."""
-        super().__init__(uri=uri, user=user, password=password)
+        """Initialize a :class:`SearchableMDB` object; pool_config as for MDB."""
+        super().__init__(uri=uri, user=user, password=password, **pool_config)
         self.ftindexes = {}
-        with self.driver.session() as s:
-            result = s.run("call db.indexes")
-            for rec in result:
-                if rec["type"] == "FULLTEXT":
-                    self.ftindexes[rec["name"]] = {
-                        "entity_type": rec["entityType"],
-                        "entities": rec["labelsOrTypes"],
-                        "properties": rec["properties"],
-                    }
+        with self.session() as s:
+            self._set_ftindexes(s.run("call db.indexes"))
+
+    def _set_ftindexes(self, indexes: Iterable[Record]) -> None:
+        """Record the fulltext indexes, given the result of ``call db.indexes``."""
+        for rec in indexes:
+            if rec["type"] == "FULLTEXT":
+                self.ftindexes[rec["name"]] = {
+                    "entity_type": rec["entityType"],
+                    "entities": rec["labelsOrTypes"],
+                    "properties": rec["properties"],
+                }
 
     def available_indexes(self) -> dict[str, dict[str, list[str]]]:
         """
@@ -112,7 +129,13 @@ class SearchableMDB(MDB):
             Dict with nodes, relationships, properties, each containing list of dicts
             with ent (entity dict) and score (lucene score).
         """
-        result = self.query_index("entityHandle", qstring)
+        return self._by_entity_type(self.query_index("entityHandle", qstring))
+
+    @staticmethod
+    def _by_entity_type(
+        result: list[dict[str, Any]] | None,
+    ) -> dict[str, list[dict[str, Any]]] | None:
+        """Group entity handle search hits into nodes, relationships and properties."""
         if not result:
             return None
         plural = {
@@ -145,8 +168,7 @@ class SearchableMDB(MDB):
         Returns:
             List of dicts with ent (term dict) and score (lucene score).
         """
-        index = {
-            True: {True: "termValueDefn", False: "termDefn"},
-            False: {True: "termValue", False: None},
-        }
-        return self.query_index(index[search_definitions][search_values], qstring)
+        return self.query_index(
+            TERM_INDEXES[search_definitions][search_values],
+            qstring,
+        )
@@ -39,13 +39,16 @@ def write_txn(
 
     @wraps(func)
     def wr(self: WriteableMDB, *args: P.args, **kwargs: P.kwargs) -> list[Record]:
+        (qry, parms) = func(self, *args, **kwargs)
+
         def txn_q(tx: ManagedTransaction) -> list[Record]:
-            (qry, parms) = func(self, *args, **kwargs)
             result = tx.run(cast("LiteralString", qry), parameters=parms)
             return list(result)
 
-        with self.driver.session() as session:
-            return session.execute_write(txn_q)
+        with self.session() as session:
+            result = session.execute_write(txn_q)
+        self.invalidate_results([parms])
+        return result
 
     return wr
 
@@ -58,9 +61,10 @@ class WriteableMDB(MDB):
         uri: str | None = None,
         user: str | None = None,
         password: str | None = None,
+        **pool_config: Any,  # noqa: ANN401
     ) -> None:
-        """Initialize a :class:`WriteableMDB` object."""
-        super().__init__(uri=uri, user=user, password=password)
+        """Initialize a :class:`WriteableMDB` object; pool_config as for MDB."""
+        super().__init__(uri=uri, user=user, password=password, **pool_config)
 
     @write_txn  # type: ignore[reportArgumentType]
     def put_with_statement(
@@ -79,6 +83,63 @@ class WriteableMDB(MDB):
             raise TypeError(msg)
         return (qry, parms)  # type: ignore[reportReturnType]
 
+    def put_with_statements(
+        self,
+        stmts: list[tuple[str, dict[str, Any] | None]],
+    ) -> list[Record]:
+        """
+        Run a list of arbitrary write statements in a single transaction.
+
+        If any statement fails, the transaction is rolled back and none of
+        the statements take effect.
+
+        Args:
+            stmts: List of (qry_string, param_dict) tuples, run in order.
+
+        Returns:
+            List of Records returned by the last statement.
+        """
+        for qry, parms in stmts:
+            if not isinstance(qry, str):
+                msg = "qry= must be a string"
+                raise TypeError(msg)
+            if parms is not None and not isinstance(parms, dict):
+                msg = "parms= must be a dict"
+                raise TypeError(msg)
+
+        def txn_q(tx: ManagedTransaction) -> list[Record]:
+            result = []
+            for qry, parms in stmts:
+                result = list(
+                    tx.run(cast("LiteralString", qry), parameters=parms or {}),
+                )
+            return result
+
+        with self.session() as session:
+            result = session.execute_write(txn_q)
+        self.invalidate_results([parms for _, parms in stmts])
+        return result
+
+    def invalidate_results(self, parms_list: list[dict[str, Any] | None]) -> None:
+        """
+        Drop cached read results made stale by write statements.
+
+        The statements' "model" and "version" parameters identify the model
+        written to. If a statement has no "model" parameter, the whole
+        result cache is cleared.
+
+        Args:
+            parms_list: The parameter dicts of the statements written.
+        """
+        cache = self.result_cache
+        if cache is None:
+            return
+        for parms in parms_list:
+            if not parms or parms.get("model") is None:
+                cache.invalidate()
+                return
+            cache.invalidate(parms["model"], parms.get("version"))
+
     @write_txn  # type: ignore[reportArgumentType]
     def put_term_with_origin(
         self,
@@ -17,12 +17,14 @@ import sys
 sys.path.append("..")
 import builtins
 import contextlib
+from pathlib import Path
+from typing import Any
 from uuid import uuid4
 from warnings import warn
 
 import neo4j.graph
 
-from bento_meta.entity import ArgError, Entity
+from bento_meta.entity import ArgError, Entity, dirty_entities
 from bento_meta.mdb import MDB, make_nanoid
 from bento_meta.object_map import ObjectMap
 from bento_meta.objects import (
@@ -36,6 +38,206 @@ from bento_meta.objects import (
     Term,
     ValueSet,
 )
+from bento_meta.snapshot import read_snapshot, write_snapshot
+
+
+class EntityDict(dict):
+    """
+    Dict of Entities that keeps track of the entities it holds, by identity.
+
+    :meth:`holds` answers whether an entity is a value of the dict in constant
+    time. The bookkeeping is done by all the dict methods that add or remove
+    items.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        """Create the dict, as for dict()."""
+        super().__init__()
+        self._ids: dict[int, int] = {}  # id(entity) -> number of keys for it
+        self.update(*args, **kwargs)
+
+    def _index(self, key: Any, ent: Entity) -> None:  # noqa: ANN401
+        """Record a new item. For subclasses."""
+
+    def _unindex(self, key: Any, ent: Entity) -> None:  # noqa: ANN401
+        """Forget a removed or replaced item. For subclasses."""
+
+    def _ref(self, ent: Entity) -> None:
+        self._ids[id(ent)] = self._ids.get(id(ent), 0) + 1
+
+    def _unref(self, ent: Entity) -> None:
+        n = self._ids.pop(id(ent)) - 1
+        if n:
+            self._ids[id(ent)] = n
+
+    def __setitem__(self, key: Any, ent: Entity) -> None:  # noqa: ANN401
+        """Set an entity."""
+        if key in self:
+            old = super().__getitem__(key)
+            self._unindex(key, old)
+            self._unref(old)
+        self._index(key, ent)
+        super().__setitem__(key, ent)
+        self._ref(ent)
+
+    def __delitem__(self, key: Any) -> None:  # noqa: ANN401
+        """Delete an entity."""
+        ent = super().__getitem__(key)
+        super().__delitem__(key)
+        self._unindex(key, ent)
+        self._unref(ent)
+
+    def pop(self, key: Any, *default: Any) -> Any:  # noqa: ANN401
+        """Remove an entity and return it, as for dict.pop()."""
+        if key in self:
+            ent = self[key]
+            del self[key]
+            return ent
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def popitem(self) -> tuple[Any, Entity]:
+        """Remove and return the last (key, entity) pair."""
+        (key, ent) = super().popitem()
+        self._unindex(key, ent)
+        self._unref(ent)
+        return (key, ent)
+
+    def setdefault(self, key: Any, default: Entity | None = None) -> Any:  # noqa: ANN401
+        """Get an entity, setting it to default first if absent."""
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        """Set entities from a dict or iterable of pairs, as for dict.update()."""
+        for key, ent in dict(*args, **kwargs).items():
+            self[key] = ent
+
+    def __ior__(self, other: Any) -> EntityDict:  # noqa: ANN401
+        """Update in place."""
+        self.update(other)
+        return self
+
+    def clear(self) -> None:
+        """Remove all entities."""
+        for key in list(self):
+            del self[key]
+
+    def holds(self, ent: Entity) -> bool:
+        """Whether ent (that very object) is a value in the dict."""
+        return id(ent) in self._ids
+
+
+class EdgeDict(EntityDict):
+    """
+    EntityDict of Edges keyed by (edge handle, src handle, dst handle) triplets.
+
+    Keeps an index for each component of the key, so that the edges with a
+    given type, src or dst can be found without scanning every key.
+    """
+
+    TYPE, SRC, DST = 0, 1, 2
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        """Create the dict, as for dict()."""
+        self._idx: tuple[dict[str, dict[tuple, None]], ...] = ({}, {}, {})
+        super().__init__(*args, **kwargs)
+
+    def _index(self, key: tuple[str, str, str], ent: Edge) -> None:
+        for i, idx in enumerate(self._idx):
+            idx.setdefault(key[i], {})[key] = None
+
+    def _unindex(self, key: tuple[str, str, str], ent: Edge) -> None:
+        for i, idx in enumerate(self._idx):
+            keys = idx[key[i]]
+            del keys[key]
+            if not keys:
+                del idx[key[i]]
+
+    def by(self, pos: int, handle: str) -> list[Edge]:
+        """
+        Get the edges with a given handle at a position of their key.
+
+        Args:
+            pos: EdgeDict.TYPE, EdgeDict.SRC or EdgeDict.DST.
+            handle: The edge handle, or src or dst node handle.
+
+        Returns:
+            List of Edge instances, in insertion order.
+        """
+        return [self[k] for k in self._idx[pos].get(handle, ())]
+
+
+def _value_set_terms(prop: Property) -> list[Term]:
+    """Terms of a property's value set, read without lazy retrieval."""
+    vs = prop._stored("value_set")  # noqa: SLF001
+    terms = vs._stored("terms") if vs is not None else None  # noqa: SLF001
+    return list(terms.data.values()) if terms else []
+
+
+class PropDict(EntityDict):
+    """
+    EntityDict of Properties keyed by (owner handle(s), prop.handle) tuples.
+
+    Keeps two reverse indexes: from each property to the keys it is held
+    under (and so to the nodes and edges that own it), and from each term
+    to the properties whose value sets contain it. The term index is taken
+    from a property's value set when the property is first added; call
+    :meth:`reindex_terms` after changing the value set of a held property.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        """Create the dict, as for dict()."""
+        self._keys_of: dict[int, dict[tuple, None]] = {}
+        self._terms_of: dict[int, dict[int, Term]] = {}  # id(prop) -> terms
+        self._props_of: dict[int, dict[int, Property]] = {}  # id(term) -> props
+        super().__init__(*args, **kwargs)
+
+    def _index(self, key: tuple, ent: Property) -> None:
+        keys = self._keys_of.setdefault(id(ent), {})
+        keys[key] = None
+        if len(keys) == 1:
+            self._set_terms(ent, _value_set_terms(ent))
+
+    def _unindex(self, key: tuple, ent: Property) -> None:
+        keys = self._keys_of[id(ent)]
+        del keys[key]
+        if not keys:
+            del self._keys_of[id(ent)]
+            self._set_terms(ent, [])
+
+    def _set_terms(self, prop: Property, terms: list[Term]) -> None:
+        new = {id(t): t for t in terms}
+        old = self._terms_of.pop(id(prop), {})
+        for tid in old.keys() - new.keys():
+            props = self._props_of[tid]
+            del props[id(prop)]
+            if not props:
+                del self._props_of[tid]
+        for tid, t in new.items():
+            self._props_of.setdefault(tid, {})[id(prop)] = prop
+        if new:
+            self._terms_of[id(prop)] = new
+
+    def reindex_terms(self, prop: Property) -> None:
+        """
+        Update the term index from the current value set of a held property.
+
+        Args:
+            prop: A Property in the dict.
+        """
+        if self.holds(prop):
+            self._set_terms(prop, _value_set_terms(prop))
+
+    def keys_of(self, prop: Property) -> list[tuple]:
+        """Get the keys that prop is held under, in insertion order."""
+        return list(self._keys_of.get(id(prop), ()))
+
+    def props_with(self, term: Term) -> list[Property]:
+        """Get the held properties whose value sets contain term."""
+        return list(self._props_of.get(id(term), {}).values())
 
 
 class Model:
@@ -66,24 +268,56 @@ class Model:
         self.uri = uri
         self.repository = None
         self._mdb: MDB | None = None
-        self.nodes: dict[str, Node] = {}
-        self.edges: dict[
-            tuple[str, str, str],
-            Edge,
-        ] = {}  # keys are (edge.handle, src.handle, dst.handle) tuples
-        self.props: dict[
-            tuple[str, str],
-            Property,
-        ] = {}  # keys are ({edge|node}.handle, prop.handle) tuples
-        self.terms: dict[
-            tuple[str, str, str | None, str | None],
-            Term,
-        ] = {}  # keys are (term.handle, term.origin_name, term.origin_id, term.origin_version) tuples
+        self.nodes = EntityDict()  # keys are node handles
+        self.edges = EdgeDict()  # keys are (edge.handle, src.handle, dst.handle) tuples
+        self.props = PropDict()  # keys are ({edge|node}.handle, prop.handle) tuples
+        # keys are (term.handle, term.origin_name, term.origin_id, term.origin_version)
+        self.terms = EntityDict()
         self.removed_entities: list[Entity] = []
 
         if mdb:
             self.mdb = mdb
 
+    @property
+    def nodes(self) -> EntityDict:
+        """Nodes of the model, keyed by handle."""
+        return self._nodes
+
+    @nodes.setter
+    def nodes(self, value: dict[str, Node]) -> None:
+        """Set the nodes, indexing them if value is a plain dict."""
+        self._nodes = value if isinstance(value, EntityDict) else EntityDict(value)
+
+    @property
+    def edges(self) -> EdgeDict:
+        """Edges of the model, keyed by (edge.handle, src.handle, dst.handle)."""
+        return self._edges
+
+    @edges.setter
+    def edges(self, value: dict[tuple[str, str, str], Edge]) -> None:
+        """Set the edges, indexing them if value is a plain dict."""
+        self._edges = value if isinstance(value, EdgeDict) else EdgeDict(value)
+
+    @property
+    def props(self) -> PropDict:
+        """Properties of the model, keyed by (owner handle(s), prop.handle) tuples."""
+        return self._props
+
+    @props.setter
+    def props(self, value: dict[tuple, Property]) -> None:
+        """Set the properties, indexing them if value is a plain dict."""
+        self._props = value if isinstance(value, PropDict) else PropDict(value)
+
+    @property
+    def terms(self) -> EntityDict:
+        """Terms of the model, keyed by (handle, origin_name, origin_id, origin_version)."""
+        return self._terms
+
+    @terms.setter
+    def terms(self, value: dict[tuple, Term]) -> None:
+        """Set the terms, indexing them if value is a plain dict."""
+        self._terms = value if isinstance(value, EntityDict) else EntityDict(value)
+
     @property
     def drv(self) -> neo4j.Driver | None:
         """Neo4j database driver from MDB object."""
@@ -303,6 +537,7 @@ class Model:
                 term.origin_version,
             )
             self.terms[full_term_key] = term
+        self.props.reindex_terms(prop)
 
     def rm_node(self, node: Node) -> Node | None:
         """
@@ -385,8 +620,9 @@ class Model:
                 stacklevel=2,
             )
             return
-        for okey in prop.belongs:
-            owner = prop.belongs[okey]
+        for okey, owner in list(prop.belongs.items()):
+            if len(okey) != 3 or not isinstance(owner, (Node, Edge)):
+                continue  # e.g., the prop attribute of its value set
             (i, att, key) = okey
             del getattr(owner, att)[key]
             k = [owner.handle] if isinstance(owner, Node) else list(owner.triplet)
@@ -394,11 +630,39 @@ class Model:
             del self.props[tuple(k)]
         self.removed_entities.append(prop)
 
-    def rm_term(self, term: Term) -> None:
-        """Not implemented."""
+    def rm_term(self, term: Term) -> Term | None:
+        """
+        Remove a Term instance from the Model instance.
+
+        The term is removed from the value sets of the model's properties
+        that contain it, and from Model.terms. Concepts annotated with the
+        term are not changed.
+
+        Args:
+            term: Term to be removed.
+
+        Returns:
+            The removed Term, or None if not found.
+        """
         if not isinstance(term, Term):
             msg = "arg must be a Term object"
             raise ArgError(msg)
+        props = self.props.props_with(term)
+        if not props and not self.contains(term):
+            warn(
+                f"term '{term.handle or term.value}' not contained in model "
+                f"'{self.handle}'",
+                stacklevel=2,
+            )
+            return None
+        for prop in props:
+            terms = prop.value_set.terms
+            for key in [k for k, t in terms.data.items() if t is term]:
+                del terms[key]
+            self.props.reindex_terms(prop)
+        for key in [k for k, t in self.terms.items() if t is term]:
+            del self.terms[key]
+        return term
 
     def assign_edge_end(
         self,
@@ -453,15 +717,66 @@ class Model:
             warn("argument is not an Entity subclass", stacklevel=2)
             return None
         if isinstance(ent, Node):
-            return ent in set(self.nodes.values())
+            return self.nodes.holds(ent)
         if isinstance(ent, Edge):
-            return ent in set(self.edges.values())
+            return self.edges.holds(ent)
         if isinstance(ent, Property):
-            return ent in set(self.props.values())
+            return self.props.holds(ent)
         if isinstance(ent, Term):
-            return ent in set(self.terms.values())
+            return self.terms.holds(ent)
         return None
 
+    def prop_owners(self, prop: Property) -> list[Node | Edge]:
+        """
+        Get the Nodes and Edges of the model that have a given Property.
+
+        Answered from an index maintained on Model.props; the database is
+        not queried.
+
+        Args:
+            prop: A Property.
+
+        Returns:
+            List of Node and Edge instances; empty if prop is not in the model.
+        """
+        owners = []
+        for key in self.props.keys_of(prop):
+            owner = self.nodes.get(key[0]) if len(key) == 2 else self.edges.get(key[:3])
+            if owner is not None:
+                owners.append(owner)
+        return owners
+
+    def term_props(self, term: Term) -> list[Property]:
+        """
+        Get the Properties of the model whose value sets contain a given Term.
+
+        Answered from an index maintained on Model.props; the database is
+        not queried. Value sets that have not been retrieved yet (after
+        dget() without eager=True) are not in the index.
+
+        Args:
+            term: A Term.
+
+        Returns:
+            List of Property instances.
+        """
+        return self.props.props_with(term)
+
+    def term_value_sets(self, term: Term) -> list[ValueSet]:
+        """
+        Get the ValueSets of the model's Properties that contain a given Term.
+
+        Args:
+            term: A Term.
+
+        Returns:
+            List of ValueSet instances.
+        """
+        return [
+            p._stored("value_set")  # noqa: SLF001
+            for p in self.props.props_with(term)
+        ]
+
     def edges_in(self, node: Node) -> list[Edge]:
         """
         Get all Edge that have a given Node as their dst attribute.
@@ -475,7 +790,7 @@ class Model:
         if not isinstance(node, Node):
             msg = "arg must be Node"
             raise ArgError(msg)
-        return [self.edges[i] for i in self.edges if i[2] == node.handle]
+        return self.edges.by(EdgeDict.DST, node.handle)
 
     def edges_out(self, node: Node) -> list[Edge]:
         """
@@ -490,7 +805,7 @@ class Model:
         if not isinstance(node, Node):
             msg = "arg must be Node"
             raise ArgError(msg)
-        return [self.edges[i] for i in self.edges if i[1] == node.handle]
+        return self.edges.by(EdgeDict.SRC, node.handle)
 
     def edges_by(self, key: str, item: Node | str) -> list[Edge]:
         """
@@ -507,9 +822,9 @@ class Model:
             msg = "arg 'key' must be one of src|dst|type"
             raise ArgError(msg)
         if isinstance(item, Node):
-            idx = 1 if key == "src" else 2
-            return [self.edges[x] for x in self.edges if x[idx] == item.handle]
-        return [self.edges[x] for x in self.edges if x[0] == item]
+            pos = EdgeDict.SRC if key == "src" else EdgeDict.DST
+            return self.edges.by(pos, item.handle)
+        return self.edges.by(EdgeDict.TYPE, item)
 
     def edges_by_src(self, node: Node) -> list[Edge]:
         """
@@ -550,14 +865,21 @@ class Model:
             raise ArgError(msg)
         return self.edges_by("type", edge_handle)
 
-    def dget(self, *, refresh: bool = False) -> Model | None:
+    def dget(self, *, refresh: bool = False, eager: bool = False) -> Model | None:
         """
         Pull model from MDB into this Model instance, based on its handle.
 
         Note: is a noop if Model.mdb is unset.
 
+        By default, properties are retrieved as stubs that get their
+        value sets, concepts and tags from the database when first accessed.
+        With eager=True, value sets, terms, concepts, origins and tags are
+        retrieved up front with a fixed number of queries, and no database
+        access is needed to walk the model afterwards.
+
         Args:
             refresh: If True, clear cache before retrieving.
+            eager: If True, retrieve the full object graph in one go.
 
         Returns:
             The Model instance, or None if mdb is not set.
@@ -566,132 +888,325 @@ class Model:
             return None
         if refresh:
             ObjectMap.clear_cache()
+        retrieved = {}
+
+        def keep(ent: Entity) -> None:
+            retrieved[ent.neoid] = ent
+            ObjectMap.cache[ent.neoid] = ent
+
+        with ObjectMap.cache.partition(self.handle, self.version):
+            with self.drv.session() as session:
+                result = session.run(
+                    """
+                    match p = (s:node {model:$hndl, version:$vers})<-[:has_src]-
+                              (r:relationship {model:$hndl, version:$vers})-[:has_dst]->
+                              (d:node {model:$hndl, version:$vers})
+                    return p
+                    """,
+                    {"hndl": self.handle, "vers": self.version},
+                )
+                for rec in result:
+                    (ns, nr, nd) = rec["p"].nodes
+                    ns = Node(ns)
+                    nr = Edge(nr)
+                    nd = Node(nd)
+                    keep(ns)
+                    keep(nr)
+                    keep(nd)
+                    nr.src = ns
+                    nr.dst = nd
+                    self.nodes[ns.handle] = ns
+                    self.nodes[nd.handle] = nd
+                    self.edges[nr.triplet] = nr
+                result = session.run(
+                    """
+                    match (n:node {model:$hndl, version:$vers})
+                    where not (n)<--(:relationship)
+                    return n
+                    """,
+                    {"hndl": self.handle, "vers": self.version})
+                for rec in result:
+                    n = Node(rec["n"])
+                    keep(n)
+                    self.nodes[n.handle] = n
+
+            with self.drv.session() as session:
+                result = session.run(
+                    """
+                    match (n:node {model:$hndl, version:$vers})-[:has_property]->
+                    (p:property {model:$hndl, version:$vers})
+                    return id(n), p
+                    """,
+                    {"hndl": self.handle, "vers":self.version},
+                )
+                for rec in result:
+                    n = retrieved.get(rec["id(n)"])
+                    if n is None:
+                        warn(
+                            "node with id {nid} not yet retrieved".format(nid=rec["id(n)"]),
+                            stacklevel=2,
+                        )
+                        continue
+                    p = Property(rec["p"])
+                    keep(p)
+                    self.props[(n.handle, p.handle)] = p
+                    n.props[p.handle] = p
+                    p.dirty = -1
+            with self.drv.session() as session:
+                result = session.run(
+                    """
+                    match (r:relationship {model:$hndl, version:$vers})-[:has_property]->
+                          (p:property {model:$hndl, version:$vers}) 
+                    return id(r), p
+                    """,
+                    {"hndl": self.handle, "vers":self.version},
+                )
+                for rec in result:
+                    e = retrieved.get(rec["id(r)"])
+                    if e is None:
+                        warn(
+                            "relationship with id {rid} not yet retrieved".format(
+                                rid=rec["id(r)"],
+                            ),
+                            stacklevel=2,
+                        )
+                        continue
+                    p = Property(rec["p"])
+                    keep(p)
+                    k = list(e.triplet)
+                    k.append(p.handle)
+                    self.props[tuple(k)] = p
+                    e.props[p.handle] = p
+                    p.dirty = -1
+            for ent in retrieved.values():
+                if ent.dirty == 1:  # as in the database; nothing to put
+                    ent.dirty = 0
+            if eager:
+                self._dget_eager()
+        return self
+
+    @staticmethod
+    def _cached(cls: type[Entity], node: neo4j.graph.Node) -> Entity:
+        """Return the cached object for a db node, creating and caching it if needed."""
+        obj = ObjectMap.cache.lookup(node)
+        if obj is None:
+            obj = cls(node)
+            ObjectMap.cache[obj.neoid] = obj
+        return obj
+
+    def _dget_eager(self) -> None:
+        """
+        Retrieve value sets, terms, concepts, origins and tags for the model.
+
+        Called by :meth:`dget` after nodes, edges and properties are retrieved.
+        All retrieved entities are left clean (dirty == 0), so that no lazy
+        retrieval happens later.
+        """
+        if self.drv is None:
+            return
+        ents = {
+            e.neoid: e
+            for e in (*self.nodes.values(), *self.edges.values(), *self.props.values())
+        }
         with self.drv.session() as session:
             result = session.run(
                 """
-                match p = (s:node {model:$hndl, version:$vers})<-[:has_src]-
-                          (r:relationship {model:$hndl, version:$vers})-[:has_dst]->
-                          (d:node {model:$hndl, version:$vers})
-                return p
+                match (p:property)-[:has_value_set]->(vs:value_set)
+                where id(p) in $ids
+                optional match (vs)-[:has_term]->(t:term)
+                return id(p) as pid, vs, collect(t) as terms
                 """,
-                {"hndl": self.handle, "vers": self.version},
+                {"ids": [p.neoid for p in self.props.values()]},
             )
             for rec in result:
-                (ns, nr, nd) = rec["p"].nodes
-                ns = Node(ns)
-                nr = Edge(nr)
-                nd = Node(nd)
-                ObjectMap.cache[ns.neoid] = ns
-                ObjectMap.cache[nr.neoid] = nr
-                ObjectMap.cache[nd.neoid] = nd
-                nr.src = ns
-                nr.dst = nd
-                self.nodes[ns.handle] = ns
-                self.nodes[nd.handle] = nd
-                self.edges[nr.triplet] = nr
+                p = ents[rec["pid"]]
+                vs = self._cached(ValueSet, rec["vs"])
+                p.value_set = vs
+                vs.prop = p
+                ents[vs.neoid] = vs
+                for t in rec["terms"]:
+                    tm = self._cached(Term, t)
+                    vs.terms[getattr(tm, Term.mapspec()["key"])] = tm
+                    ents[tm.neoid] = tm
+                    self.terms[
+                        (
+                            tm.handle if tm.handle else tm.value,
+                            tm.origin_name,
+                            tm.origin_id,
+                            tm.origin_version,
+                        )
+                    ] = tm
+                self.props.reindex_terms(p)
             result = session.run(
                 """
-                match (n:node {model:$hndl, version:$vers})
-                where not (n)<--(:relationship)
-                return n
+                match (e)-[:has_concept|represents]->(c:concept)
+                where id(e) in $ids
+                optional match (c)<-[:represents]-(t:term)
+                return id(e) as eid, c, collect(t) as terms
                 """,
-                {"hndl": self.handle, "vers": self.version})
+                {"ids": list(ents)},
+            )
             for rec in result:
-                n = Node(rec["n"])
-                ObjectMap.cache[n.neoid] = n
-                self.nodes[n.handle] = n
-
-        with self.drv.session() as session:
+                c = self._cached(Concept, rec["c"])
+                ents[rec["eid"]].concept = c
+                for t in rec["terms"]:
+                    tm = self._cached(Term, t)
+                    c.terms[getattr(tm, Term.mapspec()["key"])] = tm
+                    tm.concept = c
+                    ents[tm.neoid] = tm
+                ents[c.neoid] = c
             result = session.run(
                 """
-                match (n:node {model:$hndl, version:$vers})-[:has_property]->
-                (p:property {model:$hndl, version:$vers})
-                return id(n), p
+                match (x)-[:has_origin]->(o:origin)
+                where id(x) in $ids
+                return id(x) as xid, o
                 """,
-                {"hndl": self.handle, "vers":self.version},
+                {
+                    "ids": [
+                        k for k, e in ents.items() if isinstance(e, (Term, ValueSet))
+                    ],
+                },
             )
             for rec in result:
-                n = ObjectMap.cache.get(rec["id(n)"])
-                if n is None:
-                    warn(
-                        "node with id {nid} not yet retrieved".format(nid=rec["id(n)"]),
-                        stacklevel=2,
-                    )
-                    continue
-                p = Property(rec["p"])
-                ObjectMap.cache[p.neoid] = p
-                self.props[(n.handle, p.handle)] = p
-                n.props[p.handle] = p
-                p.dirty = -1
-        with self.drv.session() as session:
+                o = self._cached(Origin, rec["o"])
+                ents[rec["xid"]].origin = o
+                o.dirty = 0
             result = session.run(
                 """
-                match (r:relationship {model:$hndl, version:$vers})-[:has_property]->
-                      (p:property {model:$hndl, version:$vers}) 
-                return id(r), p
+                match (x)-[:has_tag]->(g:tag)
+                where id(x) in $ids
+                return id(x) as xid, collect(g) as tags
                 """,
-                {"hndl": self.handle, "vers":self.version},
+                {"ids": list(ents)},
             )
             for rec in result:
-                e = ObjectMap.cache.get(rec["id(r)"])
-                if e is None:
-                    warn(
-                        "relationship with id {rid} not yet retrieved".format(
-                            rid=rec["id(r)"],
-                        ),
-                        stacklevel=2,
-                    )
-                    continue
-                p = Property(rec["p"])
-                ObjectMap.cache[p.neoid] = p
-                k = list(e.triplet)
-                k.append(p.handle)
-                self.props[tuple(k)] = p
-                e.props[p.handle] = p
-                p.dirty = -1
-        return self
+                e = ents[rec["xid"]]
+                for g in rec["tags"]:
+                    tag = self._cached(Tag, g)
+                    e.tags[getattr(tag, Tag.mapspec()["key"])] = tag
+                    tag.dirty = 0
+        for e in ents.values():
+            e.dirty = 0
 
     def dput(self) -> None:
         """
-        Push this Model's objects to MDB.
+        Push this Model's changed objects to MDB.
+
+        Only entities that are marked dirty (see
+        :func:`bento_meta.entity.dirty_entities`) and that are part of this
+        model are put, class by class, with each class's
+        :meth:`ObjectMap.put_many`; the rest of the object graph is not
+        visited. All changes are pushed in a single transaction. If it
+        fails, the entities are left dirty.
 
         Note: is a noop if Model.mdb is unset.
         """
         if not self.mdb or self.drv is None:
             return
-        seen = {}
-
-        def do_(obj: Entity) -> None:
-            if id(obj) in seen:
-                return
-            seen[id(obj)] = 1
-            if obj.dirty == 1:
-                obj.dput()
-            atts = [x for x in type(obj).attspec if type(obj).attspec[x] == "object"]
-            for att in atts:
-                ent = getattr(obj, att)
-                if ent:
-                    do_(ent)
-            atts = [
-                x for x in type(obj).attspec if type(obj).attspec[x] == "collection"
-            ]
-            for att in atts:
-                ents = getattr(obj, att)
-                if ents:
-                    for ent in ents:
-                        do_(ents[ent])
-
-        for e in self.removed_entities:
-            # detach
+        stash = [(e, e.neoid) for e in dirty_entities()]
+        by_cls: dict[type[Entity], list[Entity]] = {}
+        for e in self._model_entities([e for e, _ in stash]):
+            by_cls.setdefault(type(e), []).append(e)
+        try:
             with self.drv.session() as session:
-                session.run(
-                    "match (e)-[r]-() where id(e)=$eid delete r return id(e)",
-                    {"eid": e.neoid},
-                ).consume()
-        for e in self.nodes.values():
-            do_(e)
-        for e in self.edges.values():
-            do_(e)
-        for e in self.props.values():
-            do_(e)
-        return
+                with session.begin_transaction() as tx:
+                    for e in self.removed_entities:
+                        # detach
+                        tx.run(
+                            "match (e)-[r]-() where id(e)=$eid delete r return id(e)",
+                            {"eid": e.neoid},
+                        ).consume()
+                    for cls, ents in by_cls.items():
+                        # skip entities already put along with an earlier class
+                        if todo := [e for e in ents if e.dirty == 1]:
+                            cls.object_map.put_many(todo, tx)
+        except BaseException:
+            for e, neoid in stash:  # as before the transaction
+                if e.neoid != neoid:
+                    ObjectMap.cache.pop(e.neoid, None)
+                    e.neoid = neoid
+                e.dirty = 1
+            raise
+        self.removed_entities = []
+        if self.mdb.result_cache is not None:
+            self.mdb.result_cache.invalidate(self.handle, self.version)
+
+    def _has_entity(
+        self,
+        ent: Entity,
+        memo: dict[int, bool] | None = None,
+    ) -> bool:
+        """
+        Whether an entity is part of this model.
+
+        True if ent is one of the model's nodes, edges, properties or terms,
+        or belongs (by way of its owners) to one of them.
+
+        Args:
+            ent: The entity.
+            memo: Results of earlier calls, by entity id, to reuse and
+                add to; owners already found not to be part of the model
+                are not walked again.
+        """
+        if memo is None:
+            memo = {}
+        seen = set()
+        todo = [ent]
+        while todo:
+            e = todo.pop()
+            if id(e) in seen:
+                continue
+            seen.add(id(e))
+            known = memo.get(id(e))
+            if known is False:
+                continue
+            if known or (
+                self.nodes.holds(e)
+                or self.edges.holds(e)
+                or self.props.holds(e)
+                or self.terms.holds(e)
+            ):
+                memo[id(ent)] = True
+                return True
+            pvt = e._stored("pvt")  # noqa: SLF001
+            if pvt and pvt.get("belongs"):
+                todo.extend(pvt["belongs"].values())
+        # nothing reached from ent is part of the model
+        memo.update(dict.fromkeys(seen, False))
+        return False
+
+    def _model_entities(self, ents: list[Entity]) -> list[Entity]:
+        """Return the entities of a list that are part of this model."""
+        memo: dict[int, bool] = {}
+        return [e for e in ents if self._has_entity(e, memo)]
+
+    def to_snapshot(self, path: str | Path) -> None:
+        """
+        Write the model's full object graph to a snapshot file.
+
+        The snapshot can be loaded with :meth:`from_snapshot` without a database
+        connection. Entities not yet retrieved from the database (see
+        :meth:`dget`) are saved as they are; use dget(eager=True) first for a
+        complete snapshot.
+
+        Args:
+            path: File to write.
+        """
+        write_snapshot(self, path)
+
+    @classmethod
+    def from_snapshot(cls, path: str | Path, mdb: MDB | None = None) -> Model:
+        """
+        Create a Model from a snapshot file written by :meth:`to_snapshot`.
+
+        Args:
+            path: Snapshot file to read.
+            mdb: An MDB object to connect the model to, if any.
+
+        Returns:
+            The new Model instance.
+        """
+        model = read_snapshot(path, cls)
+        if mdb:
+            model.mdb = mdb
+        return model
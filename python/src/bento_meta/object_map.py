@@ -26,9 +26,11 @@ sys.path.append("..")
 from typing import Any, ClassVar, cast
 from warnings import warn
 
+import neo4j.graph
 from neo4j import BoltDriver, Driver, Neo4jDriver, Transaction
 from typing_extensions import LiteralString
 
+from bento_meta.cache import EntityCache
 from bento_meta.entity import ArgError, CollValue, Entity
 from bento_meta.objects import (
     Concept,
@@ -47,6 +49,108 @@ from bento_meta.tf_objects import (
     )
 
 from pdb import set_trace
+
+
+def _resolve_cls(name: str) -> type[Entity]:
+    """Get the Entity subclass named in a mapspec end_cls."""
+    cls = globals().get(name)
+    if isinstance(cls, type) and issubclass(cls, Entity):
+        return cls
+    todo = [Entity]
+    while todo:  # classes defined elsewhere
+        c = todo.pop()
+        if c.__name__ == name:
+            return c
+        todo.extend(c.__subclasses__())
+    msg = f"unknown Entity subclass '{name}' in mapspec"
+    raise ArgError(msg)
+
+
+class RelSpec:
+    """
+    Resolved mapping of one relationship attribute of an Entity subclass.
+
+    Holds the end classes named in the mapspec, resolved to classes and
+    labels, and the query templates for the attribute. Created once per
+    class and attribute; see :meth:`ObjectMap.relspec`.
+
+    Attributes:
+        att: The attribute name.
+        many: True if the attribute is a collection.
+        rel_type: The relationship type, e.g. "has_property".
+        end_cls: Tuple of the classes the attribute can hold.
+        end_lbls: List of the labels of end_cls.
+        get_q: Query for the end nodes of one object ($id).
+        get_many_match: OPTIONAL MATCH clause binding the end nodes a of n.
+        put_q: Statement linking an object ($id) to an end node ($aid).
+        put_many_q: Statement linking pairs of ids in $rows (s, d).
+        rm_q: Statement unlinking an object ($id) from an end node ($aid).
+        rm_all_q: Statement unlinking an object ($id) from all its end nodes.
+    """
+
+    def __init__(self, cls: type[Entity], att: str) -> None:
+        """
+        Resolve the mapspec of a relationship attribute.
+
+        Args:
+            cls: The Entity subclass.
+            att: A relationship attribute of cls.
+        """
+        spec = cls.mapspec()["relationship"][att]
+        end_cls = spec["end_cls"]
+        if isinstance(end_cls, str):
+            end_cls = {end_cls}
+        self.att = att
+        self.many = cls.attspec[att] == "collection"
+        self.rel_type = re.match("[:<>]*([a-zA-Z0-9_]+)", spec["rel"]).group(1)
+        self.end_cls = tuple(_resolve_cls(x) for x in end_cls)
+        self.end_lbls = [x.mapspec()["label"] for x in self.end_cls]
+
+        label = cls.mapspec()["label"]
+        rel = re.sub("^([^:]?)(:[a-zA-Z0-9_]+)(.*)$", r"\1-[\2]-\3", spec["rel"])
+        rel_r = re.sub("^([^:]?)(:[a-zA-Z0-9_]+)(.*)$", r"\1-[r\2]-\3", spec["rel"])
+        if len(self.end_lbls) == 1:
+            lbl = self.end_lbls[0]
+            self.get_q = f"MATCH (n:{label}){rel}(a:{lbl}) WHERE id(n)=$id RETURN a"
+            if not self.many:
+                self.get_q += " LIMIT 1"
+            self.get_many_match = f"OPTIONAL MATCH (n){rel}(a:{lbl})"
+            self.put_q = (
+                f"MATCH (n:{label}),(a:{lbl}) "
+                f"WHERE id(n)=$id AND id(a)=$aid MERGE (n){rel}(a) RETURN id(a)"
+            )
+            match_d = f"MATCH (a:{lbl}) WHERE id(a) = row.d"
+            self.rm_q = (
+                f"MATCH (n:{label}){rel_r}(a:{lbl}) "
+                "WHERE id(n)=$id AND id(a)=$aid DELETE r RETURN id(n),id(a)"
+            )
+            self.rm_all_q = (
+                f"MATCH (n:{label}){rel_r}(a:{lbl}) WHERE id(n)=$id "
+                "DELETE r RETURN id(n),id(a)"
+            )
+        else:  # multiple end classes possible
+            cond = " OR ".join([f"'{lbl}' IN labels(a)" for lbl in self.end_lbls])
+            self.get_q = f"MATCH (n:{label}){rel}(a) WHERE id(n)=$id AND ({cond}) RETURN a"
+            self.get_many_match = f"OPTIONAL MATCH (n){rel}(a) WHERE {cond}"
+            self.put_q = (
+                f"MATCH (n:{label}),(a) WHERE id(n)=$id AND id(a)=$aid AND "
+                f"({cond}) MERGE (n){rel}(a) RETURN id(a)"
+            )
+            match_d = f"MATCH (a) WHERE id(a) = row.d AND ({cond})"
+            self.rm_q = (
+                f"MATCH (n:{label}){rel_r}(a) WHERE id(n)=$id AND id(a)=$aid "
+                f"AND ({cond}) DELETE r RETURN id(n),id(a)"
+            )
+            self.rm_all_q = (
+                f"MATCH (n:{label}){rel_r}(a) "
+                f"WHERE id(n)=$id AND ({cond}) DELETE r RETURN id(n)"
+            )
+        self.put_many_q = (
+            f"UNWIND $rows AS row MATCH (n:{label}) WHERE id(n) = row.s "
+            f"{match_d} MERGE (n){rel}(a)"
+        )
+
+
 class ObjectMap:
     """
     Machinery for mapping bento_meta objects to a Bento Metamodel Database in Neo4j.
@@ -54,7 +158,7 @@ class ObjectMap:
     Mostly not for human consumption.
     """
 
-    cache: ClassVar[dict] = {}
+    cache: ClassVar[EntityCache] = EntityCache()
 
     def __init__(
         self,
@@ -87,7 +191,7 @@ class ObjectMap:
     @classmethod
     def clear_cache(cls) -> None:
         """Clear the cache."""
-        cls.cache = {}
+        cls.cache.clear()
 
     @classmethod
     def cls_by_label(cls, lbl: str) -> type[Entity] | None:
@@ -98,6 +202,31 @@ class ObjectMap:
                 cls._clsxlbl[o.mapspec()["label"]] = o
         return cls._clsxlbl.get(lbl)
 
+    @classmethod
+    def relspec_for(cls, ecls: type[Entity], att: str) -> RelSpec:
+        """
+        Get the resolved mapping of a relationship attribute of a class.
+
+        The RelSpec is created on first use and kept for the life of the class.
+
+        Args:
+            ecls: An Entity subclass.
+            att: A relationship attribute of ecls.
+
+        Returns:
+            The RelSpec for the attribute.
+        """
+        if not hasattr(cls, "_relspecs"):
+            cls._relspecs = {}
+        rspec = cls._relspecs.get((ecls, att))
+        if rspec is None:
+            rspec = cls._relspecs[(ecls, att)] = RelSpec(ecls, att)
+        return rspec
+
+    def relspec(self, att: str) -> RelSpec:
+        """Get the resolved mapping of a relationship attribute of the mapped class."""
+        return ObjectMap.relspec_for(self.cls, att)
+
     @classmethod
     def keys_by_cls_and_reln(
         cls,
@@ -130,22 +259,6 @@ class ObjectMap:
                     cls._keysxcls[(o.__name__, r)] = (catt, o.mapspec()["key"])
         return cls._keysxcls.get((qcls.__name__, reln))
 
-    @classmethod
-    def _quote_val(
-        cls,
-        value: str | float | None,
-        *,
-        single: bool | None = None,
-    ) -> str | float | None:  # double quote unless single is set
-        """Quote the value unless single is set."""
-        if value is None:
-            return None
-        if isinstance(value, (int, float)):
-            return value  # no quote
-        if single:
-            return f"'{value}'"  # quote
-        return f'"{value}"'  # quote
-
     def get_by_id(
         self,
         obj: Entity,
@@ -199,136 +312,311 @@ class ObjectMap:
             if rec is not None:
                 neo4jid = rec["id(n)"]
 
-        if neo4jid is None:
+        if neo4jid is not None:
             obj.neoid = neo4jid
             return self.get(obj, refresh=True)
         return None
 
+    def get_by_nanoid(
+        self,
+        obj: Entity,
+        nanoid: str,
+        *,
+        version: str | None = None,
+        refresh: bool = False,
+    ) -> Entity | None:
+        """
+        Get an entity given its nanoid, independent of the Neo4j internal id.
+
+        If an entity for the db node is already in the cache (e.g., retrieved
+        before a database restore, or from another replica), that entity is
+        rebound to the node's current internal id and returned. Otherwise obj
+        is mapped to the node and loaded.
+
+        Args:
+            obj: Instance to load if the entity is not cached.
+            nanoid: The entity's nanoid.
+            version: Model version, to choose among versions sharing the nanoid.
+            refresh: If True, reload the entity even if found in the cache.
+
+        Returns:
+            The entity, or None if no current db node has the nanoid.
+        """
+        if not self.drv:
+            msg = "get_by_nanoid() requires Neo4j driver instance"
+            raise ArgError(msg)
+
+        with self.drv.session() as session:
+            result = session.run(
+                cast("LiteralString", self.get_by_nanoid_q(version=version)),
+                {"nanoid": nanoid, "version": version},
+            )
+            rec = result.single()
+        if rec is None:
+            return None
+        cached = ObjectMap.cache.lookup(rec["n"])
+        if cached is None:
+            obj.set_with_node(rec["n"])
+            return self.get(obj, refresh=True)
+        if refresh or cached.dirty < 0:
+            self.get(cached, refresh=True)
+        return cached
+
     def get(self, obj: Entity, *, refresh: bool = False) -> Entity:
         """Get the data for an object instance from the db and load the instance with it."""
         if not self.drv:
             msg = "get() requires Neo4j driver instance"
             raise ArgError(msg)
+        return self.get_many([obj], refresh=refresh)[0]
+
+    def get_many(self, objs: list[Entity], *, refresh: bool = False) -> list[Entity]:
+        """
+        Get the data for a list of object instances from the db in one query.
+
+        The instances must all be of the mapped class and must be mapped (have
+        neoid set). Each instance is loaded with its properties and all of its
+        relationship attributes, as with :meth:`get`.
+
+        Args:
+            objs: List of object instances to load.
+            refresh: If True, retrieve all instances, even if found in the cache.
 
-        if refresh:
-            pass
-        elif (obj.neoid in ObjectMap.cache) and (ObjectMap.cache[obj.neoid].dirty >= 0):
-            return obj
+        Returns:
+            The list of object instances.
+        """
+        if not self.drv:
+            msg = "get_many() requires Neo4j driver instance"
+            raise ArgError(msg)
+        todo = {}
+        for obj in objs:
+            if not refresh:
+                cached = ObjectMap.cache.get(obj.neoid)
+                if cached is not None and cached.dirty >= 0:
+                    continue
+            todo[obj.neoid] = obj
+        if not todo:
+            return objs
 
+        atts = list(self.cls.mapspec()["relationship"])
+        (qry, parms) = self.get_many_q(list(todo.values()))
         with self.drv.session() as session:
-            result = session.run(cast("LiteralString", self.get_q(obj)))
-            rec = result.single()
+            result = session.run(cast("LiteralString", qry), parms)
+            recs = {rec["neoid"]: rec for rec in result}
+
+        for neoid, obj in todo.items():
+            rec = recs.get(neoid)
             if not rec:
-                msg = f"object with id {obj.neoid} not found in db"
+                msg = f"object with id {neoid} not found in db"
                 raise RuntimeError(msg)
+            if neoid not in ObjectMap.cache:
+                ObjectMap.cache[neoid] = obj
+            for i, att in enumerate(atts):
+                self._set_attr_from_nodes(obj, att, rec[f"a{i}"])
+            obj.clear_removed_entities()
+            obj.dirty = 0
+        return objs
 
-        if obj.neoid not in ObjectMap.cache:
-            ObjectMap.cache[obj.neoid] = obj
-
-        with self.drv.session() as session:
-            for att in self.cls.mapspec()["relationship"]:
-                result = session.run(cast("LiteralString", self.get_attr_q(obj, att)))
-                values = {}
-                first_val = None
-                for rec in result:
-                    o = ObjectMap.cache.get(rec["a"].id)
-                    if o:
-                        if not first_val:
-                            first_val = o
-                        values[getattr(o, type(o).mapspec()["key"])] = o
-                    else:
-                        c = None
-                        for lbl in rec["a"].labels:
-                            c = ObjectMap.cls_by_label(lbl)
-                            if c:
-                                break
-                        if not c:
-                            msg = (
-                                f"node labels {rec['a'].labels} "
-                                "have no associated class in the object model"
-                            )
-                            raise RuntimeError(msg)
-                        o = c(rec["a"])
-                        o.dirty = -1
-                        ObjectMap.cache[o.neoid] = o
-                        if not first_val:
-                            first_val = o
-                        values[getattr(o, type(o).mapspec()["key"])] = o
-                if self.cls.attspec[att] == "object" and len(values) > 1:
-                    warn(
-                        (
-                            f"expected one node for attribute {att} on class "
-                            f"{self.cls.__name__}, but got {len(values)}; using first one"
-                        ),
-                        stacklevel=2,
-                    )
-                if self.cls.attspec[att] == "object":
-                    setattr(obj, att, first_val)
-                elif self.cls.attspec[att] == "collection":
-                    setattr(obj, att, values)
-                else:
+    def _set_attr_from_nodes(
+        self,
+        obj: Entity,
+        att: str,
+        nodes: list[neo4j.graph.Node],
+    ) -> None:
+        """Set a relationship attribute of obj to the objects for retrieved db nodes."""
+        values = {}
+        first_val = None
+        for a in nodes:
+            o = ObjectMap.cache.lookup(a)
+            if not o:
+                c = None
+                for lbl in a.labels:
+                    c = ObjectMap.cls_by_label(lbl)
+                    if c:
+                        break
+                if not c:
                     msg = (
-                        f"attribute '{att}' has unknown attribute type "
-                        f"'{self.cls.attspec[att]}'"
+                        f"node labels {a.labels} "
+                        "have no associated class in the object model"
                     )
                     raise RuntimeError(msg)
+                o = c(a)
+                o.dirty = -1
+                ObjectMap.cache[o.neoid] = o
+            if not first_val:
+                first_val = o
+            values[getattr(o, type(o).mapspec()["key"])] = o
+        if self.cls.attspec[att] == "object" and len(values) > 1:
+            warn(
+                (
+                    f"expected one node for attribute {att} on class "
+                    f"{self.cls.__name__}, but got {len(values)}; using first one"
+                ),
+                stacklevel=3,
+            )
+        if self.cls.attspec[att] == "object":
+            setattr(obj, att, first_val)
+        elif self.cls.attspec[att] == "collection":
+            setattr(obj, att, values)
+        else:
+            msg = (
+                f"attribute '{att}' has unknown attribute type "
+                f"'{self.cls.attspec[att]}'"
+            )
+            raise RuntimeError(msg)
 
-        obj.clear_removed_entities()
-        obj.dirty = 0
-        return obj
+    def put(self, obj: Entity, tx: Transaction | None = None) -> Entity:
+        """
+        Put the object instance's attributes to the mapped data node in the database.
+
+        Related entities that are not yet in the database are created, and
+        marked dirty so that their own attributes are put later.
 
-    def put(self, obj: Entity) -> Entity:
-        """Put the object instance's attributes to the mapped data node in the database."""
+        Args:
+            obj: The object instance to put.
+            tx: Optional transaction to use for the operation. If not given,
+                the put is done in a transaction of its own.
+
+        Returns:
+            The object instance.
+        """
         if not self.drv:
             msg = "put() requires Neo4j driver instance"
             raise ArgError(msg)
-        with self.drv.session() as session:
-            result = None
-            with session.begin_transaction() as tx:
-                for qry in self.put_q(obj):
-                    result = tx.run(cast("LiteralString", qry[0]), qry[1])
-                if result is None:
-                    msg = "no result from put_q"
-                    raise RuntimeError(msg)
-                obj.neoid = result.single().value("id(n)")
-                if obj.neoid is None:
+        if tx is not None:
+            self._put(obj, tx)
+        else:
+            with self.drv.session() as session:
+                with session.begin_transaction() as tx:
+                    self._put(obj, tx)
+        ObjectMap.cache[obj.neoid] = obj
+        obj.dirty = 0
+        return obj
+
+    def _put(self, obj: Entity, tx: Transaction) -> None:
+        result = None
+        for qry, parms in self.put_q(obj):
+            result = tx.run(cast("LiteralString", qry), parms)
+        if result is None:
+            msg = "no result from put_q"
+            raise RuntimeError(msg)
+        obj.neoid = result.single().value("id(n)")
+        if obj.neoid is None:
+            msg = (
+                "no neo4j id retrived on put for obj "
+                f"'{getattr(obj, self.cls.mapspec()['key'])}'"
+            )
+            raise RuntimeError(msg)
+        for att in self.cls.mapspec()["relationship"]:
+            values = getattr(obj, att)
+            if not values:
+                continue
+            if isinstance(values, CollValue):
+                items = values.values()
+            else:
+                items = [values]
+            for val in items:
+                if val.neoid is not None:
+                    continue
+                # put val as a node
+                for qry, parms in ObjectMap(cls=type(val), drv=self.drv).put_q(val):
+                    result = tx.run(cast("LiteralString", qry), parms)
+                val.neoid = result.single().value("id(n)")
+                if val.neoid is None:
                     msg = (
                         "no neo4j id retrived on put for obj "
-                        f"'{getattr(obj, self.cls.mapspec()['key'])}'"
+                        f"'{val[type(val).mapspec()['key']]}'"
                     )
                     raise RuntimeError(msg)
-                for att in self.cls.mapspec()["relationship"]:
-                    values = getattr(obj, att)
-                    if not values:
-                        continue
-                    if isinstance(values, CollValue):
-                        items = values.values()
-                    else:
-                        items = [values]
-                    for val in items:
-                        if val.neoid is not None:
-                            continue
-                        # put val as a node
-                        for qry in ObjectMap(cls=type(val), drv=self.drv).put_q(val):
-                            result = tx.run(cast("LiteralString", qry[0]),qry[1])
-                        val.neoid = result.single().value("id(n)")
-                        if val.neoid is None:
-                            msg = (
-                                "no neo4j id retrived on put for obj "
-                                f"'{val[type(val).mapspec()['key']]}'"
-                            )
-                            raise RuntimeError(msg)
-                        val.dirty = 1
-                        ObjectMap.cache[val.neoid] = val
-                    for qry in self.put_attr_q(obj, att, values):
-                        tx.run(cast("LiteralString", qry))
-                    # drop removed entities here
-                    while obj.removed_entities:
-                        ent = obj.removed_entities.pop()
-                        self.drop(obj, *ent, tx)
-        ObjectMap.cache[obj.neoid] = obj
-        obj.dirty = 0
-        return obj
+                val.dirty = 1
+                ObjectMap.cache[val.neoid] = val
+            for qry, parms in self.put_attr_q(obj, att, values):
+                tx.run(cast("LiteralString", qry), parms)
+            # drop removed entities here
+            while obj.removed_entities:
+                ent = obj.removed_entities.pop()
+                self.drop(obj, *ent, tx)
+
+    def put_many(
+        self,
+        objs: list[Entity],
+        tx: Transaction | None = None,
+    ) -> list[Entity]:
+        """
+        Put a list of object instances to the database in one transaction.
+
+        The instances may be of any Entity subclass. Related entities that
+        are not yet in the database are put as well. Entities are grouped by
+        class, and nodes and relationships are written with a few UNWIND
+        statements per class (see :meth:`put_many_q` and
+        :meth:`put_many_rels_q`) rather than statements per entity.
+
+        Args:
+            objs: The object instances to put.
+            tx: Optional transaction to use for the operation. If not given,
+                the put is done in a transaction of its own.
+
+        Returns:
+            The list of object instances, with neoid set.
+        """
+        if not self.drv:
+            msg = "put_many() requires Neo4j driver instance"
+            raise ArgError(msg)
+        if tx is not None:
+            ents = self._put_many(objs, tx)
+        else:
+            with self.drv.session() as session:
+                with session.begin_transaction() as tx:
+                    ents = self._put_many(objs, tx)
+        for ent in ents:
+            ObjectMap.cache[ent.neoid] = ent
+            ent.dirty = 0
+        return objs
+
+    def _put_many(self, objs: list[Entity], tx: Transaction) -> list[Entity]:
+        # objs, and the unmapped entities they refer to, grouped by class
+        ents = {id(obj): obj for obj in objs}
+        todo = list(objs)
+        while todo:
+            obj = todo.pop()
+            for att in type(obj).mapspec()["relationship"]:
+                for val in ObjectMap._stored_values(obj, att):
+                    if val.neoid is None and id(val) not in ents:
+                        ents[id(val)] = val
+                        todo.append(val)
+        by_cls: dict[type[Entity], list[Entity]] = {}
+        for ent in ents.values():
+            by_cls.setdefault(type(ent), []).append(ent)
+        omaps = [ObjectMap(cls=cls, drv=self.drv) for cls in by_cls]
+        for omap in omaps:
+            group = by_cls[omap.cls]
+            for qry, parms in omap.put_many_q(group):
+                for rec in tx.run(cast("LiteralString", qry), parms):
+                    group[rec["i"]].neoid = rec["neoid"]
+            unmapped = [x for x in group if x.neoid is None]
+            if unmapped:
+                msg = (
+                    "no neo4j id retrieved on put for obj "
+                    f"'{getattr(unmapped[0], omap.cls.mapspec()['key'])}'"
+                )
+                raise RuntimeError(msg)
+        for omap in omaps:
+            for qry, parms in omap.put_many_rels_q(by_cls[omap.cls]):
+                tx.run(cast("LiteralString", qry), parms)
+            for obj in by_cls[omap.cls]:
+                while obj.removed_entities:
+                    ent = obj.removed_entities.pop()
+                    omap.drop(obj, *ent, tx)
+        return list(ents.values())
+
+    @staticmethod
+    def _stored_values(obj: Entity, att: str) -> list[Entity]:
+        """Entities held by an attribute, without lazy retrieval."""
+        val = obj._stored(att)  # noqa: SLF001
+        if val is None:
+            return []
+        if isinstance(val, CollValue):
+            return list(val.data.values())
+        return [val]
 
     def rm(self, obj: Entity, *, force: bool | int = False) -> Any | None:
         """'Delete' the object's mapped node from the database."""
@@ -338,8 +626,9 @@ class ObjectMap:
         if obj.neoid is None:
             msg = "object must be mapped (i.e., obj.neoid must be set)"
             raise ArgError(msg)
+        (qry, parms) = self.rm_q(obj, detach=force)
         with self.drv.session() as session:
-            result = session.run(cast("LiteralString", self.rm_q(obj, detach=force)))
+            result = session.run(cast("LiteralString", qry), parms)
             s = result.single()
             if s is None:
                 warn("rm() - corresponding db node not found", stacklevel=2)
@@ -365,8 +654,8 @@ class ObjectMap:
             msg = "add() requires Neo4j driver instance"
             raise ArgError(msg)
         with self.drv.session() as session:
-            for qry in self.put_attr_q(obj, att, tgt):
-                result = session.run(cast("LiteralString", qry))
+            for qry, parms in self.put_attr_q(obj, att, tgt):
+                result = session.run(cast("LiteralString", qry), parms)
             tgt_id = result.single().value()
             if tgt_id is None:
                 warn("add() - corresponding db node not found", stacklevel=2)
@@ -402,8 +691,8 @@ class ObjectMap:
 
         if tx:
             result = None
-            for qry in self.rm_attr_q(obj, att, tgt):
-                result = tx.run(cast("LiteralString", qry))
+            for qry, parms in self.rm_attr_q(obj, att, tgt):
+                result = tx.run(cast("LiteralString", qry), parms)
             s = result.single()
             if s is None:
                 warn("drop() - corresponding target db node not found", stacklevel=2)
@@ -412,8 +701,8 @@ class ObjectMap:
         else:
             with self.drv.session() as session:
                 result = None
-                for qry in self.rm_attr_q(obj, att, tgt):
-                    result = session.run(cast("LiteralString", qry))
+                for qry, parms in self.rm_attr_q(obj, att, tgt):
+                    result = session.run(cast("LiteralString", qry), parms)
                 s = result.single()
                 if s is None:
                     warn(
@@ -433,8 +722,9 @@ class ObjectMap:
             msg = "get_owners() requires Neo4j driver instance"
             raise ArgError(msg)
         ret = []
+        (qry, parms) = self.get_owners_q(obj)
         with self.drv.session() as session:
-            result = session.run(cast("LiteralString", self.get_owners_q(obj)))
+            result = session.run(cast("LiteralString", qry), parms)
             for rec in result:
                 if rec["reln"][0] == "_":  # skip _prev, _next, and convenience links
                     break
@@ -452,8 +742,13 @@ class ObjectMap:
                 ret.append((o, keys))
         return ret
 
-    def get_q(self, obj: Entity) -> str:
-        """Get the query for an object."""
+    def get_q(self, obj: Entity) -> tuple[str, dict[str, Any]]:
+        """
+        Get the query for an object.
+
+        Returns:
+            Tuple (qry_string, param_dict).
+        """
         if not isinstance(obj, self.cls):
             msg = f"arg1 must be object of class {self.cls.__name__}"
             raise ArgError(msg)
@@ -461,8 +756,8 @@ class ObjectMap:
             msg = "object must be mapped (i.e., obj.neoid must be set)"
             raise ArgError(msg)
         return (
-            f"MATCH (n:{self.cls.mapspec()['label']}) "
-            f"WHERE id(n)={obj.neoid} RETURN n,id(n)"
+            f"MATCH (n:{self.cls.mapspec()['label']}) WHERE id(n)=$id RETURN n,id(n)",
+            {"id": obj.neoid},
         )
 
     def get_by_id_q(self) -> str:
@@ -476,8 +771,23 @@ class ObjectMap:
         """PROTOTYPE: Get the query for an entity given its nanoid."""
         return "MATCH (n:node) WHERE n.nanoid=$nanoid and n._to is NULL RETURN id(n)"
 
-    def get_attr_q(self, obj: Entity, att: str) -> str:
-        """Get the query for an attribute of an object."""
+    def get_by_nanoid_q(self, *, version: str | None = None) -> str:
+        """Get the query for the current entity with a nanoid (and version)."""
+        cond = "n.nanoid=$nanoid"
+        if version is not None:
+            cond += " AND n.version=$version"
+        return (
+            f"MATCH (n:{self.cls.mapspec()['label']}) "
+            f"WHERE {cond} AND n._to IS NULL RETURN n"
+        )
+
+    def get_attr_q(self, obj: Entity, att: str) -> tuple[str, dict[str, Any]]:
+        """
+        Get the query for an attribute of an object.
+
+        Returns:
+            Tuple (qry_string, param_dict).
+        """
         if not isinstance(obj, self.cls):
             msg = f"arg1 must be object of class {self.cls.__name__}"
             raise ArgError(msg)
@@ -485,35 +795,50 @@ class ObjectMap:
             msg = "object must be mapped (i.e., obj.neoid must be set)"
             raise ArgError(msg)
         label = self.cls.mapspec()["label"]
+        parms = {"id": obj.neoid}
         if att in self.cls.mapspec()["property"]:
             pr = self.cls.mapspec()["property"][att]
-            return f"MATCH (n:{label}) WHERE id(n)={obj.neoid} RETURN n.{pr}"
+            return (f"MATCH (n:{label}) WHERE id(n)=$id RETURN n.{pr}", parms)
         if att in self.cls.mapspec()["relationship"]:
-            spec = self.cls.mapspec()["relationship"][att]
-            end_cls = spec["end_cls"]
-            if isinstance(end_cls, str):
-                end_cls = {end_cls}
-            end_lbls = [eval(x).mapspec()["label"] for x in end_cls]
-            rel = re.sub("^([^:]?)(:[a-zA-Z0-9_]+)(.*)$", r"\1-[\2]-\3", spec["rel"])
-            if len(end_lbls) == 1:
-                qry = (
-                    f"MATCH (n:{label}){rel}(a:{end_lbls[0]}) "
-                    f"WHERE id(n)={obj.neoid} RETURN a"
-                )
-                if self.cls.attspec[att] == "object":
-                    qry += " LIMIT 1"
-                return qry
-            # multiple end classes possible
-            cond = " OR ".join([f"'{lbl}' IN labels(a)" for lbl in end_lbls])
-            return (
-                f"MATCH (n:{label}){rel}(a) WHERE id(n)={obj.neoid} AND ({cond}) "
-                "RETURN a"
-            )
+            return (self.relspec(att).get_q, parms)
         msg = f"'{att}' is not a registered attribute for class '{self.cls.__name__}'"
         raise ArgError(msg)
 
-    def get_owners_q(self, obj: Entity) -> str:
-        """Get the query for the owners of an object."""
+    def get_many_q(self, objs: list[Entity]) -> tuple[str, dict[str, Any]]:
+        """
+        Get the query for objects and all of their relationship attributes.
+
+        Each relationship attribute is collected by an OPTIONAL MATCH, so that one
+        row is returned per object, with columns neoid, n, and a0, a1, ... holding
+        lists of the end nodes of each attribute in mapspec()["relationship"].
+
+        Returns:
+            Tuple (qry_string, param_dict).
+        """
+        for obj in objs:
+            if not isinstance(obj, self.cls):
+                msg = f"arg1 must be a list of objects of class {self.cls.__name__}"
+                raise ArgError(msg)
+            if obj.neoid is None:
+                msg = "object must be mapped (i.e., obj.neoid must be set)"
+                raise ArgError(msg)
+        label = self.cls.mapspec()["label"]
+        qry = [f"MATCH (n:{label}) WHERE id(n) IN $ids"]
+        cols = []
+        for i, att in enumerate(self.cls.mapspec()["relationship"]):
+            qry.append(self.relspec(att).get_many_match)
+            qry.append(f"WITH {', '.join(['n', *cols])}, collect(a) AS a{i}")
+            cols.append(f"a{i}")
+        qry.append(f"RETURN {', '.join(['id(n) AS neoid', 'n', *cols])}")
+        return (" ".join(qry), {"ids": [obj.neoid for obj in objs]})
+
+    def get_owners_q(self, obj: Entity) -> tuple[str, dict[str, Any]]:
+        """
+        Get the query for the owners of an object.
+
+        Returns:
+            Tuple (qry_string, param_dict).
+        """
         if not isinstance(obj, self.cls):
             msg = f"arg1 must be object of class {self.cls.__name__}"
             raise ArgError(msg)
@@ -523,64 +848,126 @@ class ObjectMap:
             raise ArgError(msg)
         label = self.cls.mapspec()["label"]
         return (
-            f"MATCH (n:{label})<-[r]-(a) WHERE id(n)={obj.neoid} "
-            "RETURN TYPE(r) as reln, a"
+            f"MATCH (n:{label})<-[r]-(a) WHERE id(n)=$id RETURN TYPE(r) as reln, a",
+            {"id": obj.neoid},
         )
 
-    def put_q(self, obj: Entity) -> list[str]:
-        """Get the query for putting an object."""
+    def put_q(self, obj: Entity) -> list[tuple[str, dict[str, Any]]]:
+        """
+        Get the statements for putting an object.
+
+        An unmapped object is created. A mapped object (with neoid set) is
+        updated, and its mapped properties that are None are removed.
+
+        Returns:
+            List of (qry_string, param_dict) tuples.
+        """
         if not isinstance(obj, self.cls):
             msg = f"arg1 must be object of class {self.cls.__name__}"
             raise ArgError(msg)
-        props = {}
-        null_props = []
-        for pr in self.cls.mapspec()["property"]:
-            if getattr(obj, pr) is None:
-                null_props.append(self.cls.mapspec()["property"][pr])
+        label = self.cls.mapspec()["label"]
+        props = {
+            self.cls.mapspec()["property"][pr]: getattr(obj, pr)
+            for pr in self.cls.mapspec()["property"]
+        }
+        if obj.neoid is not None:
+            return [
+                (f"MATCH (n:{label}) WHERE id(n)=$id SET n += $props RETURN n,id(n)",
+                 {"id": obj.neoid, "props": props}),
+            ]
+        props = {k: v for k, v in props.items() if v is not None}
+        return [(f"CREATE (n:{label}) SET n = $props RETURN n,id(n)", {"props": props})]
+
+    def put_many_q(self, objs: list[Entity]) -> list[tuple[str, dict[str, Any]]]:
+        """
+        Get the statements for putting the properties of a list of objects.
+
+        Unmapped objects are created, and mapped objects (with neoid set) are
+        updated; a mapped property that is None is removed. Each statement
+        returns columns i, the index of the object in objs, and neoid.
+
+        Returns:
+            List of (qry_string, param_dict) tuples; at most two.
+        """
+        for obj in objs:
+            if not isinstance(obj, self.cls):
+                msg = f"arg1 must be a list of objects of class {self.cls.__name__}"
+                raise ArgError(msg)
+        label = self.cls.mapspec()["label"]
+        new, old = [], []
+        for i, obj in enumerate(objs):
+            props = {
+                self.cls.mapspec()["property"][pr]: getattr(obj, pr)
+                for pr in self.cls.mapspec()["property"]
+            }
+            if obj.neoid is None:
+                new.append({"i": i, "props": props})
             else:
-                props[self.cls.mapspec()["property"][pr]] = getattr(obj, pr)
+                old.append({"i": i, "id": obj.neoid, "props": props})
         stmts = []
-        if obj.neoid is not None:
-            i = 0
-            prms = {}
-            assigns = []
-            for pr in props:
-                assigns.append(f"n.{pr}=$p{i}")
-                prms[f"p{i}"] = props[pr]
-                i = i + 1
-            set_clause = "SET " + ",".join(assigns)
+        if new:
             stmts.append(
-                (f"MATCH (n:{self.cls.mapspec()['label']}) WHERE id(n)={obj.neoid} "
-                 f"{set_clause} RETURN n,id(n)", prms)
+                (f"UNWIND $rows AS row CREATE (n:{label}) SET n += row.props "
+                 "RETURN row.i AS i, id(n) AS neoid", {"rows": new})
             )
-            rmstmts = []
-            for pr in null_props:
-                rmstmts.append(
-                    ((f"MATCH (n:{self.cls.mapspec()['label']}) WHERE id(n)="
-                      f"{obj.neoid} REMOVE n.{pr} RETURN n,id(n)"), {})
-                )
-            stmts.extend(rmstmts)
-            return stmts
-        else:
-            i = 0
-            prms = {}
-            maps = []
-            for pr in props:
-                maps.append(f"{pr}:$p{i}")
-                prms[f"p{i}"] = props[pr]
-                i = i + 1
-            spec = ",".join(maps)
-            return [
-                (f"CREATE (n:{self.cls.mapspec()['label']} {{{spec}}}) RETURN n,id(n)", prms),
-            ]
+        if old:
+            stmts.append(
+                (f"UNWIND $rows AS row MATCH (n:{label}) WHERE id(n) = row.id "
+                 "SET n += row.props RETURN row.i AS i, id(n) AS neoid", {"rows": old})
+            )
+        return stmts
+
+    def put_many_rels_q(self, objs: list[Entity]) -> list[tuple[str, dict[str, Any]]]:
+        """
+        Get the statements for putting the relationship attributes of a list of objects.
+
+        The objects, and the entities their relationship attributes hold,
+        must be mapped. There is one statement per relationship attribute
+        that has values.
+
+        Returns:
+            List of (qry_string, param_dict) tuples.
+        """
+        stmts = []
+        for att in self.cls.mapspec()["relationship"]:
+            vals = []
+            for obj in objs:
+                if not isinstance(obj, self.cls):
+                    msg = f"arg1 must be a list of objects of class {self.cls.__name__}"
+                    raise ArgError(msg)
+                vals.extend((obj, v) for v in ObjectMap._stored_values(obj, att))
+            if not vals:
+                continue
+            rspec = self.relspec(att)
+            rows = []
+            for obj, val in vals:
+                if obj.neoid is None or val.neoid is None:
+                    msg = "object must be mapped (i.e., obj.neoid must be set)"
+                    raise ArgError(msg)
+                if not isinstance(val, rspec.end_cls):
+                    msg = (
+                        f"value for attribute '{att}' must be an object of class "
+                        f"{' or '.join(sorted(c.__name__ for c in rspec.end_cls))}"
+                    )
+                    raise ArgError(msg)
+                rows.append({"s": obj.neoid, "d": val.neoid})
+            stmts.append((rspec.put_many_q, {"rows": rows}))
+        return stmts
 
     def put_attr_q(
         self,
         obj: Entity,
         att: str,
         values: Entity | list[Entity] | CollValue,
-    ) -> str | list[str]:
-        """Get the query for putting an attribute of an object."""
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """
+        Get the statements for putting an attribute of an object.
+
+        For a relationship attribute, there is one statement per value.
+
+        Returns:
+            List of (qry_string, param_dict) tuples.
+        """
         if not isinstance(obj, self.cls):
             msg = f"arg1 must be object of class {self.cls.__name__}"
             raise ArgError(msg)
@@ -594,12 +981,13 @@ class ObjectMap:
             values = values.values()
         elif isinstance(values, Entity):
             values = [values]
+        label = self.cls.mapspec()["label"]
         if att in self.cls.mapspec()["property"]:
-            return (
-                f"MATCH (n:{self.cls.mapspec()['label']}) WHERE id(n)={obj.neoid} "
-                f"SET {self.cls.mapspec()['property'][att]}="
-                f"{ObjectMap._quote_val(values[0])} RETURN id(n)"
-            )
+            pr = self.cls.mapspec()["property"][att]
+            return [
+                (f"MATCH (n:{label}) WHERE id(n)=$id SET n.{pr}=$value RETURN id(n)",
+                 {"id": obj.neoid, "value": values[0]}),
+            ]
         if att in self.cls.mapspec()["relationship"]:
             if not self._check_values_list(att, values):
                 msg = (
@@ -607,33 +995,18 @@ class ObjectMap:
                     f"the appropriate subclass for attribute '{att}'",
                 )
                 raise ArgError(msg)
-            stmts = []
-            spec = self.cls.mapspec()["relationship"][att]
-            end_cls = spec["end_cls"]
-            if isinstance(end_cls, str):
-                end_cls = {end_cls}
-            end_lbls = [eval(x).mapspec()["label"] for x in end_cls]
-            rel = re.sub("^([^:]?)(:[a-zA-Z0-9_]+)(.*)$", r"\1-[\2]-\3", spec["rel"])
-            cond = " OR ".join([f"'{lbl}' IN labels(a)" for lbl in end_lbls])
-            for avalue in values:
-                if len(end_lbls) == 1:
-                    stmts.append(
-                        f"MATCH (n:{self.cls.mapspec()['label']}),(a:{end_lbls[0]}) "
-                        f"WHERE id(n)={obj.neoid} AND id(a)={avalue.neoid} "
-                        f"MERGE (n){rel}(a) RETURN id(a)",
-                    )
-                else:
-                    stmts.append(
-                        f"MATCH (n:{self.cls.mapspec()['label']}),(a) "
-                        f"WHERE id(n)={obj.neoid} AND id(a)={avalue.neoid} AND "
-                        f"({cond}) MERGE (n){rel}(a) RETURN id(a)",
-                    )
-            return stmts
+            qry = self.relspec(att).put_q
+            return [(qry, {"id": obj.neoid, "aid": v.neoid}) for v in values]
         msg = f"'{att}' is not a registered attribute for class '{self.cls.__name__}'"
         raise ArgError(msg)
 
-    def rm_q(self, obj: Entity, *, detach: bool = False) -> str:
-        """Get the query for removing an object."""
+    def rm_q(self, obj: Entity, *, detach: bool = False) -> tuple[str, dict[str, Any]]:
+        """
+        Get the query for removing an object.
+
+        Returns:
+            Tuple (qry_string, param_dict).
+        """
         if not isinstance(obj, self.cls):
             msg = f"arg1 must be object of class {self.cls.__name__}"
             raise ArgError(msg)
@@ -641,16 +1014,26 @@ class ObjectMap:
             msg = "object must be mapped (i.e., obj.neoid must be set)"
             raise ArgError(msg)
         dlt = "DETACH DELETE n" if detach else "DELETE n"
-        qry = f"MATCH (n:{self.cls.mapspec()['label']}) WHERE id(n)={obj.neoid} "
-        return qry + dlt
+        return (
+            f"MATCH (n:{self.cls.mapspec()['label']}) WHERE id(n)=$id {dlt}",
+            {"id": obj.neoid},
+        )
 
     def rm_attr_q(
         self,
         obj: Entity,
         att: str,
         values: list[Entity] | None = None,
-    ) -> str | list[str]:
-        """Get the query for removing an attribute of an object."""
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """
+        Get the statements for removing an attribute of an object.
+
+        For a relationship attribute, there is one statement per value, or
+        a single statement if values is [":all"].
+
+        Returns:
+            List of (qry_string, param_dict) tuples.
+        """
         if not isinstance(obj, self.cls):
             msg = f"arg1 must be object of class {self.cls.__name__}"
             raise ArgError(msg)
@@ -659,54 +1042,22 @@ class ObjectMap:
             raise ArgError(msg)
         if values and not isinstance(values, list):
             values = [values]
+        label = self.cls.mapspec()["label"]
+        parms = {"id": obj.neoid}
         if att in self.cls.mapspec()["property"]:
-            return (
-                f"MATCH (n:{self.cls.mapspec()['label']}) "
-                f"WHERE id(n)={obj.neoid} REMOVE n.{att} RETURN id(n)"
-            )
+            pr = self.cls.mapspec()["property"][att]
+            return [(f"MATCH (n:{label}) WHERE id(n)=$id REMOVE n.{pr} RETURN id(n)", parms)]
         if att in self.cls.mapspec()["relationship"]:
-            many = self.cls.attspec[att] == "collection"
-            spec = self.cls.mapspec()["relationship"][att]
-            end_cls = spec["end_cls"]
-            if isinstance(end_cls, str):
-                end_cls = {end_cls}
-            end_lbls = [eval(x).mapspec()["label"] for x in end_cls]
-            cond = " OR ".join([f"'{lbl}' IN labels(a)" for lbl in end_lbls])
-            rel = re.sub("^([^:]?)(:[a-zA-Z0-9_]+)(.*)$", r"\1-[r\2]-\3", spec["rel"])
+            rspec = self.relspec(att)
             if values and values[0] == ":all":
-                if len(end_lbls) == 1:
-                    return (
-                        f"MATCH (n:{self.cls.mapspec()['label']}){rel}(a:{end_lbls[0]})"
-                        f" WHERE id(n)={obj.neoid} DELETE r RETURN id(n),id(a)"
-                    )
-                return (
-                    f"MATCH (n:{self.cls.mapspec()['label']}){rel}(a) "
-                    f"WHERE id(n)={obj.neoid} AND ({cond}) DELETE r RETURN id(n)"
-                )
-            stmts = []
-
+                return [(rspec.rm_all_q, parms)]
             if not self._check_values_list(att, values):
                 msg = (
                     "'values' must be a list of mapped Entity objects of the "
                     f"appropriate subclass for attribute '{att}'",
                 )
                 raise ArgError(msg)
-            for val in values:
-                qry = ""
-                if len(end_lbls) == 1:
-                    qry = (
-                        f"MATCH (n:{self.cls.mapspec()['label']}){rel}(a:{end_lbls[0]})"
-                        f" WHERE id(n)={obj.neoid} AND id(a)={val.neoid} "
-                        f"DELETE r RETURN id(n),id(a)"
-                    )
-                else:
-                    qry = (
-                        f"MATCH (n:{self.cls.mapspec()['label']}){rel}(a) "
-                        f"WHERE id(n)={obj.neoid} AND id(a)={val.neoid} AND ({cond}) "
-                        f"DELETE r RETURN id(n),id(a)"
-                    )
-                stmts.append(qry)
-            return stmts
+            return [(rspec.rm_q, {"id": obj.neoid, "aid": v.neoid}) for v in values]
         msg = f"'{att}' is not a registered attribute for class '{self.cls.__name__}'"
         raise ArgError(msg)
 
@@ -715,14 +1066,7 @@ class ObjectMap:
         v = values
         if isinstance(values, CollValue):
             v = values.values()
-        chk = [x.neoid is None for x in v]
-        if True in chk:
+        if any(x.neoid is None for x in v):
             return False
-        end_cls = self.cls.mapspec()["relationship"][att]["end_cls"]
-        if isinstance(end_cls, str):
-            end_cls = {end_cls}
-        cls_set = tuple([eval(x) for x in end_cls])
-        # print(f"{cls_set=}")
-        # print(f"{v=}")
-        chk = [isinstance(x, cls_set) for x in v]
-        return True in chk
+        cls_set = self.relspec(att).end_cls
+        return any(isinstance(x, cls_set) for x in v)
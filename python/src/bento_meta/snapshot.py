@@ -0,0 +1,200 @@
+"""
+bento_meta.snapshot
+===================
+
+This module reads and writes model snapshots: files containing the full
+object graph of a :class:`bento_meta.model.Model` (nodes, edges, properties,
+value sets, terms, concepts, origins and tags, with their nanoids and
+database ids). A snapshot loads without a database connection, so a
+process can start from a prebuilt artifact instead of calling
+:meth:`Model.dget`. Use :meth:`Model.to_snapshot` and
+:meth:`Model.from_snapshot`.
+
+A snapshot is a short header followed by a pickle of plain lists, dicts,
+strings and numbers. Loading refuses to construct any other object, so a
+snapshot cannot execute code.
+"""
+
+from __future__ import annotations
+
+import io
+import pickle
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from bento_meta.entity import ArgError, CollValue, Entity
+from bento_meta.objects import (
+    Concept,
+    Edge,
+    Node,
+    Origin,
+    Predicate,
+    Property,
+    Tag,
+    Term,
+    ValueSet,
+)
+from bento_meta.objects import Model as ModelEntity
+
+if TYPE_CHECKING:
+    from bento_meta.model import Model
+
+MAGIC = b"BMSNAP"
+FORMAT_VERSION = 1
+
+_CLASSES = {
+    c.__name__: c
+    for c in (
+        Node,
+        Edge,
+        Property,
+        ValueSet,
+        Term,
+        Concept,
+        Predicate,
+        Origin,
+        Tag,
+        ModelEntity,
+    )
+}
+_INDEXES = ("nodes", "edges", "props", "terms")
+
+
+class _PlainUnpickler(pickle.Unpickler):
+    """Unpickler that allows builtin containers and scalars only."""
+
+    def find_class(self, module: str, name: str) -> Any:  # noqa: ANN401
+        msg = f"snapshot contains a disallowed object '{module}.{name}'"
+        raise pickle.UnpicklingError(msg)
+
+
+def _dump_entities(model: Model) -> tuple[list, dict[int, int]]:
+    """
+    Flatten the entities reachable from the model into records.
+
+    Attributes are read without magic, so lazy (dirty < 0) entities are not
+    retrieved from the database.
+    """
+    index: dict[int, int] = {}
+    recs: list = []
+    todo: list[Entity] = []
+
+    def ref(ent: Entity) -> int:
+        if id(ent) not in index:
+            index[id(ent)] = len(recs)
+            recs.append(None)
+            todo.append(ent)
+        return index[id(ent)]
+
+    for attr in _INDEXES:
+        for ent in getattr(model, attr).values():
+            ref(ent)
+    while todo:
+        ent = todo.pop()
+        simple, objs, colls = {}, {}, {}
+        for att, atype in type(ent).attspec.items():
+            val = ent._stored(att)  # noqa: SLF001
+            if val is None:
+                continue
+            if atype == "simple":
+                simple[att] = val
+            elif atype == "object":
+                objs[att] = ref(val)
+            elif val:
+                colls[att] = [[k, ref(v)] for k, v in val.data.items()]
+        recs[index[id(ent)]] = [
+            type(ent).__name__,
+            simple,
+            objs,
+            colls,
+            ent.neoid,
+            ent.element_id,
+            ent.dirty,
+        ]
+    return recs, index
+
+
+def dump_snapshot(model: Model) -> bytes:
+    """
+    Serialize a model's object graph.
+
+    Args:
+        model: The Model to serialize.
+
+    Returns:
+        The snapshot as bytes.
+    """
+    recs, index = _dump_entities(model)
+    doc = {
+        "model": {
+            "handle": model.handle,
+            "version": model.version,
+            "uri": model.uri,
+            "repository": model.repository,
+        },
+        "entities": recs,
+    }
+    for attr in _INDEXES:
+        doc[attr] = [[k, index[id(v)]] for k, v in getattr(model, attr).items()]
+    return (
+        MAGIC
+        + bytes([FORMAT_VERSION])
+        + pickle.dumps(doc, protocol=pickle.HIGHEST_PROTOCOL)
+    )
+
+
+def load_snapshot(data: bytes, model_cls: type[Model]) -> Model:
+    """
+    Create a model from a serialized object graph.
+
+    Args:
+        data: Snapshot bytes, as returned by :func:`dump_snapshot`.
+        model_cls: The Model class to instantiate.
+
+    Returns:
+        A new Model instance. It has no MDB connection.
+    """
+    if data[: len(MAGIC)] != MAGIC:
+        msg = "data is not a bento_meta model snapshot"
+        raise ArgError(msg)
+    fmt = data[len(MAGIC)]
+    if fmt != FORMAT_VERSION:
+        msg = f"unsupported snapshot format version {fmt}"
+        raise ArgError(msg)
+    doc = _PlainUnpickler(io.BytesIO(data[len(MAGIC) + 1 :])).load()
+
+    # create all instances first, then wire up references
+    ents = []
+    for cname, simple, _, _, neoid, element_id, _ in doc["entities"]:
+        ent = _CLASSES[cname]()
+        for att, val in simple.items():
+            ent._store(att, val)  # noqa: SLF001
+        ent.neoid = neoid
+        ent.element_id = element_id
+        ents.append(ent)
+    for ent, (_, _, objs, colls, _, _, _) in zip(ents, doc["entities"]):
+        for att, i in objs.items():
+            ent._store(att, ents[i])  # noqa: SLF001
+            ents[i].belongs[(id(ent), att)] = ent
+        for att, items in colls.items():
+            coll = CollValue({k: ents[i] for k, i in items}, owner=ent, owner_key=att)
+            ent._store(att, coll)  # noqa: SLF001
+    for ent, rec in zip(ents, doc["entities"]):
+        Entity.dirty.fset(ent, rec[6])  # bypass subclass __setattr__ hooks
+
+    mdl = doc["model"]
+    model = model_cls(handle=mdl["handle"], version=mdl["version"], uri=mdl["uri"])
+    model.repository = mdl["repository"]
+    for attr in _INDEXES:
+        getattr(model, attr).update((k, ents[i]) for k, i in doc[attr])
+    return model
+
+
+def write_snapshot(model: Model, path: str | Path) -> None:
+    """Write a model snapshot to a file."""
+    Path(path).write_bytes(dump_snapshot(model))
+
+
+def read_snapshot(path: str | Path, model_cls: type[Model]) -> Model:
+    """Read a model snapshot from a file."""
+    return load_snapshot(Path(path).read_bytes(), model_cls)
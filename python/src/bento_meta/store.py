@@ -0,0 +1,503 @@
+"""
+bento_meta.store
+================
+
+This module contains :class:`ModelStore`, a read-only, memory-mapped copy
+of a :class:`bento_meta.model.Model`.
+
+A store file is built once from a Model with :meth:`ModelStore.build`, and
+opened with ``ModelStore(path)``. The file is memory-mapped, so processes
+that open the same file (e.g., the workers of a web server) share its pages,
+and nothing is decoded until it is accessed. The read API mirrors
+:class:`Model`::
+
+  store = ModelStore("icdc.store")
+  store.nodes["case"].props["case_id"].value_domain
+  store.edges[("of_case", "sample", "case")].dst.handle
+  store.props[("diagnosis", "disease_term")].values
+
+Entries are small view objects holding only a reference to the store and a
+row number. Keys are kept sorted in the file and looked up by binary search.
+
+File layout: magic, a JSON header describing the tables, the fixed-width
+row tables and collection index arrays, then a table of UTF-8 strings
+referenced by (offset, length) from the rows.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+from bisect import bisect_left
+from collections.abc import Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, ClassVar
+
+from bento_meta.entity import ArgError
+from bento_meta.objects import Edge, Node, Property, Term
+
+if TYPE_CHECKING:
+    from bento_meta.entity import Entity
+    from bento_meta.model import Model
+
+MAGIC = b"BMSTORE1"
+
+# value slot: string table offset, length, kind
+_SLOT = "IIB"
+_NONE, _STR, _JSON = 0, 1, 2
+# collection index entry: key slot, row
+_ENTRY = struct.Struct("<" + _SLOT + "I")
+
+
+def _fields(cls: type[Entity]) -> list[str]:
+    return [a for a, t in cls.attspec.items() if t == "simple"]
+
+
+class _Table:
+    """Layout of one row table in a store file."""
+
+    def __init__(self, fields: list[str], extras: list[str], offset: int, rows: int):
+        self.fields = fields
+        self.extras = extras
+        self.offset = offset
+        self.rows = rows
+        # key slot, one slot per field, then uint32 extras
+        self.struct = struct.Struct(
+            "<" + _SLOT * (len(fields) + 1) + "I" * len(extras)
+        )
+        self.col = {f: i for i, f in enumerate(fields)}
+        self.extra = {e: 3 * (len(fields) + 1) + i for i, e in enumerate(extras)}
+
+    def header(self) -> dict:
+        return {
+            "fields": self.fields,
+            "extras": self.extras,
+            "offset": self.offset,
+            "rows": self.rows,
+        }
+
+
+class StoredEntity:
+    """
+    Read-only view of an entity row in a ModelStore.
+
+    Declared simple attributes of the corresponding Entity class are
+    available as attributes.
+    """
+
+    __slots__ = ("_row", "_store")
+    table: ClassVar[str]
+
+    def __init__(self, store: ModelStore, row: int) -> None:
+        """Create a view of row in store."""
+        self._store = store
+        self._row = row
+
+    def _rec(self) -> tuple:
+        return self._store._rec(self.table, self._row)  # noqa: SLF001
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        """Get a simple attribute from the store."""
+        tbl = self._store._tables[self.table]  # noqa: SLF001
+        if name not in tbl.col:
+            msg = f"'{type(self).__name__}' has no attribute '{name}'"
+            raise AttributeError(msg)
+        i = 3 * (tbl.col[name] + 1)
+        return self._store._value(self._rec()[i : i + 3])  # noqa: SLF001
+
+    def __eq__(self, other: object) -> bool:
+        """Views are equal if they refer to the same row of the same store."""
+        return (
+            type(other) is type(self)
+            and other._store is self._store
+            and other._row == self._row
+        )
+
+    def __hash__(self) -> int:
+        """Hash on the row."""
+        return hash((self.table, self._row))
+
+    def _extra(self, name: str) -> int:
+        return self._rec()[self._store._tables[self.table].extra[name]]  # noqa: SLF001
+
+    def _coll(self, cls: type[StoredEntity], name: str) -> dict[Any, StoredEntity]:
+        return self._store._coll(  # noqa: SLF001
+            cls,
+            self._extra(f"{name}_start"),
+            self._extra(f"{name}_count"),
+        )
+
+
+class StoredProperty(StoredEntity):
+    """Read-only view of a Property."""
+
+    __slots__ = ()
+    table = "props"
+
+    @property
+    def terms(self) -> dict[str, StoredTerm] | None:
+        """Terms of the property's value set, or None if it has none."""
+        if not self._extra("has_value_set"):
+            return None
+        return self._coll(StoredTerm, "terms")
+
+    @property
+    def values(self) -> list[str] | None:
+        """Term values of the property's value set, or None if it has none."""
+        terms = self.terms
+        if terms is None:
+            return None
+        return [t.value for t in terms.values()]
+
+
+class StoredNode(StoredEntity):
+    """Read-only view of a Node."""
+
+    __slots__ = ()
+    table = "nodes"
+
+    @property
+    def props(self) -> dict[str, StoredProperty]:
+        """Properties of the node, keyed by handle."""
+        return self._coll(StoredProperty, "props")
+
+
+class StoredEdge(StoredEntity):
+    """Read-only view of an Edge."""
+
+    __slots__ = ()
+    table = "edges"
+
+    @property
+    def src(self) -> StoredNode:
+        """Source node."""
+        return StoredNode(self._store, self._extra("src"))
+
+    @property
+    def dst(self) -> StoredNode:
+        """Destination node."""
+        return StoredNode(self._store, self._extra("dst"))
+
+    @property
+    def triplet(self) -> tuple[str, str, str]:
+        """(edge handle, src handle, dst handle)."""
+        return (self.handle, self.src.handle, self.dst.handle)
+
+    @property
+    def props(self) -> dict[str, StoredProperty]:
+        """Properties of the edge, keyed by handle."""
+        return self._coll(StoredProperty, "props")
+
+
+class StoredTerm(StoredEntity):
+    """Read-only view of a Term."""
+
+    __slots__ = ()
+    table = "terms"
+
+
+class _Keys(Sequence):
+    """Encoded keys of a table, for binary search."""
+
+    def __init__(self, store: ModelStore, table: str) -> None:
+        self.store = store
+        self.table = table
+
+    def __len__(self) -> int:
+        return self.store._tables[self.table].rows  # noqa: SLF001
+
+    def __getitem__(self, row: int) -> bytes:
+        (off, ln, _) = self.store._rec(self.table, row)[0:3]  # noqa: SLF001
+        return self.store._str_bytes(off, ln)  # noqa: SLF001
+
+
+class StoreTable(Mapping):
+    """Read-only mapping of Model-style keys to the views of a store table."""
+
+    def __init__(self, store: ModelStore, cls: type[StoredEntity]) -> None:
+        """Create the mapping for the table viewed by cls."""
+        self._store = store
+        self._cls = cls
+        self._keys = _Keys(store, cls.table)
+
+    def _row(self, key: Any) -> int | None:  # noqa: ANN401
+        enc = _encode_key(key)
+        row = bisect_left(self._keys, enc)
+        if row < len(self._keys) and self._keys[row] == enc:
+            return row
+        return None
+
+    def __getitem__(self, key: Any) -> StoredEntity:  # noqa: ANN401
+        """Get the view for key."""
+        row = self._row(key)
+        if row is None:
+            raise KeyError(key)
+        return self._cls(self._store, row)
+
+    def __contains__(self, key: object) -> bool:
+        """Whether key is in the table."""
+        return self._row(key) is not None
+
+    def __iter__(self) -> Iterator:
+        """Iterate over keys, in sorted order."""
+        for row in range(len(self._keys)):
+            yield _decode_key(self._keys[row])
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return len(self._keys)
+
+
+def _encode_key(key: Any) -> bytes:  # noqa: ANN401
+    """Encode a Model dict key; tuples are JSON arrays, strings are themselves."""
+    if isinstance(key, tuple):
+        return json.dumps(list(key), separators=(",", ":")).encode()
+    return json.dumps(key).encode()
+
+
+def _decode_key(enc: bytes) -> Any:  # noqa: ANN401
+    key = json.loads(enc)
+    return tuple(key) if isinstance(key, list) else key
+
+
+class ModelStore:
+    """
+    Read-only, memory-mapped copy of a Model.
+
+    Attributes:
+        handle: Model handle.
+        version: Model version.
+        uri: Model URI.
+        nodes: Mapping of node handles to StoredNode views.
+        edges: Mapping of (edge handle, src handle, dst handle) to StoredEdge views.
+        props: Mapping of Model.props keys to StoredProperty views.
+        terms: Mapping of Model.terms keys to StoredTerm views.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        Open a store file.
+
+        Args:
+            path: File written by :meth:`build`.
+        """
+        with Path(path).open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[: len(MAGIC)] != MAGIC:
+            self._mm.close()
+            msg = f"'{path}' is not a bento_meta model store"
+            raise ArgError(msg)
+        (hlen,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        start = len(MAGIC) + 4
+        hdr = json.loads(self._mm[start : start + hlen])
+        base = start + hlen  # offsets in the header are relative to here
+        self.handle = hdr["model"]["handle"]
+        self.version = hdr["model"]["version"]
+        self.uri = hdr["model"]["uri"]
+        self._strings = base + hdr["strings"]
+        self._index = base + hdr["index"]
+        self._tables = {
+            name: _Table(t["fields"], t["extras"], base + t["offset"], t["rows"])
+            for name, t in hdr["tables"].items()
+        }
+        self.nodes = StoreTable(self, StoredNode)
+        self.edges = StoreTable(self, StoredEdge)
+        self.props = StoreTable(self, StoredProperty)
+        self.terms = StoreTable(self, StoredTerm)
+
+    def close(self) -> None:
+        """Unmap the file. Views obtained from the store become unusable."""
+        self._mm.close()
+
+    def __enter__(self) -> ModelStore:
+        """Enter context."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Close the store on exit."""
+        self.close()
+
+    def _rec(self, table: str, row: int) -> tuple:
+        tbl = self._tables[table]
+        return tbl.struct.unpack_from(self._mm, tbl.offset + row * tbl.struct.size)
+
+    def _str_bytes(self, off: int, ln: int) -> bytes:
+        return self._mm[self._strings + off : self._strings + off + ln]
+
+    def _value(self, slot: tuple) -> Any:  # noqa: ANN401
+        (off, ln, kind) = slot
+        if kind == _NONE:
+            return None
+        if kind == _STR:
+            return self._str_bytes(off, ln).decode()
+        return json.loads(self._str_bytes(off, ln))
+
+    def _coll(
+        self,
+        cls: type[StoredEntity],
+        start: int,
+        count: int,
+    ) -> dict[Any, StoredEntity]:
+        coll = {}
+        for i in range(start, start + count):
+            (off, ln, kind, row) = _ENTRY.unpack_from(
+                self._mm,
+                self._index + i * _ENTRY.size,
+            )
+            coll[self._value((off, ln, kind))] = cls(self, row)
+        return coll
+
+    @classmethod
+    def build(cls, model: Model, path: str | Path) -> None:
+        """
+        Write a store file for a model.
+
+        Value sets should be loaded (e.g., with dget(eager=True)) if the model
+        was retrieved from a database.
+
+        Args:
+            model: The Model to store.
+            path: File to write.
+        """
+        Path(path).write_bytes(_StoreWriter(model).build())
+
+
+class _StoreWriter:
+    """Assemble the contents of a store file."""
+
+    def __init__(self, model: Model) -> None:
+        self.model = model
+        self.strings = bytearray()
+        self.str_off: dict[bytes, int] = {}
+        self.index = bytearray()
+
+    def slot(self, val: Any) -> tuple[int, int, int]:  # noqa: ANN401
+        if val is None:
+            return (0, 0, _NONE)
+        if isinstance(val, str):
+            (enc, kind) = (val.encode(), _STR)
+        else:
+            (enc, kind) = (json.dumps(val).encode(), _JSON)
+        return (*self.key_slot(enc)[0:2], kind)
+
+    def key_slot(self, enc: bytes) -> tuple[int, int, int]:
+        if enc not in self.str_off:
+            self.str_off[enc] = len(self.strings)
+            self.strings += enc
+        return (self.str_off[enc], len(enc), _STR)
+
+    def coll(self, items: dict[Any, int]) -> tuple[int, int]:
+        start = len(self.index) // _ENTRY.size
+        for key, row in items.items():
+            self.index += _ENTRY.pack(*self.slot(key), row)
+        return (start, len(items))
+
+    def build(self) -> bytes:
+        model = self.model
+        terms = dict(model.terms)
+        seen = {id(t) for t in terms.values()}
+        for prop in model.props.values():
+            if not prop.value_set:
+                continue
+            for t in prop.value_set.terms.values():
+                if id(t) not in seen:
+                    seen.add(id(t))
+                    key = (
+                        t.handle if t.handle else t.value,
+                        t.origin_name,
+                        t.origin_id,
+                        t.origin_version,
+                    )
+                    terms.setdefault(key, t)
+
+        def order(d: dict) -> list[tuple[bytes, Entity]]:
+            return sorted(((_encode_key(k), v) for k, v in d.items()), key=lambda x: x[0])
+
+        tables = {
+            "nodes": (Node, ["props_start", "props_count"], order(model.nodes)),
+            "edges": (
+                Edge,
+                ["src", "dst", "props_start", "props_count"],
+                order(model.edges),
+            ),
+            "props": (
+                Property,
+                ["has_value_set", "terms_start", "terms_count"],
+                order(model.props),
+            ),
+            "terms": (Term, [], order(terms)),
+        }
+        rows = {
+            name: {id(e): i for i, (_, e) in enumerate(ents)}
+            for name, (_, _, ents) in tables.items()
+        }
+
+        def end_row(edge: Edge, end: str) -> int:
+            # the end node itself, or the model's node with its handle
+            node = getattr(edge, end)
+            row = rows["nodes"].get(id(node))
+            if row is None and node is not None and node.handle in model.nodes:
+                row = rows["nodes"].get(id(model.nodes[node.handle]))
+            if row is None:
+                msg = (
+                    f"edge '{edge.handle}': {end} node "
+                    f"'{getattr(node, 'handle', None)}' is not in the model"
+                )
+                raise ArgError(msg)
+            return row
+
+        def extras(name: str, ent: Entity) -> list[int]:
+            if name in ("nodes", "edges"):
+                (start, count) = self.coll(
+                    {
+                        k: rows["props"][id(p)]
+                        for k, p in ent.props.items()
+                        if id(p) in rows["props"]
+                    },
+                )
+                ends = []
+                if name == "edges":
+                    ends = [end_row(ent, "src"), end_row(ent, "dst")]
+                return [*ends, start, count]
+            if name == "props":
+                vs = ent.value_set
+                if not vs:
+                    return [0, 0, 0]
+                return [
+                    1,
+                    *self.coll(
+                        {
+                            k: rows["terms"][id(t)]
+                            for k, t in vs.terms.items()
+                            if id(t) in rows["terms"]
+                        },
+                    ),
+                ]
+            return []
+
+        layouts = {}
+        body = bytearray()
+        for name, (ecls, extra_names, ents) in tables.items():
+            fields = _fields(ecls)
+            layouts[name] = _Table(fields, extra_names, len(body), len(ents))
+            for enc, ent in ents:
+                vals = [*self.key_slot(enc)]
+                for f in fields:
+                    vals.extend(self.slot(getattr(ent, f)))
+                body += layouts[name].struct.pack(*vals, *extras(name, ent))
+        hdr = {
+            "model": {"handle": model.handle, "version": model.version, "uri": model.uri},
+            "tables": {n: t.header() for n, t in layouts.items()},
+            "index": len(body),
+            "strings": len(body) + len(self.index),
+        }
+        hdr_bytes = json.dumps(hdr).encode()
+        return (
+            MAGIC
+            + struct.pack("<I", len(hdr_bytes))
+            + hdr_bytes
+            + bytes(body)
+            + bytes(self.index)
+            + bytes(self.strings)
+        )
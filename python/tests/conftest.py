@@ -3,6 +3,8 @@ from time import sleep
 
 import pytest
 import requests
+from bento_meta.model import Model
+from bento_meta.objects import Concept, Edge, Node, Property, Tag, Term
 from requests.exceptions import ConnectionError
 
 wait = 25
@@ -132,3 +134,36 @@ def test_paths(
         )
         for x in tpl
     ]
+
+
+@pytest.fixture
+def model():
+    """A fresh small model: three nodes, two edges, a value set and annotations."""
+    model = Model("test", version="1.0.0", uri="https://example.org/test")
+    case = Node({"handle": "case", "nanoid": "abc123"})
+    case.neoid = 10
+    case.element_id = "4:db:10"
+    case.tags["Class"] = Tag({"key": "Class", "value": "primary"})
+    model.add_node(case)
+    sample = model.add_node({"handle": "sample"})
+    visit = model.add_node({"handle": "visit"})
+    model.add_prop(
+        case,
+        Property({"handle": "case_id", "value_domain": "string", "is_key": True}),
+    )
+    model.add_prop(sample, Property({"handle": "sample_id", "value_domain": "string"}))
+    dx = Property({"handle": "diagnosis", "value_domain": "value_set"})
+    model.add_prop(case, dx)
+    model.add_terms(dx, Term({"value": "CRS", "origin_name": "Marilyn"}), "a", "b")
+    ctos = Term({"value": "case", "origin_name": "CTOS"})
+    ctos.concept = Concept()
+    ctos.concept.terms["other"] = Term({"value": "subject", "origin_name": "X"})
+    model.annotate(case, ctos)
+    of_case = Edge({"handle": "of_case", "src": sample, "dst": case})
+    model.add_edge(of_case)
+    model.add_prop(
+        of_case,
+        Property({"handle": "operator", "value_domain": "boolean"}),
+    )
+    model.add_edge(Edge({"handle": "of_case", "src": visit, "dst": case}))
+    return model
@@ -17,6 +17,7 @@ from bento_meta.objects import (
     ValueSet,
     mergespec,
 )
+from neo4j import BoltDriver
 
 
 # FakeNode for testing ['relationship']['endcls'] = a _tuple_
@@ -54,6 +55,27 @@ def test_class():
         assert c.mapspec()["label"] == c.__name__.lower()
 
 
+def test_relspec():
+    m = ObjectMap(cls=FakeNode)
+    rs = m.relspec("concept")
+    assert m.relspec("concept") is rs
+    assert ObjectMap.relspec_for(FakeNode, "concept") is rs
+    assert set(rs.end_cls) == {Concept, Term}
+    assert sorted(rs.end_lbls) == ["concept", "term"]
+    assert rs.rel_type == "has_concept"
+    assert not rs.many
+    assert "WHERE id(n)=$id AND id(a)=$aid AND (" in rs.put_q
+    rs = m.relspec("props")
+    assert rs.many
+    assert rs.end_cls == (Property,)
+    assert rs.get_many_match == "OPTIONAL MATCH (n)-[:has_property]->(a:property)"
+    # end classes are resolved among Entity subclasses defined anywhere
+    assert m.relspec("_next").end_cls == (FakeNode,)
+    rs = ObjectMap(cls=Tag).relspec("_parent")
+    assert rs.rel_type == "has_tag"
+    assert rs.get_many_match.startswith("OPTIONAL MATCH (n)<-[:has_tag]-(a) WHERE ")
+
+
 def test_get_queries():
     m = ObjectMap(cls=Node)
     with pytest.raises(ArgError, match="arg1 must be object of class"):
@@ -62,44 +84,67 @@ def test_get_queries():
         m.get_q(Node())
     n = Node({"handle": "test", "model": "test"})
     n.neoid = 1
-    qry = m.get_q(n)
-    assert qry == "MATCH (n:node) WHERE id(n)=1 RETURN n,id(n)"
+    assert m.get_q(n) == ("MATCH (n:node) WHERE id(n)=$id RETURN n,id(n)", {"id": 1})
     with pytest.raises(ArgError, match="'flerb' is not a registered attribute"):
         m.get_attr_q(n, "flerb")
-    qry = m.get_attr_q(n, "model")
-    assert qry == "MATCH (n:node) WHERE id(n)=1 RETURN n.model"
-    qry = m.get_attr_q(n, "props")
-    assert qry == "MATCH (n:node)-[:has_property]->(a:property) WHERE id(n)=1 RETURN a"
-    qry = m.get_attr_q(n, "concept")
+    (qry, parms) = m.get_attr_q(n, "model")
+    assert qry == "MATCH (n:node) WHERE id(n)=$id RETURN n.model"
+    assert parms == {"id": 1}
+    (qry, _) = m.get_attr_q(n, "props")
+    assert qry == "MATCH (n:node)-[:has_property]->(a:property) WHERE id(n)=$id RETURN a"
+    (qry, _) = m.get_attr_q(n, "concept")
     assert (
         qry
-        == "MATCH (n:node)-[:has_concept]->(a:concept) WHERE id(n)=1 RETURN a LIMIT 1"
+        == "MATCH (n:node)-[:has_concept]->(a:concept) WHERE id(n)=$id RETURN a LIMIT 1"
     )
 
 
+def test_get_many_queries():
+    m = ObjectMap(cls=Node)
+    with pytest.raises(ArgError, match="arg1 must be a list of objects of class"):
+        m.get_many_q([ValueSet()])
+    with pytest.raises(ArgError, match="object must be mapped"):
+        m.get_many_q([Node()])
+    n = Node({"handle": "test", "model": "test"})
+    n.neoid = 1
+    nn = Node({"handle": "test2", "model": "test"})
+    nn.neoid = 2
+    (qry, parms) = m.get_many_q([n, nn])
+    assert parms == {"ids": [1, 2]}
+    assert qry.startswith("MATCH (n:node) WHERE id(n) IN $ids OPTIONAL MATCH ")
+    atts = list(Node.mapspec()["relationship"])
+    assert qry.endswith(
+        "RETURN id(n) AS neoid, n, " + ", ".join(f"a{i}" for i in range(len(atts)))
+    )
+    i = atts.index("props")
+    assert (
+        f"OPTIONAL MATCH (n)-[:has_property]->(a:property) WITH n, "
+        + ", ".join(f"a{j}" for j in range(i))
+        + f", collect(a) AS a{i}"
+    ) in qry
+    t = Tag({"key": "Class", "value": "primary"})
+    t.neoid = 3
+    (qry, parms) = ObjectMap(cls=Tag).get_many_q([t])
+    assert "OPTIONAL MATCH (n)<-[:has_tag]-(a) WHERE 'node' IN labels(a) OR " in qry
+
+
 def test_put_queries():
     m = ObjectMap(cls=Node)
     n = Node({"handle": "test", "model": "test_model", "_commit": 1})
-    qry = m.put_q(n)
-    assert qry == [
-        ('CREATE (n:node {_commit:$p0,handle:$p1,model:$p2}) RETURN n,id(n)',
-         {"p0": 1, "p1": "test", "p2": "test_model"})
+    assert m.put_q(n) == [
+        (
+            "CREATE (n:node) SET n = $props RETURN n,id(n)",
+            {"props": {"_commit": 1, "handle": "test", "model": "test_model"}},
+        )
     ]
     n.neoid = 2
-    stmts = m.put_q(n)
-    assert stmts[0] == (
-        'MATCH (n:node) WHERE id(n)=2 SET n._commit=$p0,n.handle=$p1,n.model=$p2 RETURN n,id(n)',
-        {"p0": 1, "p1": "test", "p2": "test_model"}
-    )
-    assert (
-        len(stmts[1:])
-        == len([x for x in Node.attspec if Node.attspec[x] == "simple"]) - 3
-    )
-    for s in stmts[1:]:
-        assert re.match(
-            "^MATCH \\(n:node\\) WHERE id\\(n\\)=2 REMOVE n.[a-z_]+ RETURN n,id\\(n\\)$",
-            s[0],
-        )
+    ((qry, parms),) = m.put_q(n)
+    assert qry == "MATCH (n:node) WHERE id(n)=$id SET n += $props RETURN n,id(n)"
+    assert parms["id"] == 2
+    assert parms["props"]["handle"] == "test"
+    # unset properties are removed
+    assert len(parms["props"]) == len(Node.mapspec()["property"])
+    assert parms["props"]["nanoid"] is None
     n.neoid = None
     with pytest.raises(ArgError, match="object must be mapped"):
         m.put_attr_q(n, "_commit", 2)
@@ -115,13 +160,17 @@ def test_put_queries():
         match="'values' must be a list of mapped Entity objects",
     ):
         m.put_attr_q(n, "concept", [c])
-    qry = m.put_attr_q(n, "_commit", [3])
-    assert qry == "MATCH (n:node) WHERE id(n)=1 SET _commit=3 RETURN id(n)"
+    assert m.put_attr_q(n, "_commit", [3]) == [
+        (
+            "MATCH (n:node) WHERE id(n)=$id SET n._commit=$value RETURN id(n)",
+            {"id": 1, "value": 3},
+        )
+    ]
     c.neoid = 2
     stmts = m.put_attr_q(n, "concept", [c])
-    assert (
-        stmts[0]
-        == "MATCH (n:node),(a:concept) WHERE id(n)=1 AND id(a)=2 MERGE (n)-[:has_concept]->(a) RETURN id(a)"
+    assert stmts[0] == (
+        "MATCH (n:node),(a:concept) WHERE id(n)=$id AND id(a)=$aid MERGE (n)-[:has_concept]->(a) RETURN id(a)",
+        {"id": 1, "aid": 2},
     )
     assert len(stmts) == 1
     prps = [
@@ -137,9 +186,9 @@ def test_put_queries():
         p.neoid = i
         i += 1
     stmts = m.put_attr_q(n, "props", prps)
-    assert (
-        stmts[0]
-        == "MATCH (n:node),(a:property) WHERE id(n)=1 AND id(a)=5 MERGE (n)-[:has_property]->(a) RETURN id(a)"
+    assert stmts[0] == (
+        "MATCH (n:node),(a:property) WHERE id(n)=$id AND id(a)=$aid MERGE (n)-[:has_property]->(a) RETURN id(a)",
+        {"id": 1, "aid": 5},
     )
     assert len(stmts) == 3
     m = ObjectMap(cls=FakeNode)
@@ -149,16 +198,111 @@ def test_put_queries():
     t.neoid = 6
     stmts = m.put_attr_q(n, "concept", [t])
     assert re.match(
-        "MATCH \\(n:node\\),\\(a\\) WHERE id\\(n\\)=1 AND id\\(a\\)=6 AND \\('[a-z]+' IN labels\\(a\\) OR '[a-z]+' IN labels\\(a\\)\\) MERGE \\(n\\)-\\[:has_concept\\]->\\(a\\) RETURN id\\(a\\)",
-        stmts[0],
+        "MATCH \\(n:node\\),\\(a\\) WHERE id\\(n\\)=\\$id AND id\\(a\\)=\\$aid AND \\('[a-z]+' IN labels\\(a\\) OR '[a-z]+' IN labels\\(a\\)\\) MERGE \\(n\\)-\\[:has_concept\\]->\\(a\\) RETURN id\\(a\\)",
+        stmts[0][0],
     )
-    qry = m.get_attr_q(n, "concept")
+    (qry, _) = m.get_attr_q(n, "concept")
     assert re.match(
-        "MATCH \\(n:node\\)-\\[:has_concept\\]->\\(a\\) WHERE id\\(n\\)=1 AND \\('[a-z]+' IN labels\\(a\\) OR '[a-z]+' IN labels\\(a\\)\\) RETURN a",
+        "MATCH \\(n:node\\)-\\[:has_concept\\]->\\(a\\) WHERE id\\(n\\)=\\$id AND \\('[a-z]+' IN labels\\(a\\) OR '[a-z]+' IN labels\\(a\\)\\) RETURN a",
+        qry,
+    )
+
+
+class FakeDriver(BoltDriver):
+    def __init__(self):
+        pass
+
+    def __del__(self):
+        pass
+
+
+class RecordingTx:
+    """Stand-in for a neo4j Transaction that assigns new ids."""
+
+    def __init__(self):
+        self.log = []
+        self.next_id = 100
+
+    def run(self, qry, parms):
+        self.log.append((qry, parms))
+        recs = []
+        for r in parms["rows"] if "AS neoid" in qry else []:
+            self.next_id += 1
+            recs.append({"i": r["i"], "neoid": r.get("id", self.next_id)})
+        return recs
+
+
+def test_put_many_queries():
+    m = ObjectMap(cls=Node)
+    with pytest.raises(ArgError, match="arg1 must be a list of objects of class"):
+        m.put_many_q([ValueSet()])
+    n = Node({"handle": "test", "model": "test_model"})
+    nn = Node({"handle": "test2", "model": "test_model"})
+    nn.neoid = 2
+    stmts = m.put_many_q([n, nn])
+    assert len(stmts) == 2
+    (qry, parms) = stmts[0]
+    assert qry == (
+        "UNWIND $rows AS row CREATE (n:node) SET n += row.props "
+        "RETURN row.i AS i, id(n) AS neoid"
+    )
+    assert parms["rows"][0]["i"] == 0
+    assert parms["rows"][0]["props"]["handle"] == "test"
+    assert parms["rows"][0]["props"]["nanoid"] is None  # removes the db property
+    (qry, parms) = stmts[1]
+    assert "MATCH (n:node) WHERE id(n) = row.id SET n += row.props" in qry
+    assert [(r["i"], r["id"]) for r in parms["rows"]] == [(1, 2)]
+    p = Property({"handle": "p"})
+    nn.props["p"] = p
+    with pytest.raises(ArgError, match="object must be mapped"):
+        m.put_many_rels_q([nn])
+    p.neoid = 5
+    assert m.put_many_rels_q([nn]) == [
+        (
+            "UNWIND $rows AS row MATCH (n:node) WHERE id(n) = row.s "
+            "MATCH (a:property) WHERE id(a) = row.d MERGE (n)-[:has_property]->(a)",
+            {"rows": [{"s": 2, "d": 5}]},
+        )
+    ]
+    fn = FakeNode({"handle": "f"})
+    fn.neoid = 1
+    fn.concept = Term({"value": "boog"})
+    fn.concept.neoid = 6
+    ((qry, parms),) = ObjectMap(cls=FakeNode).put_many_rels_q([fn])
+    assert re.search(
+        "MATCH \\(a\\) WHERE id\\(a\\) = row.d AND \\('[a-z]+' IN labels\\(a\\) OR",
         qry,
     )
 
 
+def test_put_many():
+    ObjectMap.clear_cache()
+    tx = RecordingTx()
+    m = ObjectMap(cls=ValueSet, drv=FakeDriver())
+    vs = ValueSet({"handle": "vs"})
+    for i in range(500):
+        vs.terms[f"t{i}"] = Term({"value": f"t{i}"})
+    assert m.put_many([vs], tx) == [vs]
+    # one statement for each class, and one for the relationships
+    assert len(tx.log) == 3
+    assert vs.neoid is not None
+    assert all(t.neoid is not None and t.dirty == 0 for t in vs.terms.values())
+    (qry, parms) = tx.log[-1]
+    assert "MERGE (n)-[:has_term]->(a)" in qry
+    assert len(parms["rows"]) == 500
+    assert ObjectMap.cache[vs.neoid] is vs
+    # mapped entities are updated, and only linked
+    vs.desc = "changed"
+    tx.log.clear()
+    m.put_many([vs], tx)
+    assert [q.split(" SET")[0] for (q, p) in tx.log] == [
+        "UNWIND $rows AS row MATCH (n:value_set) WHERE id(n) = row.id",
+        "UNWIND $rows AS row MATCH (n:value_set) WHERE id(n) = row.s "
+        "MATCH (a:term) WHERE id(a) = row.d MERGE (n)-[:has_term]->(a)",
+    ]
+    ObjectMap.clear_cache()
+
+
 def test_rm_queries():
     m = ObjectMap(cls=FakeNode)
     n = FakeNode({"handle": "test", "model": "test_model", "category": 1})
@@ -169,21 +313,21 @@ def test_rm_queries():
     with pytest.raises(ArgError, match="object must be mapped"):
         m.rm_q(n)
     n.neoid = 1
-    qry = m.rm_q(n)
-    assert qry == "MATCH (n:node) WHERE id(n)=1 DELETE n"
-    qry = m.rm_q(n, detach=True)
-    assert qry == "MATCH (n:node) WHERE id(n)=1 DETACH DELETE n"
+    assert m.rm_q(n) == ("MATCH (n:node) WHERE id(n)=$id DELETE n", {"id": 1})
+    (qry, _) = m.rm_q(n, detach=True)
+    assert qry == "MATCH (n:node) WHERE id(n)=$id DETACH DELETE n"
     c = Concept({"_id": "blerf"})
-    qry = m.rm_attr_q(n, "model")
-    assert qry == "MATCH (n:node) WHERE id(n)=1 REMOVE n.model RETURN id(n)"
-    qry = m.rm_attr_q(n, "props", [":all"])
+    assert m.rm_attr_q(n, "model") == [
+        ("MATCH (n:node) WHERE id(n)=$id REMOVE n.model RETURN id(n)", {"id": 1})
+    ]
+    ((qry, _),) = m.rm_attr_q(n, "props", [":all"])
     assert (
         qry
-        == "MATCH (n:node)-[r:has_property]->(a:property) WHERE id(n)=1 DELETE r RETURN id(n),id(a)"
+        == "MATCH (n:node)-[r:has_property]->(a:property) WHERE id(n)=$id DELETE r RETURN id(n),id(a)"
     )
-    qry = m.rm_attr_q(n, "concept", [":all"])
+    ((qry, _),) = m.rm_attr_q(n, "concept", [":all"])
     assert re.match(
-        "MATCH \\(n:node\\)-\\[r:has_concept\\]->\\(a\\) WHERE id\\(n\\)=1 AND \\('[a-z]+' IN labels\\(a\\) OR '[a-z]+' IN labels\\(a\\)\\) DELETE r",
+        "MATCH \\(n:node\\)-\\[r:has_concept\\]->\\(a\\) WHERE id\\(n\\)=\\$id AND \\('[a-z]+' IN labels\\(a\\) OR '[a-z]+' IN labels\\(a\\)\\) DELETE r",
         qry,
     )
     prps = [
@@ -199,9 +343,9 @@ def test_rm_queries():
         p.neoid = i
         i += 1
     stmts = m.rm_attr_q(n, "props", prps)
-    assert (
-        stmts[0]
-        == "MATCH (n:node)-[r:has_property]->(a:property) WHERE id(n)=1 AND id(a)=5 DELETE r RETURN id(n),id(a)"
+    assert stmts[0] == (
+        "MATCH (n:node)-[r:has_property]->(a:property) WHERE id(n)=$id AND id(a)=$aid DELETE r RETURN id(n),id(a)",
+        {"id": 1, "aid": 5},
     )
     assert len(stmts) == 3
 
@@ -210,32 +354,20 @@ def test_put_then_rm_queries():
     """Test adding then removing attr"""
     m = ObjectMap(cls=Node)
     n = Node({"handle": "test_", "model": "test_model_", "_commit": 1})
-    qry = m.put_q(n)
-    assert qry == [(
-        'CREATE (n:node {_commit:$p0,handle:$p1,model:$p2}) RETURN n,id(n)',
-        {"p0": 1, "p1": "test_", "p2": "test_model_"}
-    )]
-
-    # manually set neoid
-    n.neoid = 2
-    stmts = m.put_q(n)
-    assert (
-        stmts[0]
-        == (
-            'MATCH (n:node) WHERE id(n)=2 SET n._commit=$p0,n.handle=$p1,n.model=$p2 RETURN n,id(n)',
-            {"p0": 1, "p1": "test_", "p2": "test_model_"}
-        )
-            
-    )
-    assert (
-        len(stmts[1:])
-        == len([x for x in Node.attspec if Node.attspec[x] == "simple"]) - 3
-    )
-    for s in stmts[1:]:
-        assert re.match(
-            "^MATCH \\(n:node\\) WHERE id\\(n\\)=2 REMOVE n.[a-z_]+ RETURN n,id\\(n\\)$",
-            s[0],
+    assert m.put_q(n) == [
+        (
+            "CREATE (n:node) SET n = $props RETURN n,id(n)",
+            {"props": {"_commit": 1, "handle": "test_", "model": "test_model_"}},
         )
+    ]
+    n.neoid = 2
+    ((qry, parms),) = m.put_q(n)
+    assert qry == "MATCH (n:node) WHERE id(n)=$id SET n += $props RETURN n,id(n)"
+    assert parms["id"] == 2
+    assert parms["props"]["handle"] == "test_"
+    # unset properties are removed
+    assert len(parms["props"]) == len(Node.mapspec()["property"])
+    assert parms["props"]["nanoid"] is None
 
     n.neoid = None
     with pytest.raises(ArgError, match="object must be mapped"):
@@ -254,8 +386,12 @@ def test_put_then_rm_queries():
     ):
         m.put_attr_q(n, "concept", [c])
 
-    qry = m.put_attr_q(n, "_commit", [3])
-    assert qry == "MATCH (n:node) WHERE id(n)=1 SET _commit=3 RETURN id(n)"
+    assert m.put_attr_q(n, "_commit", [3]) == [
+        (
+            "MATCH (n:node) WHERE id(n)=$id SET n._commit=$value RETURN id(n)",
+            {"id": 1, "value": 3},
+        )
+    ]
 
     c.neoid = 2
     stmts = m.put_attr_q(n, "concept", [c])
@@ -275,9 +411,9 @@ def test_put_then_rm_queries():
         p.neoid = i
         i += 1
     stmts = m.put_attr_q(n, "props", prps)
-    assert (
-        stmts[0]
-        == "MATCH (n:node),(a:property) WHERE id(n)=1 AND id(a)=5 MERGE (n)-[:has_property]->(a) RETURN id(a)"
+    assert stmts[0] == (
+        "MATCH (n:node),(a:property) WHERE id(n)=$id AND id(a)=$aid MERGE (n)-[:has_property]->(a) RETURN id(a)",
+        {"id": 1, "aid": 5},
     )
     assert len(stmts) == 3
 
@@ -307,18 +443,18 @@ def test_put_then_rm_queries():
     t.neoid = 6
     stmts = tm.put_attr_q(tn, "concept", [t])
     assert re.match(
-        "MATCH \\(n:node\\),\\(a\\) WHERE id\\(n\\)=1 AND id\\(a\\)=6 AND \\('[a-z]+' IN labels\\(a\\) OR '[a-z]+' IN labels\\(a\\)\\) MERGE \\(n\\)-\\[:has_concept\\]->\\(a\\) RETURN id\\(a\\)",
-        stmts[0],
+        "MATCH \\(n:node\\),\\(a\\) WHERE id\\(n\\)=\\$id AND id\\(a\\)=\\$aid AND \\('[a-z]+' IN labels\\(a\\) OR '[a-z]+' IN labels\\(a\\)\\) MERGE \\(n\\)-\\[:has_concept\\]->\\(a\\) RETURN id\\(a\\)",
+        stmts[0][0],
     )
-    qry = tm.get_attr_q(tn, "concept")
+    (qry, _) = tm.get_attr_q(tn, "concept")
     assert re.match(
-        "MATCH \\(n:node\\)-\\[:has_concept\\]->\\(a\\) WHERE id\\(n\\)=1 AND \\('[a-z]+' IN labels\\(a\\) OR '[a-z]+' IN labels\\(a\\)\\) RETURN a",
+        "MATCH \\(n:node\\)-\\[:has_concept\\]->\\(a\\) WHERE id\\(n\\)=\\$id AND \\('[a-z]+' IN labels\\(a\\) OR '[a-z]+' IN labels\\(a\\)\\) RETURN a",
         qry,
     )
 
     # now delete the attr I just added....
     qry2 = tm.rm_attr_q(tn, "concept", [t])
     assert re.match(
-        "MATCH \\(n:node\\)-\\[r:has_concept\\]->\\(a\\) WHERE id\\(n\\)=1 AND id\\(a\\)=6 AND \\('[a-z]+' IN labels\\(a\\) OR '[a-z]+' IN labels\\(a\\)\\) DELETE r RETURN id\\(n\\),id\\(a\\)",
-        qry2[0],
+        "MATCH \\(n:node\\)-\\[r:has_concept\\]->\\(a\\) WHERE id\\(n\\)=\\$id AND id\\(a\\)=\\$aid AND \\('[a-z]+' IN labels\\(a\\) OR '[a-z]+' IN labels\\(a\\)\\) DELETE r RETURN id\\(n\\),id\\(a\\)",
+        qry2[0][0],
     )
@@ -1,3 +1,5 @@
+import os
+import subprocess
 import sys
 
 sys.path.insert(0, ".")
@@ -87,3 +89,52 @@ def test_get_attr_dict() -> None:
     assert ent.get_attr_dict() == {}
     ent.c = CollValue({}, owner=ent, owner_key="c")
     assert ent.get_attr_dict() == {}
+
+
+def test_lazy_private_state() -> None:
+    ent = TestEntity()
+    assert ent._stored("pvt") is None
+    assert ent._stored("c") is None
+    assert ent.dirty == 1
+    assert ent.neoid is None
+    assert ent.element_id is None
+    ent.dirty = 0
+    assert len(ent.c) == 0  # empty collection created on access
+    assert isinstance(ent._stored("c"), CollValue)
+    assert ent.dirty == 0
+    assert ent._stored("pvt") is None
+    ent.c["k"] = TestEntity()
+    assert ent.dirty == 1
+    assert (id(ent), "c", "k") in ent.c["k"].belongs
+    assert ent.removed_entities == []
+    assert ent._stored("pvt") is None  # reading does not allocate
+    ent.add_removed_entity(ent.c["k"])
+    assert len(ent.removed_entities) == 1
+    ent.clear_removed_entities()
+    assert ent.removed_entities == []
+
+
+def test_compact_mode() -> None:
+    code = """
+from bento_meta.entity import COMPACT
+from bento_meta.objects import Node, Property, ValueSet, Term
+assert COMPACT
+n = Node({"handle": "case"})
+assert not hasattr(n, "__dict__")
+p = Property({"handle": "p", "value_domain": "value_set"})
+n.props["p"] = p
+assert n.props["p"] is p and (id(n), "props", "p") in p.belongs
+p.value_set = ValueSet({"prop": p})
+p.value_set.terms["a"] = Term({"value": "a"})
+p.dirty = 0
+p.value_set.dirty = 1
+assert p.dirty == 1
+assert n.concept is None
+n.neoid = 5
+assert n.neoid == 5
+"""
+    env = {**os.environ, "BENTO_META_COMPACT": "1"}
+    r = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True
+    )
+    assert r.returncode == 0, r.stderr
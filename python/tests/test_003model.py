@@ -3,8 +3,14 @@ import sys
 sys.path.insert(0, ".")
 sys.path.insert(0, "..")
 
+import itertools
+
+import neo4j
 import pytest
-from bento_meta.model import ArgError, Model
+from bento_meta.entity import dirty_entities
+from bento_meta.mdb import MDB
+from bento_meta.model import ArgError, EdgeDict, Model
+from bento_meta.object_map import ObjectMap
 from bento_meta.objects import Edge, Node, Property, Term
 
 
@@ -74,3 +80,334 @@ def test_create_model():
     assert ("CRS", "Marilyn", None, None) in model.terms
     assert ("case", "CTOS", None, None) in model.terms
     assert dx.value_set in tm.belongs.values()
+
+
+def test_edge_indexes():
+    model = Model("test")
+    case = model.add_node({"handle": "case"})
+    sample = model.add_node({"handle": "sample"})
+    visit = model.add_node({"handle": "visit"})
+    of_case = model.add_edge(Edge({"handle": "of_case", "src": sample, "dst": case}))
+    v_of_case = model.add_edge(Edge({"handle": "of_case", "src": visit, "dst": case}))
+    of_visit = model.add_edge(Edge({"handle": "of_visit", "src": sample, "dst": visit}))
+    assert model.edges_in(case) == [of_case, v_of_case]
+    assert model.edges_out(sample) == [of_case, of_visit]
+    assert model.edges_by_src(visit) == [v_of_case]
+    assert model.edges_by_dst(visit) == [of_visit]
+    assert model.edges_by_type("of_case") == [of_case, v_of_case]
+    assert model.edges_by_type("nope") == []
+    model.assign_edge_end(v_of_case, "dst", sample)
+    assert model.edges_in(case) == [of_case]
+    assert model.edges_in(sample) == [v_of_case]
+    model.rm_edge(of_visit)
+    assert model.edges_out(sample) == [of_case]
+    assert model.edges_by_type("of_visit") == []
+    assert model.edges.pop(("nope", "a", "b"), None) is None
+    assert model.edges.pop(of_case.triplet) is of_case
+    assert model.edges_in(case) == []
+    # direct assignment is indexed too
+    model.edges = {of_case.triplet: of_case}
+    assert isinstance(model.edges, EdgeDict)
+    assert model.edges_out(sample) == [of_case]
+    model.edges.clear()
+    assert model.edges_by_type("of_case") == []
+
+
+def test_contains():
+    model = Model("test")
+    case = model.add_node({"handle": "case"})
+    other = Node({"handle": "case"})
+    assert model.contains(case)
+    assert not model.contains(other)
+    p = model.add_prop(case, Property({"handle": "case_id"}))
+    assert model.contains(p)
+    # same entity under two keys stays contained until both are gone
+    model.props[("alias", "case_id")] = p
+    del model.props[("case", "case_id")]
+    assert model.contains(p)
+    model.props.pop(("alias", "case_id"))
+    assert not model.contains(p)
+    model.nodes["case"] = other
+    assert model.contains(other)
+    assert not model.contains(case)
+    model.nodes = {"case": case}
+    assert model.contains(case)
+    t = Term({"value": "x"})
+    model.terms.setdefault(("x", None, None, None), t)
+    assert model.contains(t)
+    model.terms.clear()
+    assert not model.contains(t)
+
+
+def test_where_used():
+    model = Model("test")
+    case = model.add_node({"handle": "case"})
+    sample = model.add_node({"handle": "sample"})
+    of_case = model.add_edge(Edge({"handle": "of_case", "src": sample, "dst": case}))
+    p = Property({"handle": "disease", "value_domain": "value_set"})
+    q = Property({"handle": "site", "value_domain": "value_set"})
+    model.add_prop(case, p)
+    model.add_prop(of_case, p)
+    model.add_prop(sample, q)
+    assert model.prop_owners(p) == [case, of_case]
+    assert model.prop_owners(q) == [sample]
+    t = Term({"value": "lung", "origin_name": "NCIt"})
+    model.add_terms(p, t, "liver")
+    model.add_terms(q, t)
+    assert model.term_props(t) == [p, q]
+    assert model.term_value_sets(t) == [p.value_set, q.value_set]
+    liver = p.value_set.terms["liver"]
+    assert model.term_props(liver) == [p]
+    # rm_term removes the term from value sets and from Model.terms
+    assert model.rm_term(liver) is liver
+    assert "liver" not in p.value_set.terms
+    assert model.term_props(liver) == []
+    assert not model.contains(liver)
+    model.rm_prop(q)
+    assert model.prop_owners(q) == []
+    assert model.term_props(t) == [p]
+    # a property added with a populated value set is indexed
+    model.add_prop(sample, q)
+    assert model.term_props(t) == [p, q]
+    del model.props[("case", "disease")]
+    assert model.prop_owners(p) == [of_case]
+    assert model.rm_term(t) is t
+    assert model.term_props(t) == []
+    assert model.rm_term(t) is None
+
+
+class RecordingResult(list):
+    def consume(self):
+        pass
+
+
+class RecordingTx:
+    """Stand-in for a neo4j Transaction that assigns new ids."""
+
+    ids = itertools.count(1)
+
+    def __init__(self, log, fail):
+        self.log = log
+        self.fail = fail
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def run(self, qry, parms=None):
+        if self.fail:
+            raise RuntimeError("boom")
+        self.log.append((qry, parms))
+        if "AS neoid" not in qry:
+            return RecordingResult()
+        return RecordingResult(
+            {"i": r["i"], "neoid": r["id"] if "id" in r else next(self.ids)}
+            for r in parms["rows"]
+        )
+
+
+class RecordingDriver(neo4j.BoltDriver):
+    """Stand-in for a neo4j driver that records transactions."""
+
+    def __init__(self):
+        self.txns = []
+        self.fail = False
+
+    def session(self, **kwargs):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def begin_transaction(self):
+        self.txns.append([])
+        return RecordingTx(self.txns[-1], self.fail)
+
+    def close(self):
+        pass
+
+    def __del__(self):
+        pass
+
+
+class RecordingMDB(MDB):
+    """Stand-in for an MDB with a RecordingDriver."""
+
+    def __init__(self):
+        self.driver = RecordingDriver()
+        self.result_cache = None
+
+
+def test_dput_dirty_only():
+    mdb = RecordingMDB()
+    drv = mdb.driver
+    model = Model("test", mdb=mdb)
+    try:
+        case = model.add_node({"handle": "case"})
+        sample = model.add_node({"handle": "sample"})
+        model.add_edge(Edge({"handle": "of_case", "src": sample, "dst": case}))
+        model.add_prop(case, Property({"handle": "case_id"}))
+        stray = Node({"handle": "stray"})
+        model.dput()
+        assert len(drv.txns) == 1
+        assert all(e.neoid is not None for e in model.nodes.values())
+        assert stray in dirty_entities()
+        assert stray.neoid is None
+        assert not [e for e in model.nodes.values() if e in dirty_entities()]
+        # only the changed entity is put
+        case.desc = "A case"
+        model.dput()
+        assert len(drv.txns) == 2
+        assert drv.txns[1]
+        assert {
+            r.get("id", r.get("s")) for (q, p) in drv.txns[1] for r in p["rows"]
+        } == {case.neoid}
+        # nothing changed, nothing put
+        model.dput()
+        assert drv.txns[2] == []
+        # a failed push leaves entities dirty
+        sample.desc = "A sample"
+        new = model.add_node({"handle": "visit"})
+        drv.fail = True
+        with pytest.raises(RuntimeError, match="boom"):
+            model.dput()
+        assert sample.dirty == new.dirty == 1
+        assert new.neoid is None
+    finally:
+        model.mdb = None
+
+
+def test_dput_by_class(monkeypatch):
+    mdb = RecordingMDB()
+    model = Model("test", mdb=mdb)
+    calls = []
+    put_many = ObjectMap.put_many
+
+    def recording_put_many(self, objs, tx=None):
+        calls.append((self.cls, {type(o) for o in objs}))
+        return put_many(self, objs, tx)
+
+    monkeypatch.setattr(ObjectMap, "put_many", recording_put_many)
+    try:
+        case = model.add_node({"handle": "case"})
+        prop = model.add_prop(case, Property({"handle": "case_id"}))
+        model.dput()
+        # the new prop was put along with its node
+        assert calls == [(Node, {Node})]
+        calls.clear()
+        # first dirty entity is a Property; each class goes to its own map
+        prop.desc = "An id"
+        case.desc = "A case"
+        model.dput()
+        assert calls == [(Property, {Property}), (Node, {Node})]
+        assert prop.dirty == case.dirty == 0
+    finally:
+        model.mdb = None
+
+
+class CannedPath:
+    def __init__(self, *nodes):
+        self.nodes = nodes
+
+
+class CannedDriver(RecordingDriver):
+    """Stand-in for a neo4j driver that answers queries with canned records."""
+
+    def __init__(self, answers):
+        super().__init__()
+        self.answers = answers
+        self.queries = []
+
+    def run(self, qry, parms=None):
+        self.queries.append(qry)
+        for pattern, recs in self.answers:
+            if pattern in qry:
+                return recs
+        return []
+
+
+def test_dget_eager():
+    graph = neo4j.graph.Graph()
+
+    def db_node(neoid, label, **props):
+        props.setdefault("nanoid", f"n{neoid}")
+        return neo4j.graph.Node(graph, f"4:db:{neoid}", neoid, [label], props)
+
+    (sample, case, study) = (
+        db_node(1, "node", handle="sample", model="test"),
+        db_node(2, "node", handle="case", model="test"),
+        db_node(4, "node", handle="study", model="test"),
+    )
+    of_case = db_node(3, "relationship", handle="of_case", model="test")
+    dx = db_node(10, "property", handle="diagnosis", model="test")
+    operator = db_node(11, "property", handle="operator", model="test")
+    vs = db_node(20, "value_set", handle="dx_vs")
+    (t1, t2, t3) = (
+        db_node(30, "term", value="CRS", origin_name="NCIt"),
+        db_node(31, "term", value="fungus", origin_name="NCIt"),
+        db_node(32, "term", value="case", origin_name="CTOS"),
+    )
+    concept = db_node(40, "concept")
+    origin = db_node(50, "origin", name="NCIt")
+    tag = db_node(60, "tag", key="status", value="draft")
+    answers = [
+        ("has_src", [{"p": CannedPath(sample, of_case, case)}]),
+        ("not (n)<--", [{"n": study}]),
+        ("match (n:node {model", [{"id(n)": 2, "p": dx}]),
+        ("match (r:relationship {model", [{"id(r)": 3, "p": operator}]),
+        ("has_value_set", [{"pid": 10, "vs": vs, "terms": [t1, t2]}]),
+        ("has_concept", [{"eid": 2, "c": concept, "terms": [t3]}]),
+        ("has_origin", [{"xid": 30, "o": origin}, {"xid": 20, "o": origin}]),
+        ("has_tag", [{"xid": 10, "tags": [tag]}]),
+    ]
+    mdb = RecordingMDB()
+    mdb.driver = CannedDriver(answers)
+    ObjectMap.clear_cache()
+    model = Model("test", mdb=mdb)
+    try:
+        model.dget(eager=True)
+        assert len(mdb.driver.queries) == 8
+        assert set(model.nodes) == {"sample", "case", "study"}
+        edge = model.edges[("of_case", "sample", "case")]
+        assert edge.src is model.nodes["sample"]
+        assert edge.props["operator"].neoid == 11
+        prop = model.props[("case", "diagnosis")]
+        assert model.nodes["case"].props["diagnosis"] is prop
+        # value set -> prop, with terms and origins
+        assert prop.value_set.neoid == 20
+        assert prop.value_set.prop is prop
+        assert {t.value for t in prop.value_set.terms.values()} == {"CRS", "fungus"}
+        assert {t.value for t in prop.terms.values()} == {"CRS", "fungus"}
+        crs = next(t for t in prop.value_set.terms.values() if t.value == "CRS")
+        assert crs.origin.name == "NCIt"
+        assert prop.value_set.origin is crs.origin
+        # concept -> term
+        case_concept = model.nodes["case"].concept
+        assert case_concept.neoid == 40
+        ((term,),) = [list(case_concept.terms.values())]
+        assert term.value == "case"
+        assert term.concept is case_concept
+        assert [g.value for g in prop.tags.values()] == ["draft"]
+        # all clean; walking the model does not query
+        ents = [
+            *model.nodes.values(),
+            *model.edges.values(),
+            *model.props.values(),
+            prop.value_set,
+            *prop.value_set.terms.values(),
+            case_concept,
+            term,
+            crs.origin,
+            *prop.tags.values(),
+        ]
+        assert all(e.dirty == 0 for e in ents)
+        assert not [e for e in ents if e in dirty_entities()]
+        assert len(mdb.driver.queries) == 8
+    finally:
+        model.mdb = None
+        ObjectMap.clear_cache()
@@ -3,8 +3,14 @@ import sys
 sys.path.insert(0, ".")
 sys.path.insert(0, "..")
 
+import asyncio
+import threading
+import time
+
+import bento_meta.mdb.mdb
 import pytest
-from bento_meta.mdb import MDB, WriteableMDB
+from bento_meta.cache import ResultCache
+from bento_meta.mdb import MDB, AsyncMDB, AsyncWriteableMDB, WriteableMDB
 from pdb import set_trace
 
 @pytest.mark.docker
@@ -69,3 +75,515 @@ def test_rd_txns(test_mdb):
     assert result == None
     result = mdb.get_entities_by_tag(key="gleb", value="blurg")
     assert result == None
+
+
+@pytest.mark.docker
+def test_async_rd_txns(test_mdb):
+    (b, h) = test_mdb
+
+    async def run():
+        async with AsyncMDB(uri=b, user="neo4j", password="neo4j1") as mdb:
+            assert "ICDC" in mdb.get_model_handles()
+            nodes, vsets = await asyncio.gather(
+                mdb.get_nodes_by_model("CTDC", "1.19.0"),
+                mdb.get_valuesets_by_model("ICDC"),
+            )
+            assert len(nodes) == 18
+            assert vsets
+            assert await mdb.get_entities_by_tag(key="gleb", value="blurg") is None
+
+    asyncio.run(run())
+
+
+class FakeAsyncResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __aiter__(self):
+        async def gen():
+            for r in self.rows:
+                yield r
+        return gen()
+
+    async def data(self):
+        return list(self.rows)
+
+    async def value(self, key):
+        return [r[key] for r in self.rows]
+
+
+class FakeAsyncSession:
+    def __init__(self, drv):
+        self.drv = drv
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def run(self, qry, parameters=None):
+        self.drv.log.append((qry, parameters))
+        await asyncio.sleep(0)  # let other coroutines run
+        return FakeAsyncResult(self.drv.rows.get(qry.split()[1], []))
+
+    async def execute_read(self, fn):
+        self.drv.running += 1
+        self.drv.max_running = max(self.drv.running, self.drv.max_running)
+        try:
+            return await fn(self)
+        finally:
+            self.drv.running -= 1
+
+    execute_write = execute_read
+
+
+class FakeAsyncDriver:
+    def __init__(self, rows):
+        self.rows = rows
+        self.log = []
+        self.running = 0
+        self.max_running = 0
+        self.closed = False
+
+    def session(self):
+        return FakeAsyncSession(self)
+
+    async def close(self):
+        self.closed = True
+
+
+def test_async_mdb():
+    model_rows = [
+        {"m": {"handle": "ICDC", "version": "1.0", "is_latest_version": False}},
+        {"m": {"handle": "ICDC", "version": "2.0", "is_latest_version": True}},
+    ]
+    drv = FakeAsyncDriver(
+        {
+            "(m:model)": model_rows,
+            "(vs:value_set)<-[:has_value_set]-(p:property)": [{"value_set": {}}],
+        }
+    )
+    mdb = AsyncMDB(uri="bolt://localhost:7687")
+    mdb.driver = drv
+
+    async def run():
+        async with mdb:
+            assert mdb.get_model_versions("ICDC") == ["1.0", "2.0"]
+            assert mdb.get_latest_version("ICDC") == "2.0"
+            return await asyncio.gather(
+                mdb.get_model_nodes("ICDC"),
+                mdb.get_valuesets_by_model("ICDC"),
+                mdb.get_nodes_by_model("ICDC"),
+            )
+
+    (nodes, vsets, by_model) = asyncio.run(run())
+    assert drv.closed
+    assert drv.max_running == 3  # the lookups ran concurrently
+    assert nodes == [model_rows[0], model_rows[1]]
+    assert vsets == [{"value_set": {}}]
+    assert by_model == []
+    # same statements as the synchronous MDB
+    assert drv.log[-1] == (
+        "match (n:node) where n.model = $model and n.version = $version return n",
+        {"model": "ICDC", "version": "2.0"},
+    )
+    assert drv.log[-3] == ("match (m:model) where m.handle = $model return m", {"model": "ICDC"})
+
+    wmdb = AsyncWriteableMDB(uri="bolt://localhost:7687")
+    wmdb.driver = drv
+    with pytest.raises(TypeError, match="must be a dict"):
+        asyncio.run(wmdb.put_with_statements([("create (n:node) return n", [])]))
+    asyncio.run(
+        wmdb.put_with_statements(
+            [("create (n:node) return n", None), ("match (n:node) return n", {"a": 1})]
+        )
+    )
+    assert drv.log[-2:] == [
+        ("create (n:node) return n", {}),
+        ("match (n:node) return n", {"a": 1}),
+    ]
+
+
+class FakeRecord(dict):
+    def data(self):
+        return dict(self)
+
+
+class FakeResult(list):
+    def __iter__(self):
+        for r in super().__iter__():
+            self.fetched += 1
+            yield FakeRecord(r)
+
+    def value(self, key):
+        return [r[key] for r in self]
+
+    def data(self):
+        return [r.data() for r in self]
+
+
+class FakeSession:
+    def __init__(self, drv, config):
+        self.drv = drv
+        self.config = config
+        drv.opened += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.drv.closed += 1
+
+    def run(self, qry, parameters=None):
+        self.drv.log.append((id(self), qry))
+        rows = self.drv.rows.get(qry.split()[1], [])
+        if callable(rows):
+            rows = rows(parameters or {})
+        self.drv.result = FakeResult(rows)
+        self.drv.result.fetched = 0
+        return self.drv.result
+
+    def execute_read(self, fn):
+        return fn(self)
+
+    execute_write = execute_read
+
+    def begin_transaction(self):
+        return FakeTx(self)
+
+
+class FakeTx:
+    def __init__(self, session):
+        self.session = session
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def run(self, qry, parameters=None):
+        return self.session.run(qry, parameters)
+
+
+class FakeDriver:
+    def __init__(self, rows, **config):
+        self.rows = rows
+        self.config = config
+        self.log = []
+        self.opened = 0
+        self.closed = 0
+
+    def session(self, **config):
+        self.last_session = FakeSession(self, config)
+        return self.last_session
+
+
+def test_session_scope(monkeypatch):
+    rows = {
+        "(m:model)": [
+            {"m": {"handle": "ICDC", "version": "1.0", "is_latest_version": True}},
+        ],
+        "(t:term": [{"term": {"value": "x"}, "origin": None}],
+    }
+    monkeypatch.setattr(
+        bento_meta.mdb.mdb.GraphDatabase,
+        "driver",
+        lambda uri, auth, **config: FakeDriver(rows, **config),
+    )
+    mdb = WriteableMDB(
+        uri="bolt://localhost:7687",
+        max_connection_pool_size=10,
+        fetch_size=500,
+    )
+    drv = mdb.driver
+    assert drv.config == {"max_connection_pool_size": 10, "fetch_size": 500}
+    assert mdb.latest_version == {"ICDC": "1.0"}
+    assert drv.opened == drv.closed == 1
+    mdb.get_term_by_id("abc")
+    mdb.get_term_by_id("def")
+    assert drv.opened == drv.closed == 3
+
+    with mdb.session_scope() as session:
+        assert mdb.get_term_by_id("abc") == rows["(t:term"]
+        mdb.put_with_statement("match (t:term) return t")
+        with mdb.session_scope() as inner:
+            assert inner is session
+            mdb.get_origins()
+        # another thread does not use this thread's session
+        t = threading.Thread(target=mdb.get_term_by_id, args=("xyz",))
+        t.start()
+        t.join()
+        assert drv.opened == 5
+        assert drv.closed == 4
+    assert drv.opened == drv.closed == 5
+    assert [sid for sid, _ in drv.log[-4:-1]] == [id(session)] * 3
+    assert drv.log[-1][0] != id(session)
+    mdb.get_term_by_id("abc")
+    assert drv.opened == drv.closed == 6
+
+
+def test_result_cache(monkeypatch):
+    rows = {
+        "(m:model)": [
+            {"m": {"handle": "ICDC", "version": "1.0", "is_latest_version": True}},
+            {"m": {"handle": "CTDC", "version": "1.0", "is_latest_version": True}},
+        ],
+        "(n:node)-[:has_property]->(p:property)": [{"id": "abc", "props": []}],
+    }
+    monkeypatch.setattr(
+        bento_meta.mdb.mdb.GraphDatabase,
+        "driver",
+        lambda uri, auth, **config: FakeDriver(rows, **config),
+    )
+    cache = ResultCache(max_entries=100)
+    mdb = WriteableMDB(uri="bolt://localhost:7687", result_cache=cache)
+    drv = mdb.driver
+    n = len(drv.log)
+    icdc = mdb.get_nodes_and_props_by_model("ICDC")
+    icdc.append("junk")  # does not affect the cached result
+    assert mdb.get_nodes_and_props_by_model("ICDC") == rows[
+        "(n:node)-[:has_property]->(p:property)"
+    ]
+    assert mdb.get_nodes_and_props_by_model("ICDC", "1.0") is not None  # same query
+    mdb.get_nodes_and_props_by_model("CTDC")
+    assert mdb.get_origins() is None
+    assert mdb.get_origins() is None
+    assert len(drv.log) - n == 3
+    assert cache.hits == 3
+    # a write to ICDC leaves CTDC results
+    mdb.put_with_statement(
+        "match (n:node) where n.model = $model set n.x = 1 return n",
+        {"model": "ICDC", "version": "1.0"},
+    )
+    n = len(drv.log)
+    mdb.get_nodes_and_props_by_model("ICDC")
+    mdb.get_nodes_and_props_by_model("CTDC")
+    mdb.get_origins()
+    assert len(drv.log) - n == 2
+    # a write without a model parameter clears the cache
+    mdb.put_with_statements([("match (t:term) set t.x = 1 return t", None)])
+    assert len(cache) == 0
+
+
+def test_iter_methods(monkeypatch):
+    rows = {
+        "(m:model)": [
+            {"m": {"handle": "ICDC", "version": "1.0", "is_latest_version": True}},
+        ],
+        "(n:node)": [{"n": {"handle": h}} for h in "abcde"],
+        "(t:term)": [{"t": {"value": v}} for v in "xyz"],
+    }
+    monkeypatch.setattr(
+        bento_meta.mdb.mdb.GraphDatabase,
+        "driver",
+        lambda uri, auth, **config: FakeDriver(rows, **config),
+    )
+    mdb = MDB(uri="bolt://localhost:7687")
+    drv = mdb.driver
+    it = mdb.iter_nodes_by_model("ICDC", fetch_size=2)
+    assert drv.opened == 1  # nothing run until iterated
+    assert next(it) == {"handle": "a"}
+    assert drv.last_session.config == {"default_access_mode": "READ", "fetch_size": 2}
+    assert drv.result.fetched == 1
+    assert drv.opened == drv.closed + 1
+    with mdb.session_scope() as session:
+        # an open stream does not hold up other calls
+        assert mdb.get_nodes_by_model("ICDC") == [{"handle": h} for h in "abcde"]
+    assert session.config == {}
+    assert [n["handle"] for n in it] == list("bcde")
+    assert drv.opened == drv.closed
+    it = mdb.iter_with_statement("match (t:term) return t")
+    assert next(it) == {"t": {"value": "x"}}
+    it.close()
+    assert drv.opened == drv.closed
+    with pytest.raises(RuntimeError, match="RETURN clause"):
+        mdb.iter_with_statement("match (t:term)")
+
+
+def test_paginate(monkeypatch):
+    # versions of an entity share a nanoid; the database id breaks ties
+    origins = [
+        {"o": {"name": f"o{i}", "nanoid": nanoid}, "cursor": [nanoid, i]}
+        for i, nanoid in enumerate(["001", "002", "002", "002", "003", "004", "005"])
+    ]
+    models = [
+        {"m": {"handle": h, "version": v, "is_latest_version": True}, "cursor": [h, v, i]}
+        for i, (h, v) in enumerate(
+            [("CTDC", "1.0"), ("ICDC", "1.0"), ("ICDC", "2.0"), ("PDC", "")]
+        )
+    ]
+
+    def keyset(recs):
+        def page(parms):
+            after = parms.get("after")
+            rows = [r for r in recs if after is None or r["cursor"] > after]
+            return rows[: parms.get("limit")]
+
+        return page
+
+    rows = {"(m:model)": keyset(models), "(o:origin)": keyset(origins)}
+    monkeypatch.setattr(
+        bento_meta.mdb.mdb.GraphDatabase,
+        "driver",
+        lambda uri, auth, **config: FakeDriver(rows, **config),
+    )
+    mdb = MDB(uri="bolt://localhost:7687")
+    drv = mdb.driver
+    # page boundary within the versions sharing nanoid "002"
+    assert mdb.get_origins(limit=2, after=["002", 2]) == origins[3:5]
+    assert drv.log[-1][1] == (
+        "match (o:origin) where ((o.nanoid > $after[0]) or "
+        "(o.nanoid = $after[0] and id(o) > $after[1])) "
+        "return o, [o.nanoid, id(o)] as cursor order by o.nanoid, id(o) limit $limit"
+    )
+    with pytest.raises(ValueError, match="positive integer"):
+        mdb.get_origins(limit=0)
+    with pytest.raises(ValueError, match="cursor of 2"):
+        mdb.get_origins(after="002")
+    with pytest.raises(ValueError, match="not a paged"):
+        mdb.paginate(mdb.get_term_by_id)
+    n = len(drv.log)
+    pages = list(mdb.paginate(mdb.get_origins, page_size=2))
+    assert pages == [origins[0:2], origins[2:4], origins[4:6], origins[6:]]
+    assert len(drv.log) - n == 5  # last query finds no more
+
+    # Model nodes have no nanoid; they are paged by handle and version
+    pages = list(mdb.paginate(mdb.get_model_nodes, page_size=3))
+    assert pages == [models[0:3], models[3:]]
+    assert drv.log[-1][1] == (
+        "match (m:model) where ((m.handle > $after[0]) or "
+        "(m.handle = $after[0] and coalesce(m.version, '') > $after[1]) or "
+        "(m.handle = $after[0] and coalesce(m.version, '') = $after[1] "
+        "and id(m) > $after[2])) "
+        "return m, [m.handle, coalesce(m.version, ''), id(m)] as cursor "
+        "order by m.handle, coalesce(m.version, ''), id(m) limit $limit"
+    )
+
+
+def test_paginate_tags(monkeypatch):
+    # entity e1 (id 1) has three tags with key "Class"; e2 (id 2) has one
+    pairs = [
+        ({"key": "Class", "value": v}, tid, {"nanoid": nanoid}, eid)
+        for (v, tid, nanoid, eid) in [
+            ("a", 10, "e1", 1),
+            ("b", 11, "e1", 1),
+            ("c", 12, "e1", 1),
+            ("a", 10, "e2", 2),
+        ]
+    ]
+
+    def tags(parms):
+        after = parms.get("after")
+        rows = sorted(
+            ([e["nanoid"], eid, tid], t, e) for (t, tid, e, eid) in pairs
+        )
+        rows = [r for r in rows if after is None or r[0] > after][: parms["limit"]]
+        groups = {}
+        for cursor, t, e in rows:
+            g = groups.setdefault(
+                t["value"], {"tag_key": t["key"], "tag_value": t["value"], "entities": []}
+            )
+            g["entities"].append(e)
+            g["cursor"] = cursor
+        return list(groups.values())
+
+    rows = {
+        "(m:model)": [
+            {"m": {"handle": "ICDC", "version": "1.0", "is_latest_version": True}},
+        ],
+        "(t:tag)": tags,
+    }
+    monkeypatch.setattr(
+        bento_meta.mdb.mdb.GraphDatabase,
+        "driver",
+        lambda uri, auth, **config: FakeDriver(rows, **config),
+    )
+    mdb = MDB(uri="bolt://localhost:7687")
+    # the first page boundary falls between the tags of e1
+    pages = list(mdb.paginate(mdb.get_entities_by_tag, "Class", page_size=2))
+    assert [
+        [(g["tag_value"], [e["nanoid"] for e in g["entities"]]) for g in page]
+        for page in pages
+    ] == [[("a", ["e1"]), ("b", ["e1"])], [("c", ["e1"]), ("a", ["e2"])]]
+    qry = mdb.driver.log[-1][1]
+    assert "with t, e order by e.nanoid, id(e), id(t) limit $limit" in qry
+    assert "last(collect([e.nanoid, id(e), id(t)])) as cursor" in qry
+
+
+def test_paginate_valuesets(monkeypatch):
+    rows = {
+        "(m:model)": [
+            {"m": {"handle": "ICDC", "version": "1.0", "is_latest_version": True}},
+        ],
+        "(vs:value_set)<-[:has_value_set]-(p:property)": [],
+    }
+    monkeypatch.setattr(
+        bento_meta.mdb.mdb.GraphDatabase,
+        "driver",
+        lambda uri, auth, **config: FakeDriver(rows, **config),
+    )
+    mdb = MDB(uri="bolt://localhost:7687")
+    mdb.get_valuesets_by_model("ICDC", limit=5, after=["abc", 7])
+    # value sets are paged before their properties are collected
+    assert mdb.driver.log[-1][1] == (
+        "match (vs:value_set)<-[:has_value_set]-(p:property) "
+        "where p.model = $model and p.version = $version and "
+        "((vs.nanoid > $after[0]) or (vs.nanoid = $after[0] and id(vs) > $after[1])) "
+        "with distinct vs order by vs.nanoid, id(vs) limit $limit "
+        "return vs as value_set, "
+        "[(vs)<-[:has_value_set]-(p:property) "
+        "where p.model = $model and p.version = $version | p] as props, "
+        "[vs.nanoid, id(vs)] as cursor order by vs.nanoid, id(vs)"
+    )
+    mdb.get_valuesets_by_model("ICDC")
+    assert mdb.driver.log[-1][1] == (
+        "match (vs:value_set)<-[:has_value_set]-(p:property) "
+        "where p.model = $model and p.version = $version "
+        "return vs as value_set, collect(p) as props"
+    )
+
+
+def test_fetch_many(monkeypatch):
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def props(parms):
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.pop()
+        return [{"id": parms["model"], "version": parms.get("version")}]
+
+    rows = {
+        "(m:model)": [
+            {"m": {"handle": h, "version": "1.0", "is_latest_version": True}}
+            for h in ("ICDC", "CTDC", "GDC")
+        ],
+        "(n:node)-[:has_property]->(p:property)": props,
+    }
+    monkeypatch.setattr(
+        bento_meta.mdb.mdb.GraphDatabase,
+        "driver",
+        lambda uri, auth, **config: FakeDriver(rows, **config),
+    )
+    mdb = MDB(uri="bolt://localhost:7687", max_connection_pool_size=4)
+    assert mdb.fetch_many(mdb.get_nodes_and_props_by_model, []) == []
+    result = mdb.fetch_many(
+        mdb.get_nodes_and_props_by_model,
+        ["ICDC", ("CTDC", "*"), {"model": "GDC", "version": "2.0"}, "PDC"],
+    )
+    assert max(peak) > 1
+    assert result == [
+        [{"id": "ICDC", "version": "1.0"}],
+        [{"id": "CTDC", "version": None}],
+        [{"id": "GDC", "version": "2.0"}],
+        [{"id": "PDC", "version": None}],
+    ]
+    result = mdb.fetch_many(mdb.get_with_statement, ["match (n) return n", "match (n)"])
+    assert result[0] is None
+    assert isinstance(result[1], RuntimeError)
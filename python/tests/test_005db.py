@@ -29,7 +29,7 @@ def test_get(test_mdb):
     node.neoid = n_id
     node_map.get(node, refresh=False)
     assert node.dirty == 0
-    assert node.__dict__["concept"].dirty == -1  # before dget()
+    assert node._stored("concept").dirty == -1  # before dget()
     assert node.concept.dirty == 0  # after dget()
     assert node.concept.nanoid == "NfoVKj"
     assert len(node.props) == 39
@@ -38,6 +38,11 @@ def test_get(test_mdb):
     assert node.props["AcquisitionMethodType"].model == "HTAN"
     concept = node.concept
     assert concept.belongs[(id(node), "concept")] == node
+    props = list(node.props.data.values())
+    assert len([p for p in props if p.dirty == -1]) == 38
+    Property.object_map.get_many(props)
+    assert not [p for p in props if p.dirty != 0]
+    assert node.props["AcquisitionMethodType"].model == "HTAN"
     owners = node_map.get_owners(node)
     assert len(owners) == 22
     cncpt = Concept()
@@ -63,6 +63,32 @@ def test_get_model(test_mdb):
             assert set(op.values) == {t["value"] for t in tt}
 
 
+@pytest.mark.docker
+def test_get_model_eager(test_mdb):
+    (b, h) = test_mdb
+    the_mdb = MDB(uri=b)
+    assert the_mdb
+    ObjectMap.clear_cache()
+    m = Model(handle="ICDC", version="1.0.0", mdb=the_mdb)
+    m.dget(eager=True)
+    assert not [x for x in ObjectMap.cache.values() if x.dirty != 0]
+    with m.drv.session() as session:
+        result = session.run(
+            'match (t:term)<-[:has_term]-(v:value_set)<-[:has_value_set]-(p:property {model:"ICDC", version:"1.0.0"}) return p, v, collect(t) as tt',
+        )
+        for rec in result:
+            (p, v, tt) = (rec["p"], rec["v"], rec["tt"])
+            [op] = [x for x in m.props.values() if x.handle == p["handle"]]
+            assert op._stored("value_set").neoid == v.id
+            assert set(op.value_set.terms.data) == {t["value"] for t in tt}
+        result = session.run(
+            'match (n:node {model:"ICDC", version:"1.0.0"})-[:has_concept]->(c:concept) return n, c',
+        )
+        for rec in result:
+            assert m.nodes[rec["n"]["handle"]]._stored("concept").neoid == rec["c"].id
+    assert not [x for x in ObjectMap.cache.values() if x.dirty != 0]
+
+
 @pytest.mark.docker
 def test_put_model(test_mdb):
     (b, h) = test_mdb
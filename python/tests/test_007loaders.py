@@ -0,0 +1,171 @@
+import re
+import sys
+from collections import Counter
+from types import SimpleNamespace
+
+sys.path.insert(0, ".")
+sys.path.insert(0, "..")
+
+import pytest
+from bento_meta.mdb import WriteableMDB
+from bento_meta.mdb.loaders import (
+    load_mdf,
+    load_model,
+    load_model_bulk_statements,
+    load_model_statements,
+)
+from neo4j.exceptions import Neo4jError
+
+
+class RecordingMDB(WriteableMDB):
+    """Stand-in for a WriteableMDB that records transactions instead of running them."""
+
+    def __init__(self, fail_on=None, error=Neo4jError):
+        self.txns = []
+        self.fail_on = fail_on
+        self.error = error
+
+    def put_with_statements(self, stmts):
+        if self.fail_on is not None and len(self.txns) == self.fail_on:
+            raise self.error("boom")
+        self.txns.append(stmts)
+        return []
+
+
+def test_bulk_statements(model):
+    stmts = load_model_bulk_statements(model)
+    assert all(q.startswith("UNWIND $rows AS row ") for (q, p) in stmts)
+    merged_nodes = [
+        r["handle"]
+        for (q, p) in stmts
+        if q.startswith("UNWIND $rows AS row MERGE (n:node")
+        for r in p["rows"]
+    ]
+    assert sorted(merged_nodes) == ["case", "sample", "visit"]
+    has_prop = [
+        (r["s"]["handle"], r["d"]["handle"])
+        for (q, p) in stmts
+        if "MERGE (s)-[:has_property]->(d)" in q
+        for r in p["rows"]
+    ]
+    assert sorted(has_prop) == [
+        ("case", "case_id"),
+        ("case", "diagnosis"),
+        ("of_case", "operator"),
+        ("sample", "sample_id"),
+    ]
+    terms = [
+        r["d"]["value"]
+        for (q, p) in stmts
+        if "MERGE (s)-[:has_term]->(d)" in q
+        for r in p["rows"]
+    ]
+    assert sorted(terms) == ["CRS", "a", "b"]
+    # relationship nodes created, linked, then unmarked
+    idx = [
+        i for i, (q, p) in enumerate(stmts) if re.search("n:relationship|s:relationship", q)
+    ]
+    assert "CREATE (n:relationship" in stmts[idx[0]][0]
+    assert "REMOVE n.__u" in stmts[idx[-1]][0]
+    assert len(stmts[idx[0]][1]["rows"]) == 2
+    assert {r["__u"] for r in stmts[idx[0]][1]["rows"]} == {
+        str(x) for x in model.edges
+    }
+
+
+def test_bulk_statements_batching(model):
+    stmts = load_model_bulk_statements(model, batch_size=1)
+    assert all(len(p["rows"]) == 1 for (q, p) in stmts)
+    assert len(stmts) > len(load_model_bulk_statements(model))
+    with pytest.raises(ValueError, match="batch_size must be"):
+        load_model_bulk_statements(model, batch_size=0)
+
+
+def test_load_model_transactional(model):
+    n = len(load_model_statements(model))
+    mdb = RecordingMDB()
+    load_model(model, mdb, transactional=True)
+    assert len(mdb.txns) == 1
+    assert len(mdb.txns[0]) == n
+    mdb = RecordingMDB()
+    load_model(model, mdb, transactional=True, txn_size=10)
+    assert [len(x) for x in mdb.txns[:-1]] == [10] * (len(mdb.txns) - 1)
+    assert sum(len(x) for x in mdb.txns) == n
+    mdb = RecordingMDB(fail_on=1)
+    with pytest.raises(RuntimeError, match="statements 11-20 rolled back; 10 of"):
+        load_model(model, mdb, transactional=True, txn_size=10)
+    assert len(mdb.txns) == 1
+    # only database errors are reported as a partial load
+    mdb = RecordingMDB(fail_on=0, error=TypeError)
+    with pytest.raises(TypeError, match="boom"):
+        load_model(model, mdb, transactional=True, txn_size=10)
+    # txn_size implies transactional
+    mdb = RecordingMDB()
+    load_model(model, mdb, txn_size=10)
+    assert sum(len(x) for x in mdb.txns) == n
+    mdb = RecordingMDB()
+    load_model(model, mdb, bulk=True, txn_size=5)
+    assert sum(len(x) for x in mdb.txns) == len(load_model_bulk_statements(model))
+    with pytest.raises(ValueError, match="txn_size must be"):
+        load_model(model, mdb, transactional=True, txn_size=0)
+
+
+def loaded_graph(mdb, commit):
+    """Nodes and relationships written with a _commit, minus generated keys."""
+    nodes = mdb.get_with_statement(
+        "match (n {_commit:$c}) return labels(n) as labels, properties(n) as props",
+        {"c": commit},
+    )
+    rels = mdb.get_with_statement(
+        "match (s {_commit:$c})-[r]->(d {_commit:$c}) "
+        "return labels(s)[0] as s, type(r) as r, labels(d)[0] as d, "
+        "s.handle as sh, d.handle as dh",
+        {"c": commit},
+    )
+    return (
+        Counter(
+            (
+                tuple(sorted(n["labels"])),
+                tuple(
+                    sorted(
+                        (k, v) for k, v in n["props"].items() if k not in {"_commit", "nanoid"}
+                    )
+                ),
+            )
+            for n in nodes
+        ),
+        Counter(tuple(r.values()) for r in rels),
+    )
+
+
+@pytest.mark.docker
+def test_load_mdf_bulk_same_graph(test_mdb, model):
+    (b, h) = test_mdb
+    mdb = WriteableMDB(uri=b, user="neo4j", password="neo4j1")
+    mdf = SimpleNamespace(model=model)
+    commits = ("_test_load_per_stmt", "_test_load_bulk")
+    try:
+        load_mdf(mdf, mdb, commits[0])
+        load_mdf(mdf, mdb, commits[1], bulk=True, batch_size=2)
+        (nodes, rels) = loaded_graph(mdb, commits[0])
+        (bulk_nodes, bulk_rels) = loaded_graph(mdb, commits[1])
+        assert nodes
+        assert rels
+        assert bulk_nodes == nodes
+        assert bulk_rels == rels
+        handles = sorted(
+            dict(props).get("handle")
+            for (labels, props) in nodes
+            if labels == ("node",)
+        )
+        assert handles == ["case", "sample", "visit"]
+        # no bulk bookkeeping left behind
+        assert not mdb.get_with_statement(
+            "match (n {_commit:$c}) where n.__u is not null return n",
+            {"c": commits[1]},
+        )
+    finally:
+        for commit in commits:
+            mdb.put_with_statement(
+                "match (n {_commit:$c}) detach delete n return count(n)", {"c": commit}
+            )
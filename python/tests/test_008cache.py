@@ -0,0 +1,172 @@
+import gc
+import sys
+import time
+import warnings
+
+sys.path.insert(0, ".")
+sys.path.insert(0, "..")
+
+import neo4j.graph
+import pytest
+from bento_meta.cache import EntityCache, ResultCache, stable_keys
+from bento_meta.object_map import ObjectMap
+from bento_meta.objects import Node, Property, Term
+
+
+def test_lru_eviction():
+    with pytest.raises(ValueError, match="max_entries must be"):
+        EntityCache(max_entries=0)
+    cache = EntityCache(max_entries=2)
+    a, b, c = (Node({"handle": x}) for x in "abc")
+    cache[1] = a
+    cache[2] = b
+    assert cache[1] is a  # 1 is now most recently used
+    cache[3] = c
+    assert 2 not in cache
+    assert cache.get(2) is None
+    assert set(cache) == {1, 3}
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 1,
+        "size": 2,
+        "max_entries": 2,
+    }
+    with pytest.raises(KeyError):
+        cache[2]
+    assert cache.misses == 2
+    cache.reset_stats()
+    assert cache.hits == cache.misses == cache.evictions == 0
+
+
+def test_weak_entries():
+    cache = EntityCache(weak=True)
+    n = Node({"handle": "a"})
+    cache[1] = n
+    assert cache[1] is n
+    assert cache.values() == [n]
+    del n
+    gc.collect()
+    assert 1 not in cache
+    assert cache.get(1) is None
+    assert len(cache) == 0
+
+
+def test_partitions():
+    cache = EntityCache()
+    cache[1] = Node({"handle": "a", "model": "ICDC", "version": "1.0"})
+    cache[2] = Node({"handle": "a", "model": "ICDC", "version": "2.0"})
+    cache[3] = Property({"handle": "p", "model": "CTDC"})
+    with cache.partition("ICDC", "1.0"):
+        cache[4] = Term({"value": "x"})
+    cache[5] = Term({"value": "y"})
+    assert set(cache.partitions()) == {
+        ("ICDC", "1.0"),
+        ("ICDC", "2.0"),
+        ("CTDC", None),
+        (None, None),
+    }
+    assert cache.evict_partition("ICDC", "1.0") == 2
+    assert set(cache) == {2, 3, 5}
+    assert cache.evict_partition("ICDC") == 1
+    assert cache.evict_partition("nope") == 0
+    assert set(cache) == {3, 5}
+    assert cache.evictions == 3
+
+
+def test_object_map_cache():
+    assert isinstance(ObjectMap.cache, EntityCache)
+    ObjectMap.cache[1] = Node({"handle": "a"})
+    ObjectMap.clear_cache()
+    assert len(ObjectMap.cache) == 0
+
+
+def db_node(graph, neoid, label, **props):
+    return neo4j.graph.Node(graph, f"4:db:{neoid}", neoid, [label], props)
+
+
+def test_stable_lookup():
+    warnings.simplefilter("ignore", DeprecationWarning)  # Node.id
+    cache = EntityCache()
+    g = neo4j.graph.Graph()
+    old = db_node(g, 1, "node", handle="case", nanoid="abc123", version="1.0")
+    n = Node(old)
+    assert n.element_id == "4:db:1"
+    assert stable_keys(n) == [("nanoid", "abc123", "1.0", None), ("element_id", "4:db:1")]
+    assert stable_keys(n) == stable_keys(old)
+    cache[n.neoid] = n
+    assert cache.lookup(old) is n
+    # after a restore, the same entity has another internal id
+    new = db_node(g, 7, "node", handle="case", nanoid="abc123", version="1.0")
+    assert cache.lookup(new) is n
+    assert n.neoid == 7
+    assert n.element_id == "4:db:7"
+    assert 1 not in cache
+    assert cache[7] is n
+    # another version of the entity shares the nanoid but is not the same
+    v2 = db_node(g, 8, "node", handle="case", nanoid="abc123", version="2.0")
+    assert cache.lookup(v2) is None
+    # a different node now has the old entity's internal id
+    other = db_node(g, 7, "node", handle="sample", nanoid="xyz789")
+    assert cache.lookup(other) is None
+    assert 7 not in cache
+    assert cache.hits == 3
+    assert cache.misses == 2
+    # entities without nanoid are found by element_id
+    t = Term(db_node(g, 9, "term", value="x"))
+    cache[t.neoid] = t
+    assert cache.lookup(db_node(g, 12, "term", value="x")) is None
+    t.element_id = "4:db:12"
+    cache[t.neoid] = t
+    assert cache.lookup(db_node(g, 12, "term", value="x")) is t
+    assert t.neoid == 12
+
+
+def test_result_cache():
+    with pytest.raises(ValueError, match="ttl must be"):
+        ResultCache(ttl=0)
+    cache = ResultCache(max_entries=5)
+    k = ResultCache.key("get_term_by_id", "match ...", {"nanoid": "abc"})
+    assert k == ResultCache.key("get_term_by_id", "match ...", {"nanoid": "abc"})
+    assert ResultCache.key("f", "q", {"a": [1, {"b": 2}]})  # hashable
+    assert cache.get(k) is None
+    cache.put(k, [1])
+    assert cache.get(k) == [1]
+    entries = {
+        "icdc1": {"model": "ICDC", "version": "1.0"},
+        "icdc2": {"model": "ICDC", "version": "2.0"},
+        "icdc*": {"model": "ICDC"},
+        "ctdc": {"model": "CTDC", "version": "1.0"},
+    }
+    for name, parms in entries.items():
+        cache.put(ResultCache.key(name, "q", parms), name, parms)
+    assert len(cache) == 5
+    # drops ICDC 1.0, ICDC any version, and the model-independent entry
+    assert cache.invalidate("ICDC", "1.0") == 3
+    assert cache.get(ResultCache.key("icdc2", "q", entries["icdc2"])) == "icdc2"
+    assert cache.invalidate("ICDC") == 1
+    assert len(cache) == 1
+    assert cache.invalidate() == 1
+    assert cache.stats() == {
+        "hits": 2,
+        "misses": 1,
+        "evictions": 0,
+        "invalidations": 5,
+        "size": 0,
+        "max_entries": 5,
+        "ttl": None,
+    }
+    # lru
+    for i in range(6):
+        cache.put(i, i)
+    assert cache.get(0) is None
+    assert cache.evictions == 1
+    # ttl
+    cache = ResultCache(ttl=0.01)
+    cache.put(k, None)
+    assert cache.get(k, "missing") is None
+    time.sleep(0.02)
+    assert cache.get(k, "missing") == "missing"
+    assert cache.evictions == 1
+    cache.reset_stats()
+    assert cache.hits == cache.misses == cache.evictions == cache.invalidations == 0
@@ -0,0 +1,63 @@
+import pickle
+import sys
+
+sys.path.insert(0, ".")
+sys.path.insert(0, "..")
+
+import pytest
+from bento_meta.entity import ArgError
+from bento_meta.model import Model
+from bento_meta.objects import Node
+from bento_meta.snapshot import MAGIC, dump_snapshot, load_snapshot
+
+
+def test_round_trip(tmp_path, model):
+    model.repository = "https://github.com/example/test"
+    path = tmp_path / "test.snap"
+    model.to_snapshot(path)
+    assert path.read_bytes().startswith(MAGIC)
+    m = Model.from_snapshot(path)
+    assert (m.handle, m.version, m.uri, m.repository) == (
+        "test",
+        "1.0.0",
+        "https://example.org/test",
+        "https://github.com/example/test",
+    )
+    assert set(m.nodes) == set(model.nodes)
+    assert set(m.edges) == set(model.edges)
+    assert set(m.props) == set(model.props)
+    assert set(m.terms) == set(model.terms)
+    case = m.nodes["case"]
+    assert case.nanoid == "abc123"
+    assert case.neoid == 10
+    assert case.element_id == "4:db:10"
+    assert case.tags["Class"].value == "primary"
+    assert case.props["diagnosis"] is m.props[("case", "diagnosis")]
+    e = m.edges[("of_case", "sample", "case")]
+    assert e.src is m.nodes["sample"]
+    assert e.dst is case
+    assert e.props["operator"].value_domain == "boolean"
+    vs = case.props["diagnosis"].value_set
+    assert vs.prop is case.props["diagnosis"]
+    assert set(vs.terms) == {"CRS", "a", "b"}
+    assert vs.terms["CRS"] is m.terms[("CRS", "Marilyn", None, None)]
+    c = case.concept.terms[("case", "CTOS", None, None)].concept
+    assert c.terms["other"].value == "subject"
+    assert (id(e), "dst") in case.belongs
+    for ent in (case, e, vs, c):
+        assert ent.dirty == 1
+    # mutation hooks still work on restored entities
+    case.props["diagnosis"].dirty = 0
+    vs.dirty = 1
+    assert case.props["diagnosis"].dirty == 1
+
+
+def test_bad_snapshot(model):
+    with pytest.raises(ArgError, match="not a bento_meta model snapshot"):
+        load_snapshot(b"nope", Model)
+    data = dump_snapshot(model)
+    with pytest.raises(ArgError, match="unsupported snapshot format"):
+        load_snapshot(MAGIC + b"\x63" + data[len(MAGIC) + 1 :], Model)
+    evil = MAGIC + b"\x01" + pickle.dumps(Node({"handle": "x"}))
+    with pytest.raises(pickle.UnpicklingError, match="disallowed object"):
+        load_snapshot(evil, Model)
@@ -0,0 +1,68 @@
+import sys
+
+sys.path.insert(0, ".")
+sys.path.insert(0, "..")
+
+import pytest
+from bento_meta.entity import ArgError
+from bento_meta.objects import Node
+from bento_meta.store import ModelStore, StoredEdge, StoredNode
+
+
+def test_store(tmp_path, model):
+    path = tmp_path / "test.store"
+    ModelStore.build(model, path)
+    with ModelStore(path) as store:
+        assert (store.handle, store.version, store.uri) == (
+            "test",
+            "1.0.0",
+            "https://example.org/test",
+        )
+        assert set(store.nodes) == set(model.nodes)
+        assert set(store.edges) == set(model.edges)
+        assert set(store.props) == set(model.props)
+        assert set(store.terms) == set(model.terms)
+        assert len(store.props) == len(model.props)
+        assert "nope" not in store.nodes
+        with pytest.raises(KeyError):
+            store.nodes["nope"]
+        case = store.nodes["case"]
+        assert isinstance(case, StoredNode)
+        assert case.nanoid == "abc123"
+        assert case.model == "test"
+        assert case.version is None
+        with pytest.raises(AttributeError, match="no attribute 'foo'"):
+            case.foo
+        assert set(case.props) == {"case_id", "diagnosis"}
+        assert case.props["case_id"].is_key is True
+        assert case.props["case_id"].terms is None
+        assert case.props["diagnosis"] == store.props[("case", "diagnosis")]
+        assert store.props[("case", "diagnosis")].values == ["CRS", "a", "b"]
+        assert store.props[("case", "diagnosis")].terms["CRS"].origin_name == "Marilyn"
+        e = store.edges[("of_case", "sample", "case")]
+        assert isinstance(e, StoredEdge)
+        assert e.triplet == ("of_case", "sample", "case")
+        assert e.dst == case
+        assert e.props["operator"].value_domain == "boolean"
+        assert store.nodes["visit"].props == {}
+
+
+def test_not_a_store(tmp_path):
+    path = tmp_path / "bad.store"
+    path.write_bytes(b"nothing to see here")
+    with pytest.raises(ArgError, match="is not a bento_meta model store"):
+        ModelStore(path)
+
+
+def test_store_edge_ends(tmp_path, model):
+    # the edge's src is no longer the object held in model.nodes
+    model.nodes["sample"] = Node({"handle": "sample", "desc": "replaced"})
+    path = tmp_path / "test.store"
+    ModelStore.build(model, path)
+    with ModelStore(path) as store:
+        e = store.edges[("of_case", "sample", "case")]
+        assert e.src == store.nodes["sample"]
+        assert e.src.desc == "replaced"
+    model.edges[("of_case", "sample", "case")].dst = Node({"handle": "ghost"})
+    with pytest.raises(ArgError, match="edge 'of_case': dst node 'ghost' is not in"):
+        ModelStore.build(model, tmp_path / "bad.store")
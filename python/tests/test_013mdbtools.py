@@ -300,3 +300,126 @@ def test_validation_failure_unsupported_entity():
     entity = TestEntity()
     with pytest.raises(ValueError):
         EntityValidator.validate_entity(entity)
+
+
+class FakeDoc:
+    """spaCy Doc stand-in: fixed vectors for a few words."""
+
+    VECTORS = {
+        "tumor": [1.0, 0.0, 0.0],
+        "tumour": [0.9, 0.1, 0.0],
+        "neoplasm": [0.7, 0.7, 0.0],
+        "blue": [0.0, 0.0, 1.0],
+    }
+
+    def __init__(self, text):
+        self.vector = FakeDoc.VECTORS.get(text, [0.0, 0.0, 0.0])
+
+
+class FakeNLP:
+    """spaCy Language stand-in."""
+
+    class vocab:
+        vectors_length = 3
+
+    def __init__(self):
+        self.embedded = []
+
+    def pipe(self, texts, batch_size=1000):
+        for text in texts:
+            self.embedded.append(text)
+            yield FakeDoc(text)
+
+
+def test_term_vector_index(tmp_path):
+    """Test building, querying, updating and saving a TermVectorIndex."""
+    pytest.importorskip("numpy")
+    from bento_meta.mdb.mdb_tools.term_index import TermVectorIndex
+
+    nlp = FakeNLP()
+    index = TermVectorIndex(nlp)
+    terms = [
+        {"nanoid": "t1", "value": "tumor", "origin_name": "NCIt"},
+        {"nanoid": "t2", "value": "tumour", "origin_name": "NCIt"},
+        {"nanoid": "t3", "value": "neoplasm", "origin_name": "caDSR"},
+        {"nanoid": "t4", "value": "blue"},
+        {"nanoid": "t5", "value": "unknown"},
+        {"value": "no nanoid"},
+    ]
+    assert index.add_terms(terms, batch_size=2) == 5
+    assert len(index) == 5
+    hits = index.query("tumor", threshold=0.7)
+    assert [h["nanoid"] for h in hits] == ["t1", "t2", "t3"]
+    assert hits[0]["similarity"] == pytest.approx(1.0)
+    assert hits[2] == {
+        "value": "neoplasm",
+        "origin_name": "caDSR",
+        "nanoid": "t3",
+        "similarity": pytest.approx(0.7 / (0.98**0.5)),
+    }
+    assert [h["nanoid"] for h in index.query("tumor", threshold=0.0, k=2)] == [
+        "t1",
+        "t2",
+    ]
+    # only new or changed terms are embedded
+    nlp.embedded = []
+    assert index.add_terms([*terms, {"nanoid": "t4", "value": "tumor"}]) == 1
+    assert nlp.embedded == ["tumor"]
+    assert len(index.query("tumor", threshold=0.999)) == 2
+    assert index.remove(["t1", "t9"]) == 1
+    assert "t1" not in index
+    assert [h["nanoid"] for h in index.query("tumor", threshold=0.999)] == ["t4"]
+    path = tmp_path / "terms.npz"
+    index.save(path)
+    loaded = TermVectorIndex.load(path, nlp)
+    assert loaded.nanoids == index.nanoids
+    assert loaded.origins == index.origins
+    assert loaded.query("tumor", threshold=0.7) == index.query("tumor", threshold=0.7)
+
+
+def test_ann_search():
+    """Test batch k-nearest-neighbor search, exact and approximate."""
+    np = pytest.importorskip("numpy")
+    from bento_meta.mdb.mdb_tools.ann import IVFIndex, exact_search, normalize
+    from bento_meta.mdb.mdb_tools.term_index import PropertyVectorIndex
+
+    rng = np.random.default_rng(1)
+    vectors = normalize(rng.standard_normal((2000, 16)))
+    queries = normalize(vectors[:200] + 0.1 * rng.standard_normal((200, 16)))
+    (sims, rows) = exact_search(vectors, queries, 5)
+    assert (rows[:, 0] == np.arange(200)).all()
+    assert (np.diff(sims, axis=1) <= 0).all()
+    ann = IVFIndex(vectors, nprobe=8)
+    (a_sims, a_rows) = ann.search(queries, 5)
+    assert len(ann) == 2000
+    assert (np.diff(a_sims, axis=1) <= 0).all()
+    recall = np.mean([len(set(a) & set(e)) / 5 for a, e in zip(a_rows, rows)])
+    assert recall > 0.8
+    # exhaustive probing is exact
+    (x_sims, x_rows) = ann.search(queries, 5, nprobe=len(ann.centroids))
+    assert (x_rows == rows).all()
+    # fewer vectors than k: padded
+    (sims, rows) = exact_search(vectors[:2], queries[:1], 3)
+    assert rows[0, 2] == -1
+    assert sims[0, 2] == -np.inf
+
+    index = PropertyVectorIndex(FakeNLP())
+    index.add_properties(
+        [
+            {"nanoid": "p1", "handle": "Tumor", "model": "A"},
+            {"nanoid": "p2", "handle": "tumour", "model": "B"},
+            {"nanoid": "p3", "handle": "neoplasm", "model": "B"},
+            {"nanoid": "p4", "handle": "blue", "model": "C"},
+        ]
+    )
+    for approximate in (False, True):
+        hits = index.query_many(
+            ["tumor", "blue", "xyz"], threshold=0.7, k=2, approximate=approximate
+        )
+        assert [[h["nanoid"] for h in q] for q in hits] == [["p1", "p2"], ["p4"], []]
+        assert hits[0][1]["model"] == "B"
+        nbrs = index.neighbors(threshold=0.7, k=1, approximate=approximate)
+        assert [[h["nanoid"] for h in n] for n in nbrs] == [["p2"], ["p1"], ["p2"], []]
+    assert index.ann is not None
+    index.remove(["p4"])
+    assert index.ann is None